@@ -0,0 +1,464 @@
+"""Benchmarks for the Light Control hot paths (raycastCursor, adjust_light modal, label drawing, GetLight*/SetLight*)
+
+Run headless from the repository root:
+
+    blender -b --factory-startup --python Benchmarks/LightControl_Benchmark.py -- --output results.json
+
+Replay event recordings of the Light Control add-on (see Record Light Adjustments in the preferences)
+against the .blend file they were recorded in:
+
+    blender -b shot.blend --python Benchmarks/LightControl_Benchmark.py -- --objects --lights --replay session.jsonl
+
+Compare against an earlier run, exits with code 1 when a median got slower than the tolerance allows:
+
+    blender -b --factory-startup --python Benchmarks/LightControl_Benchmark.py -- --baseline results.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from math import ceil, cos, pi, sin, sqrt, tan, radians
+from types import SimpleNamespace
+
+import bmesh
+import bpy
+import mathutils
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from LightControl import batchraycast, coherentray, functions, operators, pivotframe, profiling, properties, recording  # noqa: E402
+
+
+#################################################################
+######################## VIEWPORT ###############################
+#################################################################
+
+
+class BenchmarkRegion:
+    """Stands in for the 3D View window region, only what view3d_utils and the modal read"""
+
+    def __init__(self, width: int, height: int):
+        self.x = 0
+        self.y = 0
+        self.width = width
+        self.height = height
+
+
+class BenchmarkRegionData:
+    """Stands in for RegionView3D, a perspective camera at location looking at target"""
+
+    def __init__(self, location: mathutils.Vector, target: mathutils.Vector, aspect: float, fov: float = radians(50.0), near: float = 0.1, far: float = 10000.0):
+        rotation = (target - location).to_track_quat('-Z', 'Y').to_matrix().to_4x4()
+        self.view_matrix = (mathutils.Matrix.Translation(location) @ rotation).inverted()
+        self.window_matrix = perspectiveMatrix(fov, aspect, near, far)
+        self.perspective_matrix = self.window_matrix @ self.view_matrix
+        self.is_perspective = True
+        self.view_perspective = 'PERSP'
+
+    @classmethod
+    def fromRecording(cls, header: dict):
+        """Region data with the exact view and window matrix of an event recording"""
+        regionData = cls.__new__(cls)
+        regionData.view_matrix = recording.listToMatrix(header["viewMatrix"])
+        regionData.window_matrix = recording.listToMatrix(header["windowMatrix"])
+        regionData.perspective_matrix = regionData.window_matrix @ regionData.view_matrix
+        regionData.is_perspective = header["isPerspective"]
+        regionData.view_perspective = 'PERSP' if header["isPerspective"] else 'ORTHO'
+        return regionData
+
+
+class BenchmarkArea:
+    def __init__(self, width: int, height: int):
+        self.x = 0
+        self.y = 0
+        self.width = width
+        self.height = height
+        self.type = 'VIEW_3D'
+
+    def tag_redraw(self):
+        pass
+
+
+class BenchmarkWindow:
+    def cursor_warp(self, x: int, y: int):
+        pass
+
+
+def perspectiveMatrix(fov: float, aspect: float, near: float, far: float) -> mathutils.Matrix:
+    f = 1.0 / tan(fov * 0.5)
+    return mathutils.Matrix((
+        (f / aspect, 0.0, 0.0, 0.0),
+        (0.0, f, 0.0, 0.0),
+        (0.0, 0.0, (far + near) / (near - far), (2.0 * far * near) / (near - far)),
+        (0.0, 0.0, -1.0, 0.0)))
+
+
+def createContext(scene: bpy.types.Scene, width: int = 1920, height: int = 1080):
+    """Builds a context like namespace that raycastCursor and the adjust_light modal can run against in background mode"""
+    viewLayer = scene.view_layers[0]
+    viewLayer.update()
+    extent = sqrt(max(len(scene.objects), 1)) * 3.0
+    regionData = BenchmarkRegionData(mathutils.Vector(
+        (0.0, -extent * 0.75, extent * 0.75)), mathutils.Vector((0.0, 0.0, 0.0)), width / height)
+    return SimpleNamespace(
+        scene=scene,
+        view_layer=viewLayer,
+        collection=scene.collection,
+        visible_objects=[obj for obj in scene.objects if obj.visible_get(view_layer=viewLayer)],
+        region=BenchmarkRegion(width, height),
+        region_data=regionData,
+        area=BenchmarkArea(width, height),
+        window=BenchmarkWindow(),
+        preferences=bpy.context.preferences,
+        active_object=None,
+    )
+
+
+#################################################################
+######################## SCENES #################################
+#################################################################
+
+
+def createScene(objectCount: int) -> bpy.types.Scene:
+    """Fresh scene with objectCount icospheres on a grid, all sharing one mesh"""
+    scene = bpy.data.scenes.new(f"LightControlBenchmark_{objectCount}")
+    mesh = bpy.data.meshes.new("LightControlBenchmarkSphere")
+    bm = bmesh.new()
+    bmesh.ops.create_icosphere(bm, subdivisions=2, radius=1.0)
+    bm.to_mesh(mesh)
+    bm.free()
+
+    side = ceil(sqrt(objectCount))
+    spacing = 3.0
+    offset = (side - 1) * spacing * 0.5
+    for i in range(objectCount):
+        obj = bpy.data.objects.new(f"BenchmarkMesh_{i}", mesh)
+        obj.location = ((i % side) * spacing - offset, (i // side) * spacing - offset, 0.0)
+        scene.collection.objects.link(obj)
+    return scene
+
+
+def createLights(context, lightCount: int) -> list:
+    lightTypes = ('AREA', 'POINT', 'SPOT', 'SUN')
+    lights = []
+    for i in range(lightCount):
+        pivot = mathutils.Vector((i * 0.1, 0.0, 0.0))
+        lightObject = functions.CreateLight(context, pivot, lightTypes[i % len(lightTypes)])
+        functions.PositionLight(lightObject, mathutils.Vector((0.0, 0.0, 1.0)), 5.0)
+        lights.append(lightObject)
+    context.view_layer.update()
+    return lights
+
+
+def removeScene(scene: bpy.types.Scene):
+    meshes = {obj.data for obj in scene.objects if obj.type == 'MESH'}
+    lights = {obj.data for obj in scene.objects if obj.type == 'LIGHT'}
+    for obj in list(scene.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    for mesh in meshes:
+        bpy.data.meshes.remove(mesh)
+    for light in lights:
+        bpy.data.lights.remove(light)
+    bpy.data.scenes.remove(scene)
+
+
+#################################################################
+######################## EVENTS #################################
+#################################################################
+
+
+def createEvent(eventType: str, value: str, x: int, y: int, prevX: int, prevY: int, ctrl: bool = False, shift: bool = False, alt: bool = False):
+    return SimpleNamespace(type=eventType, value=value, mouse_x=x, mouse_y=y, mouse_prev_x=prevX, mouse_prev_y=prevY,
+                           mouse_region_x=x, mouse_region_y=y, ctrl=ctrl, shift=shift, alt=alt, oskey=False)
+
+
+def mouseMoveStream(region: BenchmarkRegion, count: int, ctrl: bool = False) -> list:
+    """MOUSEMOVE events along a lissajous curve around the region center, deterministic"""
+    events = []
+    cx, cy = region.width * 0.5, region.height * 0.5
+    prevX, prevY = int(cx), int(cy)
+    for i in range(count):
+        t = i / max(count - 1, 1) * 6.2831853
+        x = int(cx + cos(t * 3.0) * region.width * 0.3)
+        y = int(cy + sin(t * 2.0) * region.height * 0.3)
+        events.append(createEvent('MOUSEMOVE', 'NOTHING', x, y, prevX, prevY, ctrl=ctrl))
+        prevX, prevY = x, y
+    return events
+
+
+def heldKeyStream(region: BenchmarkRegion, key: str, count: int) -> list:
+    cx, cy = int(region.width * 0.5), int(region.height * 0.5)
+    events = [createEvent(key, 'PRESS', cx, cy, cx, cy)]
+    events += mouseMoveStream(region, count)
+    events.append(createEvent(key, 'RELEASE', cx, cy, cx, cy))
+    return events
+
+
+#################################################################
+######################## SESSION ################################
+#################################################################
+
+
+AdjustLightSession = type("AdjustLightSession", (), {
+    key: value for key, value in vars(operators.LIGHTCONTROL_OT_adjust_light).items() if not key.startswith("__")})
+AdjustLightSession.report = lambda self, level, message: print(message)
+
+
+def beginSession(context, lightObject: bpy.types.Object, coherentPivot: bool = False):
+    """Sets up what LIGHTCONTROL_OT_adjust_light.invoke sets up without the pivot empty, no draw handlers and screen lookups"""
+    session = AdjustLightSession()
+    session.activeSpace3D = None
+    session.activeRegion3D = context.region_data
+    session.currentLightType = lightObject.data.type
+    context.active_object = lightObject
+
+    pivotLocation = functions.GetLightPivot(lightObject)
+    pivotToLight = lightObject.matrix_world.to_translation() - pivotLocation
+    session.pivotObject = pivotframe.PivotFrame(pivotLocation, functions.lookAtRotation(pivotToLight, "-x"))
+    session.sessionLight = pivotframe.SessionLight(
+        lightObject, session.pivotObject, mathutils.Vector((pivotToLight.magnitude, 0.0, 0.0)), (0.0, pi * 0.5, 0.0))
+    session.sessionLight.apply()
+    session.pivotRaycaster = None
+    if coherentPivot:
+        addon = context.preferences.addons.get(functions.__package__)
+        session.pivotRaycaster = coherentray.CoherentRaycaster(
+            addon.preferences.proxyRaycastMinimumFaces if addon is not None else 0)
+    session.initialLightOrbit, session.initialLightDistance, session.initialLightSize, session.initialLightBrightness, session.initialLightAngle, session.initialLightPivot, session.initialLightColor = functions.GetLightValues(
+        session.sessionLight, session.pivotObject)
+    return session
+
+
+def endSession(session, lightObject: bpy.types.Object):
+    session.sessionLight.apply()
+
+
+#################################################################
+######################## TIMING #################################
+#################################################################
+
+
+def summarize(samples: list, calls: int = 1) -> dict:
+    """Statistics in milliseconds, per call when one sample covers several calls"""
+    milliseconds = sorted(sample / 1000000.0 / calls for sample in samples)
+    return {
+        "iterations": len(milliseconds),
+        "calls_per_iteration": calls,
+        "min_ms": milliseconds[0],
+        "median_ms": statistics.median(milliseconds),
+        "mean_ms": statistics.fmean(milliseconds),
+        "p95_ms": milliseconds[min(len(milliseconds) - 1, int(len(milliseconds) * 0.95))],
+        "max_ms": milliseconds[-1],
+    }
+
+
+def timeCalls(function, arguments: list) -> list:
+    samples = []
+    for args in arguments:
+        start = time.perf_counter_ns()
+        function(*args)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def benchmarkRaycast(context, iterations: int) -> dict:
+    events = mouseMoveStream(context.region, iterations)
+    arguments = [(context, (event.mouse_region_x, event.mouse_region_y)) for event in events]
+    return summarize(timeCalls(functions.raycastCursor, arguments))
+
+
+def benchmarkBatchRaycast(context, iterations: int, spacing: int = 16) -> dict:
+    """One sample is a grid of rays over the whole region, reported per ray"""
+    pixels = batchraycast.RegionPixelGrid(context.region, spacing)
+    batchraycast.RaycastRegionPixels(context, pixels)  # object BVHs are built once and cached
+    samples = timeCalls(batchraycast.RaycastRegionPixels, [(context, pixels)] * max(1, iterations // 10))
+    return summarize(samples, len(pixels))
+
+
+def benchmarkModal(context, lightObject: bpy.types.Object, events: list, coherentPivot: bool = False) -> dict:
+    session = beginSession(context, lightObject, coherentPivot)
+    try:
+        samples = timeCalls(lambda event: session.modal(context, event), [(event,) for event in events])
+    finally:
+        endSession(session, lightObject)
+    return summarize(samples)
+
+
+def benchmarkRecording(filepath: str) -> dict:
+    """Replays a recording on the light of the currently loaded file, stops before approve or cancel"""
+    header, events = recording.LoadEventRecording(filepath)
+    context = createContext(bpy.context.scene, *header["region"])
+    context.region_data = BenchmarkRegionData.fromRecording(header)
+    lightObject = recording.ApplyEventRecordingStartState(context, header)
+    if lightObject is None:
+        raise RuntimeError(f"light {header['light']} of {filepath} not found in {bpy.data.filepath}")
+    context.view_layer.update()
+    terminalEvents = {'LEFTMOUSE', 'RET', 'RIGHTMOUSE', 'ESC'}
+    events = [event for event in events if event.type not in terminalEvents]
+    return benchmarkModal(context, lightObject, events)
+
+
+def benchmarkLabels(lightObject: bpy.types.Object, pivotObject: bpy.types.Object, iterations: int) -> dict:
+    return summarize(timeCalls(functions.GetLightValuesForDrawingLabels, [(lightObject, pivotObject)] * iterations))
+
+
+def benchmarkAccessors(lights: list, repeats: int) -> dict:
+    """Each sample is one pass over all lights, reported per light"""
+    color = mathutils.Color((1.0, 0.9, 0.8))
+    accessors = {
+        "GetLightType": lambda light: functions.GetLightType(light),
+        "GetLightBrightness": lambda light: functions.GetLightBrightness(light),
+        "GetLightSize": lambda light: functions.GetLightSize(light),
+        "GetLightAngle": lambda light: functions.GetLightAngle(light),
+        "GetLightColor": lambda light: functions.GetLightColor(light),
+        "GetLightPivot": lambda light: functions.GetLightPivot(light),
+        "GetLightDistance": lambda light: functions.GetLightDistance(light),
+        "SetLightBrightnessClamped": lambda light: functions.SetLightBrightnessClamped(light, 100.0),
+        "SetLightSizeClamped": lambda light: functions.SetLightSizeClamped(light, 0.5),
+        "SetLightAngle": lambda light: functions.SetLightAngle(light, 0.5),
+        "SetLightColor": lambda light: functions.SetLightColor(light, color),
+    }
+    results = {}
+    for name, accessor in accessors.items():
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter_ns()
+            for light in lights:
+                accessor(light)
+            samples.append(time.perf_counter_ns() - start)
+        results[name] = summarize(samples, len(lights))
+    return results
+
+
+def benchmarkDraw(context, session, iterations: int):
+    """drawOperationOptions needs a GPU context, not available in background mode"""
+    if bpy.app.background:
+        return None
+    from LightControl import drawing
+    return summarize(timeCalls(drawing.drawOperationOptions, [(session, context)] * iterations))
+
+
+#################################################################
+######################## RUNNER #################################
+#################################################################
+
+
+def run(options) -> dict:
+    results = {}
+
+    for objectCount in options.objects:
+        print(f"benchmarking scene with {objectCount} objects")
+        scene = createScene(objectCount)
+        context = createContext(scene)
+        lightObject = createLights(context, 1)[0]
+
+        results[f"raycastCursor/objects={objectCount}"] = benchmarkRaycast(context, options.iterations)
+        results[f"raycastBatch/objects={objectCount}"] = benchmarkBatchRaycast(context, options.iterations)
+
+        streams = {
+            "pivot": mouseMoveStream(context.region, options.events, ctrl=True),
+            "orbit": heldKeyStream(context.region, 'R', options.events),
+            "brightness": heldKeyStream(context.region, 'B', options.events),
+            "distance": heldKeyStream(context.region, 'D', options.events),
+        }
+        for streamName, events in streams.items():
+            results[f"modal/{streamName}/objects={objectCount}"] = benchmarkModal(context, lightObject, events)
+        results[f"modal/pivot-coherent/objects={objectCount}"] = benchmarkModal(
+            context, lightObject, streams["pivot"], coherentPivot=True)
+
+        session = beginSession(context, lightObject)
+        results[f"labels/objects={objectCount}"] = benchmarkLabels(session.sessionLight, session.pivotObject, options.iterations)
+        draw = benchmarkDraw(context, session, options.iterations)
+        if draw:
+            results[f"drawOperationOptions/objects={objectCount}"] = draw
+        endSession(session, lightObject)
+        removeScene(scene)
+
+    for lightCount in options.lights:
+        print(f"benchmarking {lightCount} lights")
+        scene = createScene(0)
+        context = createContext(scene)
+        lights = createLights(context, lightCount)
+        for name, result in benchmarkAccessors(lights, options.repeats).items():
+            results[f"{name}/lights={lightCount}"] = result
+        removeScene(scene)
+
+    for filepath in options.replay:
+        print(f"replaying {filepath}")
+        results[f"modal/replay/{os.path.basename(filepath)}"] = benchmarkRecording(filepath)
+
+    return results
+
+
+def compareToBaseline(results: dict, baseline: dict, tolerance: float) -> list:
+    """Returns the names whose median is slower than baseline median * (1 + tolerance)"""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        limit = baseline[name]["median_ms"] * (1.0 + tolerance)
+        if result["median_ms"] > limit:
+            regressions.append(name)
+            print(f"REGRESSION {name}: {result['median_ms']:.4f} ms > {limit:.4f} ms")
+    return regressions
+
+
+def parseArguments():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Light Control benchmarks")
+    parser.add_argument("--objects", type=int, nargs="*", default=[1000, 10000, 100000],
+                        help="object counts of the synthetic scenes")
+    parser.add_argument("--lights", type=int, nargs="*", default=[10, 100, 1000, 10000],
+                        help="light counts for the GetLight*/SetLight* benchmarks")
+    parser.add_argument("--iterations", type=int, default=100, help="raycasts and label updates per scene")
+    parser.add_argument("--events", type=int, default=200, help="MOUSEMOVE events per replayed modal stream")
+    parser.add_argument("--repeats", type=int, default=20, help="passes over all lights per accessor")
+    parser.add_argument("--replay", nargs="*", default=[],
+                        help="event recordings to replay through the modal, against the loaded .blend")
+    parser.add_argument("--output", default="", help="write results as JSON to this file")
+    parser.add_argument("--baseline", default="", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against baseline, 0.2 = 20%%")
+    parser.add_argument("--profile", default="", help="enable the add-on profiler and write a Chrome trace here")
+    return parser.parse_args(argv)
+
+
+def main():
+    options = parseArguments()
+    profiling.profiler.enabled = bool(options.profile)
+    # the add-on is imported but not enabled, lights still need their Light Control settings
+    if not hasattr(bpy.types.Object, "lightControl"):
+        properties.register()
+
+    results = run(options)
+
+    report = {
+        "environment": {
+            "blender": bpy.app.version_string,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "background": bpy.app.background,
+        },
+        "thresholds": {"tolerance": options.tolerance, "baseline": options.baseline},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w") as file:
+            file.write(text)
+    else:
+        print(text)
+
+    if options.profile:
+        profiling.profiler.exportChromeTrace(options.profile)
+
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)["results"]
+        if compareToBaseline(results, baseline, options.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmarks the batch orbit, pivot and look at maths of LightControl/coremath.py, runs with plain Python and NumPy, no Blender needed
+
+    python Benchmarks/LightControl_CoreMath_Benchmark.py --lights 1 100 10000 100000 --output coremath.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import time
+
+import numpy as np
+
+# load the module by path, importing the LightControl package would need bpy
+_coremathPath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "LightControl", "coremath.py")
+_spec = importlib.util.spec_from_file_location("coremath", _coremathPath)
+coremath = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(coremath)
+
+
+def timeFunction(function, repeats: int) -> dict:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        function()
+        samples.append((time.perf_counter_ns() - start) / 1000000.0)
+    return {"iterations": repeats, "median_ms": statistics.median(samples), "min_ms": min(samples)}
+
+
+def run(lightCounts: list, repeats: int) -> dict:
+    rng = np.random.default_rng(0)
+    results = {}
+    for lightCount in lightCounts:
+        vectors = rng.normal(size=(lightCount, 3))
+        rotations = rng.uniform(-1.0, 1.0, size=(lightCount, 3))
+        lightPositions = rng.normal(size=(lightCount, 3)) * 10.0
+        pivotPositions = rng.normal(size=(lightCount, 3))
+        hitLocations = rng.normal(size=(lightCount, 3))
+        localPositions = np.zeros((lightCount, 3))
+        localPositions[:, 0] = np.linalg.norm(lightPositions - pivotPositions, axis=1)
+        distances = rng.uniform(0.5, 20.0, size=lightCount)
+
+        cases = {
+            "lookAtRotation": lambda: coremath.lookAtRotation(vectors, "-x"),
+            "vectorToAzimuthElevation": lambda: coremath.vectorToAzimuthElevation(vectors),
+            "intensityByInverseSquareLaw": lambda: coremath.intensityByInverseSquareLaw(100.0, distances, distances * 1.1),
+            "orbitByDelta": lambda: coremath.orbitByDelta(rotations, (3.0, -2.0, 0.0), 0.006, False, 0.2),
+            "pivotByHit": lambda: coremath.pivotByHit(lightPositions, pivotPositions, hitLocations, localPositions),
+        }
+        for name, case in cases.items():
+            result = timeFunction(case, repeats)
+            result["per_light_us"] = result["median_ms"] * 1000.0 / lightCount
+            results[f"{name}/lights={lightCount}"] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Light Control core math benchmarks")
+    parser.add_argument("--lights", type=int, nargs="*", default=[1, 100, 10000, 100000])
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--output", default="", help="write results as JSON to this file")
+    options = parser.parse_args()
+
+    text = json.dumps(run(options.lights, options.repeats), indent=2)
+    if options.output:
+        with open(options.output, "w") as file:
+            file.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
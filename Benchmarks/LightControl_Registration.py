@@ -0,0 +1,97 @@
+"""Measures the cost of importing and registering the add-on, each run in a fresh Blender process
+
+Compare the single file add-on from before the package split with the current package:
+
+    git show <commit before the split>:LightControl.py > /tmp/before/LightControl.py
+    blender -b --factory-startup --python Benchmarks/LightControl_Registration.py -- --addon /tmp/before/LightControl.py LightControl --runs 20
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import bpy
+
+RESULT_PREFIX = "LIGHTCONTROL_REGISTRATION "
+WATCHED_MODULES = ("gpu", "gpu_extras.batch", "blf", "bpy_extras.view3d_utils")
+
+
+def measure(addonPath: str):
+    """Runs inside the child process, imports, registers and unregisters the add-on once"""
+    addonPath = os.path.abspath(addonPath)
+    loadedBefore = {name for name in WATCHED_MODULES if name in sys.modules}
+    if os.path.isdir(addonPath):
+        name = os.path.basename(addonPath)
+        spec = importlib.util.spec_from_file_location(name, os.path.join(
+            addonPath, "__init__.py"), submodule_search_locations=[addonPath])
+    else:
+        name = os.path.splitext(os.path.basename(addonPath))[0]
+        spec = importlib.util.spec_from_file_location(name, addonPath)
+
+    start = time.perf_counter()
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    imported = time.perf_counter()
+    module.register()
+    registered = time.perf_counter()
+    module.unregister()
+
+    print(RESULT_PREFIX + json.dumps({
+        "import_ms": (imported - start) * 1000.0,
+        "register_ms": (registered - imported) * 1000.0,
+        "total_ms": (registered - start) * 1000.0,
+        "imported_on_register": sorted(name for name in WATCHED_MODULES if name in sys.modules and name not in loadedBefore),
+    }))
+
+
+def runChild(addonPath: str) -> dict:
+    command = [bpy.app.binary_path, "-b", "--factory-startup", "--python", os.path.abspath(__file__),
+               "--", "--measure", addonPath]
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    for line in output.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"no measurement in output of {' '.join(command)}")
+
+
+def summarize(runs: list) -> dict:
+    summary = {"runs": len(runs), "imported_on_register": runs[0]["imported_on_register"]}
+    for key in ("import_ms", "register_ms", "total_ms"):
+        values = [run[key] for run in runs]
+        summary[key] = {"median": statistics.median(values), "min": min(values), "max": max(values)}
+    return summary
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Light Control registration cost")
+    parser.add_argument("--addon", nargs="*", default=["LightControl"],
+                        help="add-on files or package directories to measure")
+    parser.add_argument("--runs", type=int, default=10, help="fresh Blender processes per add-on")
+    parser.add_argument("--output", default="", help="write results as JSON to this file")
+    parser.add_argument("--measure", default="", help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.measure:
+        measure(options.measure)
+        return
+
+    results = {}
+    for addonPath in options.addon:
+        print(f"measuring {addonPath}")
+        results[addonPath] = summarize([runChild(addonPath) for _ in range(options.runs)])
+
+    text = json.dumps(results, indent=2)
+    if options.output:
+        with open(options.output, "w") as file:
+            file.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+bl_info = {
+    "name": "Light Control",
+    "description": "Tools that let you easily create lights on Mouseposition (Shift + E) and adjust lights (when light active, E) fast and intuetively",
+    "author": "Malte Decker",
+    "version": (0, 9, 0),
+    "blender": (3, 3, 0),
+    "location": "Shortcuts : Shift E and E",
+    "category": "Lighting"
+}
+
+import sys
+
+import bpy
+
+from .operators import (LIGHTCONTROL_OT_add_light, LIGHTCONTROL_MT_add_light_pie_menu, LIGHTCONTROL_OT_add_light_pie_menu_call,
+                        LIGHTCONTROL_OT_adjust_light, LIGHTCONTROL_OT_export_profile, LIGHTCONTROL_OT_reset_profile,
+                        LIGHTCONTROL_OT_replay_events, LIGHTCONTROL_OT_export_rig, LIGHTCONTROL_OT_import_rig,
+                        LIGHTCONTROL_OT_save_rig_cache, LIGHTCONTROL_OT_load_rig_cache)
+from .preferences import LIGHTCONTROL_Addon_Preferences
+from . import properties
+
+
+#################################################################
+####################### REGISTRATION ############################
+#################################################################
+
+addon_keymaps = []
+classes = (LIGHTCONTROL_OT_add_light, LIGHTCONTROL_MT_add_light_pie_menu,
+           LIGHTCONTROL_OT_add_light_pie_menu_call, LIGHTCONTROL_OT_adjust_light, LIGHTCONTROL_OT_export_profile,
+           LIGHTCONTROL_OT_reset_profile, LIGHTCONTROL_OT_replay_events, LIGHTCONTROL_OT_export_rig,
+           LIGHTCONTROL_OT_import_rig, LIGHTCONTROL_OT_save_rig_cache, LIGHTCONTROL_OT_load_rig_cache,
+           LIGHTCONTROL_Addon_Preferences)
+
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    properties.register()
+
+    wm = bpy.context.window_manager
+    kc = wm.keyconfigs.addon
+    if kc:
+        # TODO : Change the name="" to Object mode somehow
+        km = kc.keymaps.new(name='3D View', space_type='VIEW_3D')
+        # spawn lights
+        kmi = km.keymap_items.new(
+            "lightcontrol.add_light_pie_menu_call", type='E', value='PRESS', shift=True)
+        # adjust lights
+        kmi = km.keymap_items.new(
+            "lightcontrol.adjust_light", type='E', value='PRESS')  # shift=True, ctrl=True
+        addon_keymaps.append((km, kmi))
+
+
+def unregister():
+    print("unregistered")
+    # only loaded once accelerated or parallel raycasts were used, the filter once it compiled candidates
+    for moduleName in ("acceleration", "parallelraycast", "raycastfilter"):
+        module = sys.modules.get(__name__ + "." + moduleName)
+        if module:
+            module.unregister()
+
+    properties.unregister()
+    for cls in classes:
+        bpy.utils.unregister_class(cls)
+
+    for km, kmi in addon_keymaps:
+        km.keymap_items.remove(kmi)
+    addon_keymaps.clear()
+
@@ -0,0 +1,404 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import bpy
+from bpy.app.handlers import persistent
+
+from .adjacency import MeshAdjacency
+from .bvh import FlatBVH
+from .bvhcache import BVHDiskCache, MeshContentHash
+from .meshdata import GetEvaluatedFaceCount, GetEvaluatedMeshSurface, GetEvaluatedMeshTriangles
+from .profiling import profiled, profiler
+from .proxymesh import BuildProxyMesh
+from .raycastfilter import GetRaycastCandidates
+from .raykernel import SceneBVH, WorldTriangles
+
+
+#################################################################
+###################### RAYCAST ACCELERATION #####################
+#################################################################
+
+
+# original object pointer => FlatBVH, or None when the object is below the face threshold
+_objectBVHs: dict = {}
+# original object pointer => MeshAdjacency of the evaluated mesh
+_objectAdjacencies: dict = {}
+# original object pointer => Future of a background adjacency build, moved to _objectAdjacencies once done
+_pendingAdjacencies: dict = {}
+# original object pointer => (triangles (T,3,3) float32 as first vertex and two edges, polygon indices) in object space
+_objectTriangles: dict = {}
+# original object pointer => (triangles, polygon indices) like _objectTriangles but in world space
+_objectWorldTriangles: dict = {}
+# (object pointers, WorldTriangles) of the last GetWorldTriangles call
+_worldTriangles: tuple = ((), None)
+# original object pointer => FlatBVH built for batched ray queries, for objects without one in _objectBVHs
+_objectRayBVHs: dict = {}
+# (object pointers, SceneBVH) of the last GetSceneBVH call
+_sceneBVH: tuple = ((), None)
+# original object pointer => Future of a background build, moved to _objectBVHs once done
+_pendingBVHs: dict = {}
+# original object pointer => FlatBVH of a decimated proxy, or None when the object is below the proxy threshold
+_objectProxies: dict = {}
+# original object pointer => Future of a background proxy build, moved to _objectProxies once done
+_pendingProxies: dict = {}
+# (object, ray origin, ray direction, proxy hit location) of the last raycastCursor hit on a proxy, in world space
+_lastProxyHit: tuple = None
+# builds submitted and finished since the pool was last idle, for the HUD
+_buildsSubmitted: int = 0
+_buildsFinished: int = 0
+_buildPool: ThreadPoolExecutor = None
+_handlersRegistered: bool = False
+
+
+def GetBVHCacheDirectory(preferences) -> str:
+    if preferences.bvhCacheDirectory:
+        return bpy.path.abspath(preferences.bvhCacheDirectory)
+    return bpy.utils.user_resource('DATAFILES', path="lightcontrol_bvh_cache", create=True)
+
+
+def BuildBVHFromArrays(vertices, triangleIndices, polygonIndices, cacheDirectory: str = "", cacheSizeLimit: int = 0) -> tuple:
+    """Builds a FlatBVH from mesh arrays already copied out of bpy, safe to run in a worker thread.
+    Goes through the disk cache when a cacheDirectory is given, returns the BVH and whether it was loaded from disk"""
+    if not cacheDirectory:
+        return FlatBVH.build(vertices, triangleIndices, polygonIndices), False
+
+    diskCache = BVHDiskCache(cacheDirectory, cacheSizeLimit)
+    contentHash = MeshContentHash(vertices, triangleIndices, polygonIndices)
+    bvh = diskCache.load(contentHash)
+    if bvh is not None:
+        return bvh, True
+    bvh = FlatBVH.build(vertices, triangleIndices, polygonIndices)
+    try:
+        diskCache.store(contentHash, bvh)
+    except OSError as error:
+        print(f"Could not write BVH cache: {error}")
+    return bvh, False
+
+
+def _buildArguments(context: bpy.types.Context, obj: bpy.types.Object, preferences) -> tuple:
+    """Everything a build needs from bpy, read on the main thread"""
+    vertices, triangleIndices, polygonIndices = GetEvaluatedMeshTriangles(context, obj)
+    if not preferences.useBVHDiskCache:
+        return vertices, triangleIndices, polygonIndices
+    return vertices, triangleIndices, polygonIndices, GetBVHCacheDirectory(preferences), preferences.bvhCacheSizeLimit * 1024 * 1024
+
+
+def BuildProxyBVHFromArrays(vertices, triangleIndices, polygonIndices, targetTriangles: int, cacheDirectory: str = "", cacheSizeLimit: int = 0) -> tuple:
+    """Decimates the mesh arrays to about targetTriangles and builds the BVH of the proxy, safe to run in a worker thread"""
+    return BuildBVHFromArrays(*BuildProxyMesh(vertices, triangleIndices, polygonIndices, targetTriangles),
+                              cacheDirectory, cacheSizeLimit)
+
+
+@profiled("buildObjectBVH")
+def BuildObjectBVH(context: bpy.types.Context, obj: bpy.types.Object, preferences) -> FlatBVH:
+    """Builds the BVH of the evaluated mesh in object space, through the disk cache when enabled"""
+    bvh, fromDiskCache = BuildBVHFromArrays(*_buildArguments(context, obj, preferences))
+    profiler.count("bvh.diskCacheHits" if fromDiskCache else "bvh.built")
+    return bvh
+
+
+def _getBuildPool() -> ThreadPoolExecutor:
+    global _buildPool
+    if _buildPool is None:
+        _buildPool = ThreadPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1),
+                                        thread_name_prefix="LightControlBVH")
+    return _buildPool
+
+
+def _submitBuild(context: bpy.types.Context, obj: bpy.types.Object, preferences):
+    global _buildsSubmitted, _buildsFinished
+    if not _pendingBVHs:
+        _buildsSubmitted = _buildsFinished = 0
+    _pendingBVHs[obj.as_pointer()] = _getBuildPool().submit(
+        BuildBVHFromArrays, *_buildArguments(context, obj, preferences))
+    _buildsSubmitted += 1
+
+
+def _submitProxyBuild(context: bpy.types.Context, obj: bpy.types.Object, preferences):
+    global _buildsSubmitted, _buildsFinished
+    if not _pendingBVHs and not _pendingProxies:
+        _buildsSubmitted = _buildsFinished = 0
+    vertices, triangleIndices, polygonIndices, *cacheArguments = _buildArguments(context, obj, preferences)
+    _pendingProxies[obj.as_pointer()] = _getBuildPool().submit(
+        BuildProxyBVHFromArrays, vertices, triangleIndices, polygonIndices, preferences.proxyTriangleCount, *cacheArguments)
+    _buildsSubmitted += 1
+
+
+def _collectBuild(key: int, pending: dict = _pendingBVHs, finished: dict = _objectBVHs) -> bool:
+    """Swaps a finished background build in, False while it is still running"""
+    global _buildsFinished
+    future = pending[key]
+    if not future.done():
+        return False
+    del pending[key]
+    _buildsFinished += 1
+    try:
+        bvh, fromDiskCache = future.result()
+    except Exception as error:
+        # keep using obj.ray_cast for this object
+        print(f"Background BVH build failed: {error}")
+        finished[key] = None
+        return True
+    profiler.count("bvh.diskCacheHits" if fromDiskCache else "bvh.built")
+    finished[key] = bvh
+    return True
+
+
+def GetBVHBuildProgress() -> tuple:
+    """Finished and submitted background builds, (0, 0) when none are running"""
+    for key in list(_pendingBVHs):
+        _collectBuild(key)
+    for key in list(_pendingProxies):
+        _collectBuild(key, _pendingProxies, _objectProxies)
+    if not _pendingBVHs and not _pendingProxies:
+        return 0, 0
+    return _buildsFinished, _buildsSubmitted
+
+
+def GetObjectBVH(context: bpy.types.Context, obj: bpy.types.Object, preferences):
+    """Returns the FlatBVH for heavy objects, None for objects that obj.ray_cast should handle.
+    With background builds None is also returned until the objects BVH is ready"""
+    key = obj.as_pointer()
+    if key in _objectBVHs:
+        return _objectBVHs[key]
+    if key in _pendingBVHs:
+        return _objectBVHs[key] if _collectBuild(key) else None
+    _registerHandlers()
+    if GetEvaluatedFaceCount(context, obj) < preferences.acceleratedRaycastMinimumFaces:
+        _objectBVHs[key] = None
+    elif preferences.buildBVHInBackground:
+        _submitBuild(context, obj, preferences)
+    else:
+        _objectBVHs[key] = BuildObjectBVH(context, obj, preferences)
+    return _objectBVHs.get(key)
+
+
+def PrepareObjectBVHs(context: bpy.types.Context, preferences):
+    """Starts background builds for all heavy raycast candidates, so they are ready by the time the cursor gets there"""
+    for obj in GetRaycastCandidates(context):
+        if preferences.useProxyRaycast:
+            GetObjectProxyBVH(context, obj, preferences)
+        if preferences.useAcceleratedRaycast:
+            GetObjectBVH(context, obj, preferences)
+
+
+def GetObjectProxyBVH(context: bpy.types.Context, obj: bpy.types.Object, preferences):
+    """Returns the BVH of a decimated proxy for very heavy objects, None for objects raycast exactly.
+    With background builds None is also returned until the proxy is ready"""
+    key = obj.as_pointer()
+    if key in _objectProxies:
+        return _objectProxies[key]
+    if key in _pendingProxies:
+        return _objectProxies[key] if _collectBuild(key, _pendingProxies, _objectProxies) else None
+    _registerHandlers()
+    if GetEvaluatedFaceCount(context, obj) < preferences.proxyRaycastMinimumFaces:
+        _objectProxies[key] = None
+    elif preferences.buildBVHInBackground:
+        _submitProxyBuild(context, obj, preferences)
+    else:
+        with profiler.stage("buildProxyBVH"):
+            vertices, triangleIndices, polygonIndices, *cacheArguments = _buildArguments(context, obj, preferences)
+            bvh, fromDiskCache = BuildProxyBVHFromArrays(
+                vertices, triangleIndices, polygonIndices, preferences.proxyTriangleCount, *cacheArguments)
+        profiler.count("bvh.diskCacheHits" if fromDiskCache else "bvh.built")
+        _objectProxies[key] = bvh
+    return _objectProxies.get(key)
+
+
+def RememberProxyHit(obj: bpy.types.Object, origin, direction, location):
+    """Keeps the ray of a hit on a proxy, so RefineProxyHit can cast it against the real mesh later"""
+    global _lastProxyHit
+    _lastProxyHit = (obj, origin.copy(), direction.copy(), location.copy())
+
+
+def RefineProxyHit(context: bpy.types.Context, location, tolerance: float = 1e-6):
+    """Exact hit on the real mesh for the ray of the last proxy hit, when location is still that proxy hit.
+    Returns None when there is nothing to refine or the ray misses the real mesh"""
+    global _lastProxyHit
+    if _lastProxyHit is None:
+        return None
+    obj, origin, direction, proxyLocation = _lastProxyHit
+    _lastProxyHit = None
+    if (location - proxyLocation).length > tolerance:
+        return None
+    mx = obj.matrix_world
+    mxi = mx.inverted_safe()
+    with profiler.stage("refineProxyHit"):
+        success, hitLocation, normal, index = obj.ray_cast(origin=mxi @ origin, direction=mxi.to_3x3() @ direction)
+    return mx @ hitLocation if success else None
+
+
+@profiled("buildObjectAdjacency")
+def GetObjectMeshAdjacency(context: bpy.types.Context, obj: bpy.types.Object) -> MeshAdjacency:
+    """Triangle neighbourhoods and vertex normals of the evaluated mesh in object space, kept until the geometry changes"""
+    key = obj.as_pointer()
+    adjacency = _objectAdjacencies.get(key)
+    if adjacency is None:
+        _registerHandlers()
+        adjacency = MeshAdjacency.build(*GetEvaluatedMeshSurface(context, obj))
+        _objectAdjacencies[key] = adjacency
+    return adjacency
+
+
+def GetObjectMeshAdjacencyInBackground(context: bpy.types.Context, obj: bpy.types.Object) -> MeshAdjacency:
+    """GetObjectMeshAdjacency without the stall, only the mesh arrays are read here and the adjacency is built in the
+    build pool. Returns None until it is ready, and for good when the build failed"""
+    key = obj.as_pointer()
+    adjacency = _objectAdjacencies.get(key)
+    if adjacency is not None:
+        return adjacency
+    future = _pendingAdjacencies.get(key)
+    if future is None:
+        _registerHandlers()
+        _pendingAdjacencies[key] = _getBuildPool().submit(MeshAdjacency.build, *GetEvaluatedMeshSurface(context, obj))
+        return None
+    # a failed build stays pending so it is not submitted again
+    if not future.done() or future.exception() is not None:
+        return None
+    del _pendingAdjacencies[key]
+    adjacency = future.result()
+    _objectAdjacencies[key] = adjacency
+    return adjacency
+
+
+def GetObjectTriangles(context: bpy.types.Context, obj: bpy.types.Object) -> tuple:
+    """Loop triangles of the evaluated mesh prepared for intersectRayTriangles, kept until the geometry changes"""
+    key = obj.as_pointer()
+    triangles = _objectTriangles.get(key)
+    if triangles is None:
+        _registerHandlers()
+        vertices, triangleIndices, polygonIndices = GetEvaluatedMeshTriangles(context, obj)
+        corners = vertices[triangleIndices]
+        corners[:, 1:] -= corners[:, :1]
+        triangles = (corners, polygonIndices)
+        _objectTriangles[key] = triangles
+    return triangles
+
+
+def GetObjectWorldTriangles(context: bpy.types.Context, obj: bpy.types.Object) -> tuple:
+    """GetObjectTriangles moved into world space, kept until the geometry or the transform changes"""
+    key = obj.as_pointer()
+    triangles = _objectWorldTriangles.get(key)
+    if triangles is None:
+        objectTriangles, polygonIndices = GetObjectTriangles(context, obj)
+        triangles = (WorldTriangles.transform(objectTriangles, obj.matrix_world), polygonIndices)
+        _objectWorldTriangles[key] = triangles
+    return triangles
+
+
+@profiled("gatherWorldTriangles")
+def GetWorldTriangles(context: bpy.types.Context, objects: list) -> WorldTriangles:
+    """World space triangles of all objects in one WorldTriangles, reused while the objects and their meshes stay the same"""
+    global _worldTriangles
+    keys = tuple(obj.as_pointer() for obj in objects)
+    cachedKeys, worldTriangles = _worldTriangles
+    if worldTriangles is None or cachedKeys != keys:
+        worldTriangles = WorldTriangles.concatenate([GetObjectWorldTriangles(context, obj) for obj in objects])
+        _worldTriangles = (keys, worldTriangles)
+    return worldTriangles
+
+
+def GetObjectRayBVH(context: bpy.types.Context, obj: bpy.types.Object) -> FlatBVH:
+    """FlatBVH of any mesh for batched ray queries. The raycast BVH when one was built, otherwise one is built now
+    whatever the face count, through the disk cache when enabled. Kept until the geometry changes"""
+    key = obj.as_pointer()
+    bvh = _objectBVHs.get(key) or _objectRayBVHs.get(key)
+    if bvh is None:
+        _registerHandlers()
+        addon = context.preferences.addons.get(__package__)
+        if addon is not None:
+            bvh = BuildObjectBVH(context, obj, addon.preferences)
+        else:
+            bvh = FlatBVH.build(*GetEvaluatedMeshTriangles(context, obj))
+        _objectRayBVHs[key] = bvh
+    return bvh
+
+
+@profiled("gatherSceneBVH")
+def GetSceneBVH(context: bpy.types.Context, objects: list) -> SceneBVH:
+    """Object BVHs and world matrices of all objects in one SceneBVH, reused while the objects, their transforms
+    and their meshes stay the same"""
+    global _sceneBVH
+    keys = tuple(obj.as_pointer() for obj in objects)
+    cachedKeys, sceneBVH = _sceneBVH
+    if sceneBVH is None or cachedKeys != keys:
+        sceneBVH = SceneBVH([GetObjectRayBVH(context, obj) for obj in objects],
+                            [obj.matrix_world for obj in objects])
+        _sceneBVH = (keys, sceneBVH)
+    return sceneBVH
+
+
+def _dropWorldTriangles(key: int):
+    global _worldTriangles, _sceneBVH
+    if _objectWorldTriangles.pop(key, None) is not None:
+        _worldTriangles = ((), None)
+    if key in _sceneBVH[0]:
+        _sceneBVH = ((), None)
+
+
+def ClearObjectBVHs():
+    global _worldTriangles, _sceneBVH, _lastProxyHit
+    _objectBVHs.clear()
+    _objectRayBVHs.clear()
+    _sceneBVH = ((), None)
+    _objectTriangles.clear()
+    _objectWorldTriangles.clear()
+    _worldTriangles = ((), None)
+    # running builds finish unused
+    _pendingBVHs.clear()
+    _objectProxies.clear()
+    _pendingProxies.clear()
+    _lastProxyHit = None
+    _objectAdjacencies.clear()
+    _pendingAdjacencies.clear()
+
+
+@persistent
+def _onDepsgraphUpdate(scene, depsgraph):
+    # drop BVHs of objects whose evaluated geometry changed, transforms only matter for world space triangles
+    for update in depsgraph.updates:
+        if update.is_updated_transform and isinstance(update.id, bpy.types.Object):
+            _dropWorldTriangles(update.id.original.as_pointer())
+        if not update.is_updated_geometry:
+            continue
+        if isinstance(update.id, bpy.types.Object):
+            _dropWorldTriangles(update.id.original.as_pointer())
+            _objectBVHs.pop(update.id.original.as_pointer(), None)
+            _objectRayBVHs.pop(update.id.original.as_pointer(), None)
+            _pendingBVHs.pop(update.id.original.as_pointer(), None)
+            _objectProxies.pop(update.id.original.as_pointer(), None)
+            _pendingProxies.pop(update.id.original.as_pointer(), None)
+            _objectTriangles.pop(update.id.original.as_pointer(), None)
+            _objectAdjacencies.pop(update.id.original.as_pointer(), None)
+            _pendingAdjacencies.pop(update.id.original.as_pointer(), None)
+        elif isinstance(update.id, bpy.types.Mesh):
+            ClearObjectBVHs()
+            return
+
+
+@persistent
+def _onLoadPost(*args):
+    # object pointers are not valid across files
+    ClearObjectBVHs()
+
+
+def _registerHandlers():
+    global _handlersRegistered
+    if _handlersRegistered:
+        return
+    bpy.app.handlers.depsgraph_update_post.append(_onDepsgraphUpdate)
+    bpy.app.handlers.load_post.append(_onLoadPost)
+    _handlersRegistered = True
+
+
+def unregister():
+    global _handlersRegistered, _buildPool
+    if _onDepsgraphUpdate in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_onDepsgraphUpdate)
+    if _onLoadPost in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_onLoadPost)
+    _handlersRegistered = False
+    ClearObjectBVHs()
+    if _buildPool is not None:
+        _buildPool.shutdown(wait=False, cancel_futures=True)
+        _buildPool = None
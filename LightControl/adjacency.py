@@ -0,0 +1,178 @@
+import numpy as np
+
+from .bvh import intersectRayTriangles
+
+
+#################################################################
+######################## MESH ADJACENCY #########################
+#################################################################
+
+
+class MeshAdjacency:
+    """Loop triangles of a mesh in object space with the triangles around every vertex, so the neighbourhood of a
+    triangle can be gathered without touching the rest of the mesh. Vertex to triangle lookup is compressed:
+    the triangles of vertex v are vertexTriangles[vertexOffsets[v]:vertexOffsets[v + 1]]"""
+
+    def __init__(self, vertices: np.ndarray, triangleIndices: np.ndarray, polygonIndices: np.ndarray, vertexOffsets: np.ndarray, vertexTriangles: np.ndarray, vertexNormals: np.ndarray = None):
+        self.vertices = vertices
+        self.vertexNormals = vertexNormals
+        self.triangleIndices = triangleIndices
+        self.polygonIndices = polygonIndices
+        self.vertexOffsets = vertexOffsets
+        self.vertexTriangles = vertexTriangles
+        # built on first use, see edgeNeighbours and triangleNormals
+        self._edgeNeighbours: np.ndarray = None
+        self._triangleNormals: np.ndarray = None
+
+    @classmethod
+    def build(cls, vertices: np.ndarray, triangleIndices: np.ndarray, polygonIndices: np.ndarray, vertexNormals: np.ndarray = None):
+        """vertices (V,3) and triangleIndices (T,3) as from GetMeshTriangles, vertexNormals (V,3) for interpolatedNormal"""
+        cornerVertices = triangleIndices.reshape(-1)
+        order = np.argsort(cornerVertices, kind="stable")
+        vertexOffsets = np.zeros(len(vertices) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cornerVertices, minlength=len(vertices)), out=vertexOffsets[1:])
+        vertexTriangles = (order // 3).astype(np.int32)
+        return cls(vertices, triangleIndices, polygonIndices, vertexOffsets, vertexTriangles, vertexNormals)
+
+    @property
+    def edgeNeighbours(self) -> np.ndarray:
+        """(T,3) triangle across edge e (vertex e to vertex e + 1) of every triangle, -1 on open boundaries"""
+        if self._edgeNeighbours is None:
+            triangleCount = len(self.triangleIndices)
+            edgeStart = self.triangleIndices.astype(np.int64)
+            edgeEnd = np.roll(edgeStart, -1, axis=1)
+            keys = (np.minimum(edgeStart, edgeEnd) * len(self.vertices) + np.maximum(edgeStart, edgeEnd)).reshape(-1)
+            order = np.argsort(keys, kind="stable")
+            # consecutive equal keys are the two sides of a shared edge
+            shared = np.flatnonzero(keys[order[1:]] == keys[order[:-1]])
+            neighbours = np.full(triangleCount * 3, -1, dtype=np.int32)
+            neighbours[order[shared]] = order[shared + 1] // 3
+            neighbours[order[shared + 1]] = order[shared] // 3
+            self._edgeNeighbours = neighbours.reshape(triangleCount, 3)
+        return self._edgeNeighbours
+
+    @property
+    def triangleNormals(self) -> np.ndarray:
+        """(T,3) unit face normals in object space"""
+        if self._triangleNormals is None:
+            corners = self.vertices[self.triangleIndices].astype(np.float64)
+            normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+            lengths = np.linalg.norm(normals, axis=1)
+            self._triangleNormals = normals / np.where(lengths > 0.0, lengths, 1.0)[:, None]
+        return self._triangleNormals
+
+    def triangleOfPolygon(self, polygonIndex: int) -> int:
+        """First loop triangle of a polygon, loop triangles are sorted by polygon"""
+        return int(np.searchsorted(self.polygonIndices, polygonIndex))
+
+    def trianglesOfPolygon(self, polygonIndex: int) -> np.ndarray:
+        return np.arange(np.searchsorted(self.polygonIndices, polygonIndex),
+                         np.searchsorted(self.polygonIndices, polygonIndex, side="right"))
+
+    def barycentric(self, triangle: int, points: np.ndarray) -> np.ndarray:
+        """Barycentric coordinates (n,3) of points (n,3) projected onto the plane of the triangle"""
+        a, b, c = self.vertices[self.triangleIndices[triangle]].astype(np.float64)
+        edge1 = b - a
+        edge2 = c - a
+        offsets = np.asarray(points, dtype=np.float64) - a
+        d00 = edge1 @ edge1
+        d01 = edge1 @ edge2
+        d11 = edge2 @ edge2
+        d20 = offsets @ edge1
+        d21 = offsets @ edge2
+        denominator = d00 * d11 - d01 * d01
+        if denominator == 0.0:
+            return np.full((len(offsets), 3), 1.0 / 3.0)
+        v = (d11 * d20 - d01 * d21) / denominator
+        w = (d00 * d21 - d01 * d20) / denominator
+        return np.stack((1.0 - v - w, v, w), axis=1)
+
+    def triangleAt(self, polygonIndex: int, point) -> int:
+        """Loop triangle of the polygon that contains the point, or the one it is closest to the inside of"""
+        triangles = self.trianglesOfPolygon(polygonIndex)
+        if len(triangles) <= 1:
+            return int(triangles[0]) if len(triangles) else -1
+        insideness = [self.barycentric(triangle, (point,))[0].min() for triangle in triangles]
+        return int(triangles[int(np.argmax(insideness))])
+
+    def interpolatedNormal(self, triangle: int, point) -> np.ndarray:
+        """Vertex normals of the triangle blended by the barycentric coordinates of the point, unit length"""
+        if self.vertexNormals is None:
+            return self.triangleNormals[triangle]
+        weights = np.clip(self.barycentric(triangle, (point,))[0], 0.0, 1.0)
+        normal = weights @ self.vertexNormals[self.triangleIndices[triangle]].astype(np.float64)
+        length = np.linalg.norm(normal)
+        return normal / length if length > 0.0 else self.triangleNormals[triangle]
+
+    def walk(self, triangle: int, point: np.ndarray, displacement: np.ndarray, maxSteps: int = 256) -> tuple:
+        """Moves a point on the surface by a displacement in the plane of its triangle, crossing edges into the
+        neighbouring triangles and unfolding the rest of the displacement into their planes.
+        Returns the triangle and point where it ended and whether an open boundary or maxSteps stopped the walk"""
+        point = np.asarray(point, dtype=np.float64)
+        displacement = np.asarray(displacement, dtype=np.float64)
+        enteredEdge = -1
+        for _ in range(maxSteps):
+            if not displacement.any():
+                return triangle, point, False
+            start, end = self.barycentric(triangle, (point, point + displacement))
+            # vertex i reaching 0 leaves through the edge opposite of it, edge (i + 1) % 3
+            leaving = end < 0.0
+            if enteredEdge >= 0:
+                leaving[(enteredEdge + 2) % 3] = False
+            if not leaving.any():
+                return triangle, point + displacement, False
+            with np.errstate(divide="ignore", invalid="ignore"):
+                fractions = np.where(leaving, start / (start - end), np.inf)
+            vertex = int(np.argmin(fractions))
+            fraction = float(np.clip(fractions[vertex], 0.0, 1.0))
+            edge = (vertex + 1) % 3
+            point = point + displacement * fraction
+            displacement = displacement * (1.0 - fraction)
+            neighbour = int(self.edgeNeighbours[triangle, edge])
+            if neighbour < 0:
+                return triangle, point, True
+            # unfold what is left around the shared edge into the plane of the next triangle
+            sharedEdge = self.edgeNeighbours[neighbour] == triangle
+            enteredEdge = int(np.argmax(sharedEdge)) if sharedEdge.any() else -1
+            edgeStart, edgeEnd = self.vertices[self.triangleIndices[triangle, [edge, (edge + 1) % 3]]].astype(np.float64)
+            edgeDirection = edgeEnd - edgeStart
+            edgeDirection /= np.linalg.norm(edgeDirection) or 1.0
+            along = displacement @ edgeDirection
+            across = np.linalg.norm(displacement - edgeDirection * along)
+            inward = np.cross(self.triangleNormals[neighbour], edgeDirection)
+            neighbourCentre = self.vertices[self.triangleIndices[neighbour]].astype(np.float64).mean(axis=0)
+            if inward @ (neighbourCentre - edgeStart) < 0.0:
+                inward = -inward
+            displacement = edgeDirection * along + inward * across
+            triangle = neighbour
+        return triangle, point, True
+
+    def neighbourhood(self, triangles, rings: int = 1) -> np.ndarray:
+        """Triangles sharing a vertex with the given triangles, grown rings times"""
+        triangles = np.unique(np.asarray(triangles, dtype=np.int32))
+        for _ in range(rings):
+            ringVertices = np.unique(self.triangleIndices[triangles])
+            starts = self.vertexOffsets[ringVertices]
+            counts = self.vertexOffsets[ringVertices + 1] - starts
+            # concatenated ranges vertexTriangles[start:start + count] of all ring vertices
+            positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            triangles = np.unique(self.vertexTriangles[positions])
+        return triangles
+
+    def rayCast(self, origin, direction, triangles: np.ndarray):
+        """obj.ray_cast limited to the given triangles: success, location, normal, polygon index and the hit triangle"""
+        if not len(triangles):
+            return False, None, None, -1, -1
+        origin = np.asarray(origin, dtype=np.float64)
+        direction = np.asarray(direction, dtype=np.float64)
+        corners = self.vertices[self.triangleIndices[triangles]].astype(np.float64)
+        edge1 = corners[:, 1] - corners[:, 0]
+        edge2 = corners[:, 2] - corners[:, 0]
+        t = intersectRayTriangles(origin, direction, corners[:, 0], edge1, edge2)
+        nearest = int(np.argmin(t))
+        if not np.isfinite(t[nearest]):
+            return False, None, None, -1, -1
+        normal = np.cross(edge1[nearest], edge2[nearest])
+        normal /= np.linalg.norm(normal) or 1.0
+        triangle = int(triangles[nearest])
+        return True, origin + direction * t[nearest], normal, int(self.polygonIndices[triangle]), triangle
@@ -0,0 +1,64 @@
+import numpy as np
+import bpy
+
+from .acceleration import GetSceneBVH
+from .profiling import profiled, profiler
+from .raycastfilter import GetRaycastCandidates
+
+
+#################################################################
+######################## BATCH RAYCAST ##########################
+#################################################################
+
+
+def RegionRays(region: bpy.types.Region, regionData: bpy.types.RegionView3D, pixels) -> tuple:
+    """region_2d_to_origin_3d and region_2d_to_vector_3d for (N,2) region pixels at once, returns origins and
+    unit directions (N,3) float64. Orthographic origins are pulled back to the far clip like region_2d_to_origin_3d"""
+    pixels = np.asarray(pixels, dtype=np.float64).reshape(-1, 2)
+    viewInverse = np.array(regionData.view_matrix.inverted(), dtype=np.float64)
+    perspectiveInverse = np.array(regionData.perspective_matrix.inverted(), dtype=np.float64)
+    ndcX = 2.0 * pixels[:, 0] / region.width - 1.0
+    ndcY = 2.0 * pixels[:, 1] / region.height - 1.0
+    if regionData.is_perspective:
+        ndc = np.stack((ndcX, ndcY, np.full(len(pixels), -0.5)), axis=1)
+        w = ndc @ perspectiveInverse[3, :3] + perspectiveInverse[3, 3]
+        directions = (ndc @ perspectiveInverse[:3, :3].T + perspectiveInverse[:3, 3]) / w[:, None] - viewInverse[:3, 3]
+        origins = np.broadcast_to(viewInverse[:3, 3], directions.shape).copy()
+    else:
+        directions = np.broadcast_to(-viewInverse[:3, 2], (len(pixels), 3)).copy()
+        origins = (ndcX[:, None] * perspectiveInverse[:3, 0] + ndcY[:, None] * perspectiveInverse[:3, 1]
+                   + perspectiveInverse[:3, 3])
+        if regionData.view_perspective != 'CAMERA':
+            origins -= perspectiveInverse[:3, 2]
+    lengths = np.linalg.norm(directions, axis=1)
+    directions /= np.where(lengths > 0.0, lengths, 1.0)[:, None]
+    return origins, directions
+
+
+def RegionPixelGrid(region: bpy.types.Region, spacing: int, left: int = 0, bottom: int = 0, width: int = 0, height: int = 0) -> np.ndarray:
+    """Pixel centers (N,2) every spacing pixels inside a rectangle of the region, the whole region by default"""
+    width = width or region.width - left
+    height = height or region.height - bottom
+    xs = np.arange(left + spacing * 0.5, left + width, spacing)
+    ys = np.arange(bottom + spacing * 0.5, bottom + height, spacing)
+    grid = np.stack(np.meshgrid(xs, ys), axis=-1)
+    return grid.reshape(-1, 2)
+
+
+@profiled("raycastBatch")
+def RaycastBatch(context: bpy.types.Context, origins, directions, objects: list = None) -> tuple:
+    """Casts N world rays against the evaluated meshes of objects (the raycast candidates by default) in one call,
+    through the object BVHs so the cost grows with the triangles near the rays and not with the scene. Returns the objects and per ray arrays: object index into objects, location, normal, polygon index and distance.
+    Misses have object and polygon index -1 and distance inf"""
+    if objects is None:
+        objects = GetRaycastCandidates(context)
+    objectIndices, locations, normals, polygonIndices, distances = GetSceneBVH(
+        context, objects).rayCast(origins, directions)
+    profiler.count("raycast.batchRays", len(objectIndices))
+    return objects, objectIndices, locations, normals, polygonIndices, distances
+
+
+def RaycastRegionPixels(context: bpy.types.Context, pixels, objects: list = None) -> tuple:
+    """RaycastBatch for (N,2) pixels of the context region, the batched form of raycastCursor"""
+    origins, directions = RegionRays(context.region, context.region_data, pixels)
+    return RaycastBatch(context, origins, directions, objects)
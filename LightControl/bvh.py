@@ -0,0 +1,193 @@
+import numpy as np
+
+
+#################################################################
+########################### BVH #################################
+#################################################################
+
+
+LEAF_SIZE: int = 64
+EPSILON: float = 1e-9
+
+
+def intersectRayTriangles(origin: np.ndarray, direction: np.ndarray, v0: np.ndarray, edge1: np.ndarray, edge2: np.ndarray) -> np.ndarray:
+    """Moeller-Trumbore for one ray against n triangles given as first vertex and two edges (n,3), returns the ray parameter t per triangle, inf on a miss. Hits both sides like obj.ray_cast"""
+    p = np.cross(direction, edge2)
+    determinant = np.einsum("ij,ij->i", edge1, p)
+    valid = np.abs(determinant) > EPSILON
+    inverseDeterminant = 1.0 / np.where(valid, determinant, 1.0)
+    s = origin - v0
+    u = np.einsum("ij,ij->i", s, p) * inverseDeterminant
+    q = np.cross(s, edge1)
+    v = (q @ direction) * inverseDeterminant
+    t = np.einsum("ij,ij->i", edge2, q) * inverseDeterminant
+    hit = valid & (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) & (t > EPSILON)
+    return np.where(hit, t, np.inf)
+
+
+class FlatBVH:
+    """Bounding volume hierarchy flattened into arrays so it can be written to disk and memory mapped as is.
+    Nodes are in depth first order, the first child of an inner node is node + 1, nodeStart holds the second child.
+    For leaves nodeStart is the first triangle and nodeCount the number of triangles (0 for inner nodes).
+    Triangles are stored as first vertex and two edges (T,3,3) float32 in leaf order, with their polygon index"""
+
+    def __init__(self, boundsMin: np.ndarray, boundsMax: np.ndarray, nodeStart: np.ndarray, nodeCount: np.ndarray, triangles: np.ndarray, polygonIndices: np.ndarray):
+        self.boundsMin = boundsMin
+        self.boundsMax = boundsMax
+        self.nodeStart = nodeStart
+        self.nodeCount = nodeCount
+        self.triangles = triangles
+        self.polygonIndices = polygonIndices
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in (self.boundsMin, self.boundsMax, self.nodeStart, self.nodeCount, self.triangles, self.polygonIndices))
+
+    @classmethod
+    def build(cls, vertices: np.ndarray, triangleIndices: np.ndarray, polygonIndices: np.ndarray, leafSize: int = LEAF_SIZE):
+        """Median split on the longest centroid axis, vertices (V,3) and triangleIndices (T,3) as from GetMeshTriangles"""
+        corners = vertices[triangleIndices]  # (T,3,3)
+        triangleMin = corners.min(axis=1)
+        triangleMax = corners.max(axis=1)
+        centroids = corners.mean(axis=1)
+        order = np.arange(len(triangleIndices))
+
+        boundsMin = []
+        boundsMax = []
+        nodeStart = []
+        nodeCount = []
+        # (begin, end, parent waiting for its second child)
+        stack = [(0, len(order), -1)]
+        while stack:
+            begin, end, parent = stack.pop()
+            node = len(nodeStart)
+            if parent >= 0:
+                nodeStart[parent] = node
+            indices = order[begin:end]
+            if len(indices):
+                boundsMin.append(triangleMin[indices].min(axis=0))
+                boundsMax.append(triangleMax[indices].max(axis=0))
+            else:
+                boundsMin.append(np.full(3, np.inf, dtype=np.float32))
+                boundsMax.append(np.full(3, -np.inf, dtype=np.float32))
+            if end - begin <= leafSize:
+                nodeStart.append(begin)
+                nodeCount.append(end - begin)
+                continue
+            nodeStart.append(0)
+            nodeCount.append(0)
+            nodeCentroids = centroids[indices]
+            axis = int(np.argmax(nodeCentroids.max(axis=0) - nodeCentroids.min(axis=0)))
+            middle = (begin + end) // 2
+            partition = np.argpartition(nodeCentroids[:, axis], middle - begin)
+            order[begin:end] = indices[partition]
+            # second child is popped after the whole first subtree is emitted
+            stack.append((middle, end, node))
+            stack.append((begin, middle, -1))
+
+        ordered = corners[order]
+        triangles = np.empty_like(ordered, dtype=np.float32)
+        triangles[:, 0] = ordered[:, 0]
+        triangles[:, 1] = ordered[:, 1] - ordered[:, 0]
+        triangles[:, 2] = ordered[:, 2] - ordered[:, 0]
+        return cls(np.array(boundsMin, dtype=np.float32).reshape(-1, 3), np.array(boundsMax, dtype=np.float32).reshape(-1, 3),
+                   np.array(nodeStart, dtype=np.int32), np.array(nodeCount, dtype=np.int32),
+                   triangles, np.ascontiguousarray(polygonIndices[order], dtype=np.int32))
+
+    def rayCast(self, origin, direction):
+        """Same results as obj.ray_cast in object space: success, location, normal, polygon index"""
+        if not len(self.triangles):
+            return False, None, None, -1
+        origin = np.array(origin, dtype=np.float64)
+        direction = np.array(direction, dtype=np.float64)
+        with np.errstate(divide="ignore"):
+            inverseDirection = np.where(direction != 0.0, 1.0 / direction, np.inf)
+
+        bestT = np.inf
+        bestTriangle = -1
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            count = self.nodeCount[node]
+            if count:
+                start = self.nodeStart[node]
+                leaf = self.triangles[start:start + count]
+                t = intersectRayTriangles(
+                    origin, direction, leaf[:, 0], leaf[:, 1], leaf[:, 2])
+                nearest = int(np.argmin(t))
+                if t[nearest] < bestT:
+                    bestT = t[nearest]
+                    bestTriangle = start + nearest
+                continue
+            # slab test both children at once, push the nearer one last
+            children = (node + 1, self.nodeStart[node])
+            with np.errstate(invalid="ignore"):
+                t1 = (self.boundsMin[children, :] - origin) * inverseDirection
+                t2 = (self.boundsMax[children, :] - origin) * inverseDirection
+            tNear = np.nanmax(np.minimum(t1, t2), axis=1)
+            tFar = np.nanmin(np.maximum(t1, t2), axis=1)
+            hit = (tFar >= np.maximum(tNear, 0.0)) & (tNear < bestT)
+            if hit[0] and hit[1]:
+                if tNear[0] <= tNear[1]:
+                    stack.extend((children[1], children[0]))
+                else:
+                    stack.extend((children[0], children[1]))
+            elif hit[0]:
+                stack.append(children[0])
+            elif hit[1]:
+                stack.append(children[1])
+
+        if bestTriangle < 0:
+            return False, None, None, -1
+        triangle = self.triangles[bestTriangle]
+        normal = np.cross(triangle[1], triangle[2])
+        normal /= np.linalg.norm(normal) or 1.0
+        return True, origin + direction * bestT, normal, int(self.polygonIndices[bestTriangle])
+
+    def rayCastMany(self, origins, directions, maxT=np.inf, anyHit: bool = False) -> tuple:
+        """R rays (R,3) in object space traced as one packet, each node is slab tested against the rays that reached it.
+        Returns the ray parameter t (R,) and the triangle index (R,) of the nearest hit closer than maxT (scalar or (R,)),
+        inf and -1 on a miss. With anyHit a ray stops at the first hit it finds, which is enough for occlusion"""
+        from .raykernel import intersectRaysTriangles
+        origins = np.asarray(origins, dtype=np.float32).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=np.float32).reshape(-1, 3)
+        rayCount = len(origins)
+        bestT = np.array(np.broadcast_to(maxT, rayCount), dtype=np.float32)
+        bestTriangle = np.full(rayCount, -1, dtype=np.int64)
+        if not len(self.triangles) or not rayCount:
+            return np.full(rayCount, np.inf, dtype=np.float32), bestTriangle
+        with np.errstate(divide="ignore"):
+            inverseDirections = np.where(directions != 0.0, 1.0 / directions, np.inf)
+
+        stack = [(0, np.arange(rayCount))]
+        while stack:
+            node, rays = stack.pop()
+            with np.errstate(invalid="ignore"):
+                t1 = (self.boundsMin[node] - origins[rays]) * inverseDirections[rays]
+                t2 = (self.boundsMax[node] - origins[rays]) * inverseDirections[rays]
+            tNear = np.nanmax(np.minimum(t1, t2), axis=1)
+            tFar = np.nanmin(np.maximum(t1, t2), axis=1)
+            reached = (tFar >= np.maximum(tNear, 0.0)) & (tNear < bestT[rays])
+            if anyHit:
+                reached &= bestTriangle[rays] < 0
+            rays = rays[reached]
+            if not len(rays):
+                continue
+            count = self.nodeCount[node]
+            if count:
+                start = self.nodeStart[node]
+                leaf = self.triangles[start:start + count]
+                t, triangle = intersectRaysTriangles(
+                    origins[rays], directions[rays], leaf[:, 0], leaf[:, 1], leaf[:, 2])
+                better = t < bestT[rays]
+                bestT[rays[better]] = t[better]
+                bestTriangle[rays[better]] = start + triangle[better]
+                continue
+            stack.append((self.nodeStart[node], rays))
+            stack.append((node + 1, rays))
+        return np.where(bestTriangle >= 0, bestT, np.inf).astype(np.float32), bestTriangle
+
+    def occluded(self, origins, directions, maxT=1.0) -> np.ndarray:
+        """Any hit query, True (R,) for rays that hit a triangle before maxT. For shadow rays with the direction
+        running from the point to the light the light sits at t = 1"""
+        return self.rayCastMany(origins, directions, maxT, anyHit=True)[1] >= 0
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from .bvh import FlatBVH, LEAF_SIZE
+
+
+#################################################################
+######################## BVH DISK CACHE #########################
+#################################################################
+
+
+BVH_CACHE_MAGIC: bytes = b"LCBVH\x00\x00\x00"
+BVH_CACHE_VERSION: int = 1
+BVH_CACHE_EXTENSION: str = ".lcbvh"
+# magic, version, node count, triangle count, padded to the alignment
+BVH_CACHE_HEADER = struct.Struct("<8sIII")
+BVH_CACHE_ALIGNMENT: int = 64
+
+# array name, dtype, values per node or triangle, counted by "nodes" or "triangles"
+BVH_CACHE_LAYOUT: tuple = (
+    ("boundsMin", np.float32, 3, "nodes"),
+    ("boundsMax", np.float32, 3, "nodes"),
+    ("nodeStart", np.int32, 1, "nodes"),
+    ("nodeCount", np.int32, 1, "nodes"),
+    ("triangles", np.float32, 9, "triangles"),
+    ("polygonIndices", np.int32, 1, "triangles"),
+)
+
+
+def MeshContentHash(vertices: np.ndarray, triangleIndices: np.ndarray, polygonIndices: np.ndarray) -> str:
+    """Hash of everything the BVH is built from, so a cached file is only reused for identical geometry"""
+    contentHash = hashlib.blake2b(digest_size=20)
+    contentHash.update(struct.pack("<III", BVH_CACHE_VERSION, LEAF_SIZE, len(vertices)))
+    contentHash.update(np.ascontiguousarray(vertices, dtype=np.float32).data)
+    contentHash.update(np.ascontiguousarray(triangleIndices, dtype=np.int32).data)
+    contentHash.update(np.ascontiguousarray(polygonIndices, dtype=np.int32).data)
+    return contentHash.hexdigest()
+
+
+def _align(offset: int) -> int:
+    return (offset + BVH_CACHE_ALIGNMENT - 1) // BVH_CACHE_ALIGNMENT * BVH_CACHE_ALIGNMENT
+
+
+def _layoutOffsets(nodeCount: int, triangleCount: int):
+    """Yields name, dtype, shape and byte offset of every array in the file"""
+    offset = _align(BVH_CACHE_HEADER.size)
+    counts = {"nodes": nodeCount, "triangles": triangleCount}
+    for name, dtype, width, countedBy in BVH_CACHE_LAYOUT:
+        shape = (counts[countedBy], width) if width > 1 else (counts[countedBy],)
+        yield name, dtype, shape, offset
+        offset = _align(offset + counts[countedBy] * width * np.dtype(dtype).itemsize)
+
+
+class BVHDiskCache:
+    """Flattened BVHs stored as one memory mappable file per mesh content hash, least recently used files are evicted above sizeLimit bytes"""
+
+    def __init__(self, directory: str, sizeLimit: int):
+        self.directory = directory
+        self.sizeLimit = sizeLimit
+
+    def path(self, contentHash: str) -> str:
+        return os.path.join(self.directory, contentHash + BVH_CACHE_EXTENSION)
+
+    def load(self, contentHash: str):
+        """Returns a FlatBVH backed by a read only memory map, or None when not cached or unreadable"""
+        path = self.path(contentHash)
+        try:
+            data = np.memmap(path, dtype=np.uint8, mode="r")
+        except (OSError, ValueError):
+            return None
+        if len(data) < BVH_CACHE_HEADER.size:
+            return None
+        magic, version, nodeCount, triangleCount = BVH_CACHE_HEADER.unpack_from(data, 0)
+        if magic != BVH_CACHE_MAGIC or version != BVH_CACHE_VERSION:
+            return None
+        arrays = {}
+        for name, dtype, shape, offset in _layoutOffsets(nodeCount, triangleCount):
+            count = int(np.prod(shape))
+            if offset + count * np.dtype(dtype).itemsize > len(data):
+                return None
+            arrays[name] = np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(shape)
+        arrays["triangles"] = arrays["triangles"].reshape(-1, 3, 3)
+        # mark as recently used, a read only cache directory only loses the eviction order
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return FlatBVH(**arrays)
+
+    def store(self, contentHash: str, bvh: FlatBVH):
+        """Writes to a temporary file of its own and renames it, so concurrent writers of the same mesh never mix"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(contentHash)
+        nodeCount = len(bvh.nodeCount)
+        triangleCount = len(bvh.triangles)
+        descriptor, temporaryPath = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(BVH_CACHE_HEADER.pack(BVH_CACHE_MAGIC, BVH_CACHE_VERSION, nodeCount, triangleCount))
+                for name, dtype, shape, offset in _layoutOffsets(nodeCount, triangleCount):
+                    file.seek(offset)
+                    file.write(np.ascontiguousarray(getattr(bvh, name), dtype=dtype).tobytes())
+                # empty trailing arrays write nothing, the file still has to reach their offsets for load
+                file.truncate(max(file.tell(), offset))
+            os.replace(temporaryPath, path)
+        except BaseException:
+            try:
+                os.remove(temporaryPath)
+            except OSError:
+                pass
+            raise
+        self.evict(keep=path)
+
+    def evict(self, keep: str = ""):
+        """Deletes the least recently used files until the cache fits into sizeLimit"""
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(BVH_CACHE_EXTENSION)]
+        except OSError:
+            return
+        files = sorted(((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries))
+        totalSize = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if totalSize <= self.sizeLimit:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            totalSize -= size
@@ -0,0 +1,160 @@
+import mathutils
+import numpy as np
+import bpy
+
+from .acceleration import GetObjectBVH, GetObjectMeshAdjacencyInBackground
+from .functions import GetAccelerationSettings, GetCursorRay, raycastCursor
+from .meshdata import GetEvaluatedFaceCount
+from .profiling import profiled, profiler
+from .raycastfilter import GetRaycastCandidates
+
+
+#################################################################
+####################### COHERENT RAYCAST ########################
+#################################################################
+
+
+# triangle rings around the last hit that are tested before falling back to the scene query
+NEIGHBOURHOOD_RINGS: int = 2
+# relative change of the hit distance between events that counts as crossing a silhouette
+DEPTH_JUMP_RATIO: float = 0.25
+# every n-th event does the full scene query even when the shortcut hit, bounds how long a missed occluder survives
+REVALIDATE_INTERVAL: int = 16
+# fraction of the hit distance left out of the self occlusion test, so the hit triangle does not occlude itself
+SELF_OCCLUSION_MARGIN: float = 1e-4
+
+
+class CoherentRaycaster:
+    """raycastCursor for consecutive cursor positions of one modal drag. The triangles around the last hit are tried
+    first, the full scene query only runs on a miss, when the ray could pass another objects bounds or another part
+    of the hit mesh in front of the hit, when the depth jumps or every REVALIDATE_INTERVAL events. Until the adjacency
+    of the hit mesh is built in the background, and for meshes of maximumFaces or more, every event is a full query.
+    Objects are assumed not to move while dragging"""
+
+    def __init__(self, maximumFaces: int = 0):
+        # 0 means no limit
+        self.maximumFaces: int = maximumFaces
+        # original object pointer => whether the shortcut may be used on the object
+        self.shortcutObjects: dict = {}
+        self.hitObject: bpy.types.Object = None
+        self.hitTriangle: int = -1
+        self.hitBoundsIndex: int = -1
+        self.hitDistance: float = 0.0
+        self.sinceValidation: int = 0
+        # world bounds of all visible meshes, filled on the first full query
+        self.boundsIndices: dict = {}
+        self.boundsMin: np.ndarray = None
+        self.boundsMax: np.ndarray = None
+        # statistics
+        self.shortcutHits: int = 0
+        self.fullQueries: int = 0
+
+    @property
+    def shortcutRate(self) -> float:
+        total = self.shortcutHits + self.fullQueries
+        return self.shortcutHits / total if total else 0.0
+
+    def summary(self) -> str:
+        return f"{self.shortcutHits} of {self.shortcutHits + self.fullQueries} pivot raycasts near last hit ({self.shortcutRate:.0%})"
+
+    def collectBounds(self, context: bpy.types.Context):
+        objects = GetRaycastCandidates(context)
+        self.boundsIndices = {obj.as_pointer(): i for i, obj in enumerate(objects)}
+        boundsMin = np.empty((len(objects), 3))
+        boundsMax = np.empty((len(objects), 3))
+        for i, obj in enumerate(objects):
+            mx = obj.matrix_world
+            corners = np.array([mx @ mathutils.Vector(corner) for corner in obj.bound_box])
+            boundsMin[i] = corners.min(axis=0)
+            boundsMax[i] = corners.max(axis=0)
+        self.boundsMin = boundsMin
+        self.boundsMax = boundsMax
+
+    def allowsShortcut(self, context: bpy.types.Context, obj: bpy.types.Object) -> bool:
+        key = obj.as_pointer()
+        allowed = self.shortcutObjects.get(key)
+        if allowed is None:
+            allowed = not self.maximumFaces or GetEvaluatedFaceCount(context, obj) < self.maximumFaces
+            self.shortcutObjects[key] = allowed
+        return allowed
+
+    def mayBeOccluded(self, origin, direction, distance: float) -> bool:
+        """True when the ray passes the bounds of another mesh before reaching the hit"""
+        origin = np.asarray(origin, dtype=np.float64)
+        direction = np.asarray(direction, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inverseDirection = np.where(direction != 0.0, 1.0 / direction, np.inf)
+            t1 = (self.boundsMin - origin) * inverseDirection
+            t2 = (self.boundsMax - origin) * inverseDirection
+        tNear = np.nanmax(np.minimum(t1, t2), axis=1)
+        tFar = np.nanmin(np.maximum(t1, t2), axis=1)
+        passed = (tFar >= np.maximum(tNear, 0.0)) & (tNear < distance)
+        passed[self.hitBoundsIndex] = False
+        return bool(passed.any())
+
+    def occludedBySelf(self, context: bpy.types.Context, origin, location) -> bool:
+        """True when the hit mesh has a triangle between the object space ray origin and a hit location found in the
+        neighbourhood, a fold of the same mesh that mayBeOccluded cannot see. Uses the same BVH as raycastCursor"""
+        direction = mathutils.Vector(location) - origin
+        accelerationSettings = GetAccelerationSettings(context)
+        bvh = GetObjectBVH(context, self.hitObject, accelerationSettings) if accelerationSettings else None
+        if bvh:
+            return bool(bvh.occluded((origin,), (direction,), 1.0 - SELF_OCCLUSION_MARGIN)[0])
+        success, *_ = self.hitObject.ray_cast(
+            origin=origin, direction=direction, distance=direction.length * (1.0 - SELF_OCCLUSION_MARGIN))
+        return success
+
+    @profiled("coherentRaycast")
+    def raycast(self, context: bpy.types.Context, mousepos: tuple):
+        """Same results as raycastCursor: hit object, hit location, hit normal, hit index and hit distance"""
+        if self.hitObject is not None and self.sinceValidation < REVALIDATE_INTERVAL:
+            result = self.raycastNearLastHit(context, mousepos)
+            if result is not None:
+                self.shortcutHits += 1
+                self.sinceValidation += 1
+                profiler.count("pivot.shortcutHits")
+                return result
+
+        self.fullQueries += 1
+        self.sinceValidation = 0
+        profiler.count("pivot.fullQueries")
+        if self.boundsMin is None:
+            self.collectBounds(context)
+        hitObj, hitLocation, hitNormal, hitIndex, hitDistance = raycastCursor(context, mousepos)
+        self.hitBoundsIndex = self.boundsIndices.get(hitObj.as_pointer(), -1) if hitObj else -1
+        adjacency = None
+        if self.hitBoundsIndex >= 0 and self.allowsShortcut(context, hitObj):
+            adjacency = GetObjectMeshAdjacencyInBackground(context, hitObj)
+        if adjacency is None:
+            self.hitObject = None
+        else:
+            self.hitObject = hitObj
+            self.hitTriangle = adjacency.triangleOfPolygon(hitIndex)
+            self.hitDistance = hitDistance
+        return hitObj, hitLocation, hitNormal, hitIndex, hitDistance
+
+    def raycastNearLastHit(self, context: bpy.types.Context, mousepos: tuple):
+        origin_3d, vector_3d = GetCursorRay(context, mousepos)
+        mx = self.hitObject.matrix_world
+        mxi = mx.inverted_safe()
+        adjacency = GetObjectMeshAdjacencyInBackground(context, self.hitObject)
+        if adjacency is None:
+            return None
+        triangles = adjacency.neighbourhood((self.hitTriangle,), NEIGHBOURHOOD_RINGS)
+        localOrigin = mxi @ origin_3d
+        success, location, normal, index, triangle = adjacency.rayCast(
+            localOrigin, mxi.to_3x3() @ vector_3d, triangles)
+        if not success:
+            return None
+        hitLocation: mathutils.Vector = mx @ mathutils.Vector(location)
+        hitDistance: float = (hitLocation - origin_3d).length
+        if abs(hitDistance - self.hitDistance) > self.hitDistance * DEPTH_JUMP_RATIO:
+            return None
+        if self.mayBeOccluded(origin_3d, vector_3d, hitDistance):
+            return None
+        if self.occludedBySelf(context, localOrigin, location):
+            profiler.count("pivot.selfOccluded")
+            return None
+        self.hitTriangle = triangle
+        self.hitDistance = hitDistance
+        return self.hitObject, hitLocation, mx.to_3x3() @ mathutils.Vector(normal), index, hitDistance
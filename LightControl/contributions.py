@@ -0,0 +1,178 @@
+"""Sample x light irradiance matrix with running totals, so a changed light costs one column instead of all lights"""
+import numpy as np
+
+from .irradiance import irradianceFromLight
+
+
+#################################################################
+###################### CONTRIBUTION CACHE #######################
+#################################################################
+
+
+# recompute the totals from the matrix after this many column swaps, subtracting and adding floats drifts
+TOTALS_REFRESH_INTERVAL: int = 1024
+
+
+class ContributionCache:
+    """Irradiance of every light at every sample as a float32 matrix (samples x lights) plus the per sample totals.
+    Samples have stable ids, lights are keyed by any hashable (the add-on uses object pointers) and remember the
+    irradianceFromLight parameters they were computed with, so added samples can be filled in.
+    Above maxBytes the samples that were queried least recently are evicted.
+    occlusion(parameters, sampleIds, positions, normals) -> (N,) bool can zero the samples a light does not reach"""
+
+    def __init__(self, maxBytes: int, occlusion=None):
+        self.maxBytes = maxBytes
+        self.occlusion = occlusion
+        self.sampleIds = np.empty(0, dtype=np.int64)
+        self.positions = np.empty((0, 3), dtype=np.float32)
+        self.normals = np.empty((0, 3), dtype=np.float32)
+        self.lastUsed = np.empty(0, dtype=np.int64)
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        self.totals = np.empty(0, dtype=np.float64)
+        # light key => column, light key => irradianceFromLight parameters
+        self.columns: dict = {}
+        self.parameters: dict = {}
+        # light key => rows (S,) bool still holding an older placement of the light
+        self.stale: dict = {}
+        self.nextSampleId: int = 0
+        self.clock: int = 0
+        self.swapsSinceRefresh: int = 0
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.sampleIds, self.positions, self.normals, self.lastUsed, self.matrix, self.totals, *self.stale.values())
+        return sum(array.nbytes for array in arrays)
+
+    def bytesPerSample(self, lightCount: int) -> int:
+        return 8 + 12 + 12 + 8 + 4 * lightCount + 8
+
+    def _computeColumn(self, key, sampleIds: np.ndarray, positions: np.ndarray, normals: np.ndarray) -> np.ndarray:
+        column = irradianceFromLight(positions, normals, *self.parameters[key])
+        if self.occlusion is not None:
+            # only lit samples need a shadow ray
+            lit = column > 0.0
+            column[lit] = np.where(self.occlusion(
+                self.parameters[key], sampleIds[lit], positions[lit], normals[lit]), 0.0, column[lit])
+        return column
+
+    def setLight(self, key, parameters: tuple, sampleIds: np.ndarray = None):
+        """Adds or updates one light, only its column is computed and swapped into the totals.
+        With sampleIds only those rows are computed, the others are marked stale and computed when queried"""
+        self.parameters[key] = parameters
+        column = self.columns.get(key)
+        if column is None:
+            column = len(self.columns)
+            self.columns[key] = column
+            self.matrix = np.hstack((self.matrix, np.zeros((len(self.matrix), 1), dtype=np.float32)))
+        if sampleIds is None:
+            self.stale.pop(key, None)
+            self._swapRows(key, np.arange(len(self.sampleIds)))
+            return
+        rows = self.rows(sampleIds)
+        rows = rows[rows >= 0]
+        stale = np.ones(len(self.sampleIds), dtype=bool)
+        stale[rows] = False
+        self.stale[key] = stale
+        self._swapRows(key, rows)
+
+    def _swapRows(self, key, rows: np.ndarray):
+        column = self.columns[key]
+        newValues = self._computeColumn(key, self.sampleIds[rows], self.positions[rows], self.normals[rows])
+        self.totals[rows] += newValues
+        self.totals[rows] -= self.matrix[rows, column]
+        self.matrix[rows, column] = newValues
+        self.swapsSinceRefresh += 1
+        if self.swapsSinceRefresh >= TOTALS_REFRESH_INTERVAL:
+            self.refreshTotals()
+
+    def _refreshStaleRows(self, rows: np.ndarray):
+        for key in list(self.stale):
+            stale = self.stale[key]
+            staleRows = rows[stale[rows]]
+            if len(staleRows):
+                self._swapRows(key, staleRows)
+                stale[staleRows] = False
+            if not stale.any():
+                del self.stale[key]
+
+    def removeLight(self, key):
+        column = self.columns.pop(key, None)
+        if column is None:
+            return
+        del self.parameters[key]
+        self.stale.pop(key, None)
+        self.totals -= self.matrix[:, column]
+        self.matrix = np.delete(self.matrix, column, axis=1)
+        for otherKey, otherColumn in self.columns.items():
+            if otherColumn > column:
+                self.columns[otherKey] = otherColumn - 1
+
+    def refreshTotals(self):
+        self.totals = self.matrix.sum(axis=1, dtype=np.float64)
+        self.swapsSinceRefresh = 0
+
+    def addSamples(self, positions: np.ndarray, normals: np.ndarray) -> np.ndarray:
+        """Adds samples with the contribution of every known light, returns their ids"""
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        normals = np.asarray(normals, dtype=np.float32).reshape(-1, 3)
+        self.evict(len(positions))
+        ids = np.arange(self.nextSampleId, self.nextSampleId + len(positions), dtype=np.int64)
+        self.nextSampleId += len(positions)
+        rows = np.zeros((len(positions), len(self.columns)), dtype=np.float32)
+        for key, column in self.columns.items():
+            rows[:, column] = self._computeColumn(key, ids, positions, normals)
+        self.clock += 1
+        self.sampleIds = np.concatenate((self.sampleIds, ids))
+        self.positions = np.concatenate((self.positions, positions))
+        self.normals = np.concatenate((self.normals, normals))
+        self.lastUsed = np.concatenate((self.lastUsed, np.full(len(positions), self.clock, dtype=np.int64)))
+        self.matrix = np.concatenate((self.matrix, rows))
+        self.totals = np.concatenate((self.totals, rows.sum(axis=1, dtype=np.float64)))
+        for key, stale in self.stale.items():
+            self.stale[key] = np.concatenate((stale, np.zeros(len(positions), dtype=bool)))
+        return ids
+
+    def evict(self, incomingSamples: int = 0):
+        """Drops the least recently queried samples until incomingSamples more fit into maxBytes"""
+        perSample = self.bytesPerSample(len(self.columns))
+        allowed = max(0, self.maxBytes // perSample - incomingSamples)
+        excess = len(self.sampleIds) - allowed
+        if excess <= 0:
+            return
+        keep = np.sort(np.argsort(self.lastUsed, kind="stable")[excess:])
+        self.sampleIds = self.sampleIds[keep]
+        self.positions = self.positions[keep]
+        self.normals = self.normals[keep]
+        self.lastUsed = self.lastUsed[keep]
+        self.matrix = self.matrix[keep]
+        self.totals = self.totals[keep]
+        for key, stale in self.stale.items():
+            self.stale[key] = stale[keep]
+
+    def rows(self, sampleIds: np.ndarray) -> np.ndarray:
+        """Row of each sample id, -1 for evicted ones. Ids are ascending so this is a binary search"""
+        sampleIds = np.asarray(sampleIds, dtype=np.int64)
+        if not len(self.sampleIds):
+            return np.full(len(sampleIds), -1, dtype=np.int64)
+        rows = np.minimum(np.searchsorted(self.sampleIds, sampleIds), len(self.sampleIds) - 1)
+        return np.where(self.sampleIds[rows] == sampleIds, rows, -1)
+
+    def query(self, sampleIds: np.ndarray) -> np.ndarray:
+        """Total irradiance (N,) float32 at the samples, 0 for evicted ones, and marks them as recently used"""
+        rows = self.rows(sampleIds)
+        found = rows >= 0
+        self._refreshStaleRows(rows[found])
+        self.clock += 1
+        self.lastUsed[rows[found]] = self.clock
+        totals = np.zeros(len(rows), dtype=np.float32)
+        totals[found] = self.totals[rows[found]]
+        return totals
+
+    def contribution(self, key, sampleIds: np.ndarray) -> np.ndarray:
+        """The column of one light at the samples, 0 for evicted ones"""
+        rows = self.rows(sampleIds)
+        found = rows >= 0
+        self._refreshStaleRows(rows[found])
+        column = np.zeros(len(rows), dtype=np.float32)
+        column[found] = self.matrix[rows[found], self.columns[key]]
+        return column
@@ -0,0 +1,100 @@
+"""Orbit, pivot and look at maths for N lights at once, on NumPy arrays and without bpy or mathutils.
+Vectors are (N,3) arrays, a single (3,) vector is treated as N = 1 and comes back as (3,).
+Euler rotations are XYZ order, like the pivot empties the add-on creates"""
+import numpy as np
+
+
+#################################################################
+######################## CORE MATH ##############################
+#################################################################
+
+
+HALF_PI: float = np.pi * 0.5
+
+# facing axis => (x rotation, offset added to the elevation), see lookAtRotation
+FACING_AXIS_OFFSETS: dict = {
+    "": (0.0, 0.0),
+    "x": (0.0, np.pi),
+    "y": (HALF_PI, -HALF_PI),
+    "z": (0.0, -HALF_PI),
+    "-x": (0.0, 0.0),
+    "-y": (HALF_PI, HALF_PI),
+    "-z": (0.0, HALF_PI),
+}
+
+
+def _asVectors(values) -> tuple:
+    """Returns the values as (N,3) float64 and whether a single vector was passed"""
+    array = np.asarray(values, dtype=np.float64)
+    if array.ndim == 1:
+        return array.reshape(1, 3), True
+    return array, False
+
+
+def _result(array: np.ndarray, single: bool) -> np.ndarray:
+    return array[0] if single else array
+
+
+def sign(values) -> np.ndarray:
+    """1.0 for values >= 0.0, else -1.0"""
+    return np.where(np.asarray(values) >= 0.0, 1.0, -1.0)
+
+
+def intensityByInverseSquareLaw(referenceIntensity, referenceDistance, newDistance) -> np.ndarray:
+    """Intensity that keeps the illuminance at the reference distance when the light moves to the new distance"""
+    ratio = np.asarray(newDistance, dtype=np.float64) / np.asarray(referenceDistance, dtype=np.float64)
+    return np.asarray(referenceIntensity, dtype=np.float64) * ratio * ratio
+
+
+def vectorToAzimuthElevation(vectors) -> np.ndarray:
+    """Returns (0, elevation, azimuth) per vector, the XYZ euler that turns +X into the vector"""
+    vectors, single = _asVectors(vectors)
+    azimuth = np.arctan2(vectors[:, 1], vectors[:, 0])
+    horizontalLength = np.hypot(vectors[:, 0], vectors[:, 1])
+    # mathutils Vector.angle falls back to 0.0 for the zero length flattened vector of vertical vectors
+    elevation = np.where(horizontalLength > 0.0, -np.arctan2(vectors[:, 2], horizontalLength), 0.0)
+    return _result(np.stack((np.zeros_like(azimuth), elevation, azimuth), axis=1), single)
+
+
+def lookAtRotation(vectors, facingAxis: str = "") -> np.ndarray:
+    """XYZ eulers that make the facing axis (x,y,z or -x,-y,-z) point along each vector, "" is the same as -x"""
+    vectors, single = _asVectors(vectors)
+    xRotation, elevationOffset = FACING_AXIS_OFFSETS.get(facingAxis, (0.0, 0.0))
+    rotations = vectorToAzimuthElevation(vectors)
+    rotations[:, 0] = xRotation
+    rotations[:, 1] += elevationOffset
+    # straight up and straight down are handled apart for every facing axis
+    up = np.all(vectors == (0.0, 0.0, 1.0), axis=1)
+    down = np.all(vectors == (0.0, 0.0, -1.0), axis=1)
+    rotations[up] = (0.0, -HALF_PI, 0.0)
+    rotations[down] = (0.0, HALF_PI, 0.0)
+    return _result(rotations, single)
+
+
+def orbitByDelta(rotations, delta, rotationSpeed: float, slowChange: bool, slowChangeSpeed: float) -> np.ndarray:
+    """Adds azimuth (delta x) and elevation (delta y) to XYZ pivot eulers, elevation is clamped to +-90 degrees"""
+    rotations, single = _asVectors(rotations)
+    step = np.asarray(delta, dtype=np.float64) * rotationSpeed
+    if slowChange:
+        step = step * slowChangeSpeed
+    step = np.broadcast_to(step, rotations.shape)
+    orbited = rotations.copy()
+    orbited[:, 1] = np.clip(rotations[:, 1] - step[:, 1], -HALF_PI, HALF_PI)
+    orbited[:, 2] = rotations[:, 2] + step[:, 0]
+    return _result(orbited, single)
+
+
+def pivotByHit(lightPositions, pivotPositions, hitLocations, lightLocalPositions) -> tuple:
+    """Moves pivots to the hit locations keeping the lights where they are in the world.
+    Returns the new pivot positions, pivot eulers (facing +X towards the light) and light positions local to the pivot"""
+    lightPositions, single = _asVectors(lightPositions)
+    pivotPositions, _ = _asVectors(pivotPositions)
+    hitLocations, _ = _asVectors(hitLocations)
+    lightLocalPositions, _ = _asVectors(lightLocalPositions)
+    hitToLight = lightPositions - hitLocations
+    previousDistance = np.linalg.norm(lightPositions - pivotPositions, axis=1)
+    newDistance = np.linalg.norm(hitToLight, axis=1)
+    scalingRatio = newDistance / previousDistance
+    newPivotPositions = np.broadcast_to(hitLocations, lightPositions.shape).copy()
+    return (_result(newPivotPositions, single), _result(lookAtRotation(hitToLight), single),
+            _result(lightLocalPositions * scalingRatio[:, None], single))
@@ -0,0 +1,254 @@
+import sys
+
+import mathutils
+import blf
+import gpu
+from gpu_extras.batch import batch_for_shader
+
+from .functions import boolToFloat
+from .profiling import profiled, profiler
+
+
+#################################################################
+######################## DRAWING ################################
+#################################################################
+
+
+@profiled("drawOperationOptions")
+def drawOperationOptions(self, context):
+    # draw Heatmap below the labels
+    if self.heatmap and self.showHeatmap:
+        drawHeatmap(self.heatmap)
+
+    activeOperationPos: mathutils.Vector = mathutils.Vector((80, 350, 0))
+    availableOperationPos: mathutils.Vector = mathutils.Vector((80, 200, 0))
+    font_id: int = 0
+
+    currentOperation = [
+        {"Header": "Light Size", "Description": "Hold S move Mouse Left/Right",
+            "Value": self.lightSize, "ActivationBool": self.changeLightSize},
+        {"Header": "Light Distance", "Description": "Hold D move Mouse Left/Right",
+            "Value": self.lightDistance, "ActivationBool": self.changeLightDistance},
+        {"Header": "Light Brightness", "Description": "Hold B move Mouse Left/Right",
+            "Value": self.lightBrightness, "ActivationBool": self.changeLightBrightness},
+        {"Header": "Light Angle", "Description": "Hold A move Mouse Left/Right",
+            "Value": self.lightAngle, "ActivationBool": self.changeLightAngle},
+        {"Header": "Light Pivot", "Description": "Hold CTRL or CTRL+SHIFT or CTRL+ALT or CTRL+ALT+SHIFT",
+            "Value": self.lightPivot, "ActivationBool": self.changeLightPivot},
+        {"Header": "Light Color", "Description": "Hold C move Mouse Up/Down (Saturation) and Left/Right (Hue)",
+            "Value": self.lightColor, "ActivationBool": self.changeLightColor},
+        {"Header": "Orbit", "Description": "Hold Space/R move Mouse Left/Right",
+            "Value": self.lightOrbit, "ActivationBool": self.changeLightOrbit},
+        {"Header": "Tilt", "Description": "Hold T move Mouse Left/Right",
+            "Value": self.lightTilt, "ActivationBool": self.changeLightTilt}
+    ]
+
+    stopLoop: bool = False
+    # Draw current Operation Dictionary
+    for operation in currentOperation:
+        for key, val in operation.items():
+            if operation['ActivationBool'] == True:
+                if key == 'Value':
+                    blf.color(font_id, 1.0, 1.0, 1.0, 1.0)  # white
+                    blf.size(font_id, 32, 72)
+                    blf.position(font_id, activeOperationPos.x,
+                                 activeOperationPos.y + 60, 0.0)
+                    blf.draw(font_id, str(val))
+                if key == 'Header':
+                    blf.color(font_id, 1.0, 1.0, 0.0, 1.0)  # yellow
+                    blf.size(font_id, 28, 72)
+                    blf.position(font_id, activeOperationPos.x,
+                                 activeOperationPos.y, 0.0)
+                    blf.draw(font_id, str(val))
+                if key == 'Description':
+                    lineSpacing: float = 24.0
+                    baseOffset: float = 8.0
+                    blf.color(font_id, 1.0, 1.0, 1.0, 0.5)  # white 50 trans
+                    blf.size(font_id, 18, 72)
+                    blf.position(font_id, activeOperationPos.x,
+                                 activeOperationPos.y - lineSpacing - baseOffset, 0.0)
+                    blf.draw(font_id, str(val))
+                    blf.position(font_id, activeOperationPos.x,
+                                 activeOperationPos.y - (lineSpacing * 2.0) - baseOffset, 0.0)
+                    blf.draw(font_id, "Hold Shift for Slow Operation")
+                stopLoop = True
+        if stopLoop:
+            break
+
+    availableOperations = [
+        {"Key": "SPACE / R", "Description": "Orbit", "AvailableLightType": {
+            'AREA', 'POINT', 'SPOT', 'SUN'}},
+        {"Key": "CTRL", "Description": "Pivot",
+            "AvailableLightType": {'AREA', 'POINT', 'SPOT', 'SUN'}},
+
+        {"Key": "", "Description": "",
+            "AvailableLightType": {'AREA', 'POINT', 'SPOT', 'SUN'}},  # Blank Entry
+
+        {"Key": "C", "Description": "Color", "AvailableLightType": {
+            'AREA', 'POINT', 'SPOT', 'SUN'}},
+        {"Key": "A", "Description": "Angle",
+            "AvailableLightType": {'AREA', 'SPOT', 'SUN'}},
+        {"Key": "D", "Description": "Distance",
+            "AvailableLightType": {'AREA', 'POINT', 'SPOT'}},
+        {"Key": "B", "Description": "Brightness",
+            "AvailableLightType": {'AREA', 'POINT', 'SPOT', 'SUN'}},
+        {"Key": "S", "Description": "Size",
+            "AvailableLightType": {'AREA', 'POINT', 'SPOT'}},
+        {"Key": "T", "Description": "Tilt",
+            "AvailableLightType": {'AREA', 'SPOT'}},
+
+        {"Key": "", "Description": "", "AvailableLightType": {
+            'AREA', 'POINT', 'SPOT', 'SUN'}},  # Blank Entry
+
+        {"Key": "V", "Description": "Toggle Gizmos",
+            "AvailableLightType": {'AREA', 'POINT', 'SPOT', 'SUN'}},
+        {"Key": "H", "Description": "Toggle Heatmap",
+            "AvailableLightType": {'AREA', 'POINT', 'SPOT', 'SUN'}},
+        {"Key": "O", "Description": "Toggle Orbit Snap",
+            "AvailableLightType": {'AREA', 'POINT', 'SPOT', 'SUN'}},
+        {"Key": "P", "Description": "Save Orbit Preset",
+            "AvailableLightType": {'AREA', 'POINT', 'SPOT', 'SUN'}}
+    ]
+
+    blf.size(font_id, 16, 72)
+    spacing: float = 18
+    counter: int = 0
+    # Draw available Operation Dictionary
+    for operation in availableOperations:
+        for key, val in operation.items():
+            offset: float = counter * spacing
+            increaseCounter: float = boolToFloat(
+                self.currentLightType in operation['AvailableLightType'])
+            if self.currentLightType in operation['AvailableLightType']:
+                if key == 'Key':
+                    blf.color(font_id, 1.0, 1.0, 0.5, 0.7)  # white 50 trans
+                    blf.position(font_id, availableOperationPos.x,
+                                 availableOperationPos.y - offset, 0.0)
+                    blf.draw(font_id, str(val))
+                if key == 'Description':
+                    blf.color(font_id, 1.0, 1.0, 1.0, 0.5)  # white 50 trans
+                    blf.position(font_id, availableOperationPos.x +
+                                 80.0, availableOperationPos.y - offset, 0.0)
+                    blf.draw(font_id, str(val))
+        counter += increaseCounter
+
+    # draw ACTIVE
+    width = context.area.width
+    height = context.area.height
+    offset = 25
+    rectangleHeight = 40
+    blf.color(font_id, 1.0, 1.0, 1.0, 1.0)  # white
+    blf.size(font_id, 32, 72)
+    textWidth = blf.dimensions(0, "EDITING")[0]
+    blf.position(font_id, width - textWidth - offset,
+                 rectangleHeight + offset, 0.0)
+    blf.draw(font_id, "EDITING")
+    drawRectangle(width - textWidth - offset, offset, textWidth,
+                  rectangleHeight / 2, (1.0, 1.0, 1.0, 1.0))
+
+    # draw Approve, Cancel
+    blf.color(font_id, 1.0, 1.0, 1.0, 0.5)  # white 50 trans
+    blf.size(font_id, 12, 72)
+    extraOffset = 32.0
+    blf.position(font_id, width - offset - textWidth,
+                 rectangleHeight + offset + extraOffset, 0.0)
+    blf.draw(font_id, "CANCEL : RIGHT CLICK")  # MOUSE_RMB
+    blf.position(font_id, width - offset - textWidth,
+                 rectangleHeight + offset + extraOffset + 16.0, 0.0)
+    blf.draw(font_id, "APPROVE : LEFT CLICK")  # MOUSE_LMB
+
+    # draw Background BVH Build Progress
+    acceleration = sys.modules.get(__package__ + ".acceleration")
+    if acceleration:
+        finished, submitted = acceleration.GetBVHBuildProgress()
+        if submitted:
+            blf.color(font_id, 1.0, 1.0, 0.0, 0.8)  # yellow
+            blf.size(font_id, 12, 72)
+            blf.position(font_id, offset, offset + 16.0, 0.0)
+            blf.draw(font_id, f"Building Raycast Acceleration {finished} / {submitted}")
+
+    # draw Profiling HUD
+    if profiler.enabled and profiler.showHUD:
+        blf.color(font_id, 0.5, 1.0, 0.5, 0.8)  # green
+        blf.size(font_id, 12, 72)
+        blf.position(font_id, offset, offset, 0.0)
+        blf.draw(font_id, profiler.summary())
+
+
+_uniformColorShader = None
+
+
+def getUniformColorShader():
+    """Builtin shader is fetched on the first draw and reused afterwards"""
+    global _uniformColorShader
+    if _uniformColorShader is None:
+        _uniformColorShader = gpu.shader.from_builtin('2D_UNIFORM_COLOR')
+    return _uniformColorShader
+
+
+def drawRectangle(x: int, y: int, width: int, height: int, color: tuple[float, float, float, float]):
+    vertices = (
+        (x, y), (x+width, y),
+        (x, y+height), (x+width, y+height))
+
+    indices = (
+        (0, 1, 2), (2, 1, 3))
+
+    shader = getUniformColorShader()
+    batch = batch_for_shader(
+        shader, 'TRIS', {"pos": vertices}, indices=indices)
+
+    shader.bind()
+    shader.uniform_float("color", color)
+    batch.draw(shader)
+
+
+_uniformColorShader3D = None
+
+# axis direction and color, drawn like the arrows of the pivot empty
+PIVOT_FRAME_AXES: tuple = (
+    ((1.0, 0.0, 0.0), (1.0, 0.2, 0.3, 1.0)),
+    ((0.0, 1.0, 0.0), (0.5, 0.9, 0.1, 1.0)),
+    ((0.0, 0.0, 1.0), (0.2, 0.5, 1.0, 1.0)),
+)
+
+
+def drawPivotFrame(self, context):
+    """Draws the axes of the PivotFrame in place of the temporary pivot empty"""
+    global _uniformColorShader3D
+    if _uniformColorShader3D is None:
+        _uniformColorShader3D = gpu.shader.from_builtin('3D_UNIFORM_COLOR')
+    pivotFrame = self.pivotObject
+    matrix: mathutils.Matrix = pivotFrame.matrix_world
+    origin: mathutils.Vector = matrix.to_translation()
+    shader = _uniformColorShader3D
+    shader.bind()
+    for axis, color in PIVOT_FRAME_AXES:
+        end: mathutils.Vector = matrix @ (mathutils.Vector(axis) * pivotFrame.empty_display_size)
+        batch = batch_for_shader(shader, 'LINES', {"pos": (origin, end)})
+        shader.uniform_float("color", color)
+        batch.draw(shader)
+
+
+_flatColorShader = None
+
+
+def drawHeatmap(heatmap):
+    """Samples of the HeatmapOverlay as colored points at their region pixels"""
+    global _flatColorShader
+    if not len(heatmap.colors):
+        return
+    if _flatColorShader is None:
+        # renamed in Blender 4.0
+        try:
+            _flatColorShader = gpu.shader.from_builtin('FLAT_COLOR')
+        except ValueError:
+            _flatColorShader = gpu.shader.from_builtin('2D_FLAT_COLOR')
+    batch = batch_for_shader(_flatColorShader, 'POINTS', {
+                             "pos": heatmap.pixels, "color": heatmap.colors})
+    gpu.state.blend_set('ALPHA')
+    gpu.state.point_size_set(max(1.0, heatmap.spacing * 0.5))
+    _flatColorShader.bind()
+    batch.draw(_flatColorShader)
+    gpu.state.point_size_set(1.0)
+    gpu.state.blend_set('NONE')
@@ -0,0 +1,773 @@
+import sys
+from math import degrees
+import bl_math
+import mathutils
+import bpy
+
+from .profiling import profiled, profiler
+from .raycastfilter import GetRaycastCandidates
+
+
+#################################################################
+######################## FUNCTIONS ##############################
+#################################################################
+
+
+# Wrap Cursor when its at first or last pixel of window
+def wrapMouseInWindow(context: bpy.types.Context, event: bpy.types.Event) -> mathutils.Vector:
+    width = context.area.width
+    height = context.area.height
+
+    delta: mathutils.Vector = mathutils.Vector(
+        (event.mouse_x - event.mouse_prev_x, event.mouse_y - event.mouse_prev_y, 0.0))
+    args = (event.mouse_x, event.mouse_y)
+    offset: mathutils.Vector = mathutils.Vector((0.0, 0.0, 0.0))
+
+    if event.mouse_x <= context.area.x:
+        args = (context.area.x + width - 1, event.mouse_y)
+        context.window.cursor_warp(context.area.x + width - 1, event.mouse_y)
+        offset = mathutils.Vector((width, 0.0, 0.0))
+        print(f"moved, offset is width {width}")
+
+    if event.mouse_x >= context.area.x + width:
+        args = (context.area.x + 1, event.mouse_y)
+        offset = mathutils.Vector((-width, 0.0, 0.0))
+        print(f"moved, offset is width {-width}")
+
+    if event.mouse_y <= context.area.y:
+        args = (event.mouse_x, context.area.y + 1)
+        offset = mathutils.Vector((0.0, -height, 0.0))
+        print(f"moved, offset is height {-height}")
+
+    if event.mouse_y >= context.area.y + height:
+        args = (event.mouse_x, context.area.y + height - 1)
+        offset = mathutils.Vector((0.0, height, 0.0))
+        print(f"moved, offset is height {height}")
+
+    context.window.cursor_warp(*args)
+
+    return offset
+
+
+def resetCursorToCenterRegion(context: bpy.types.Context):
+    region = context.region
+    cx = region.width // 2 + region.x
+    cy = region.height // 2 + region.y
+    context.window.cursor_warp(cx, cy)
+
+
+def setMousePositionAtCoordinate(context: bpy.types.Context, mousePosition: tuple[int, int]):
+
+    context.window.cursor_warp(mousePosition[0], mousePosition[1])
+
+# Math
+
+
+def lerp(a: float, b: float, t: float) -> float:
+    return (1 - t) * a + t * b
+
+
+def inv_lerp(a: float, b: float, v: float) -> float:
+    return (v - a) / (b - a)
+
+
+def remap(v: float, i_min: float, i_max: float, o_min: float, o_max: float) -> float:
+    return lerp(o_min, o_max, inv_lerp(i_min, i_max, v))
+
+
+def clamp(num: float, min_value: float, max_value: float) -> float:
+    return max(min(num, max_value), min_value)
+
+
+def sign(v: float) -> float:
+    if v >= 0.0:
+        return 1.0
+    return -1.0
+
+
+def intensityByInverseSquareLaw(referenceIntensity: float, referenceDistance: float, newDistance: float) -> float:
+    from . import coremath
+    return float(coremath.intensityByInverseSquareLaw(referenceIntensity, referenceDistance, newDistance))
+
+
+def vector_to_azimuth_elevation(vec: mathutils.Vector) -> mathutils.Vector:
+    from . import coremath
+    return mathutils.Vector(coremath.vectorToAzimuthElevation(vec))
+
+
+def lookAtRotation(vec: mathutils.Vector, facingAxis="") -> mathutils.Vector:
+    """ specify look at facing Axis by string x,y,z or -x,-y,-z, its important to keep rotation Order as XYZ"""
+    from . import coremath
+    return mathutils.Vector(coremath.lookAtRotation(vec, facingAxis))
+
+
+def boolToFloat(v: bool) -> float:
+    if v:
+        return 1.0
+    else:
+        return 0.0
+
+# Raycast
+
+
+def GetAccelerationSettings(context: bpy.types.Context):
+    """Returns the add-on preferences when accelerated raycasts are enabled, None otherwise"""
+    addon = context.preferences.addons.get(__package__)
+    if addon is None or not addon.preferences.useAcceleratedRaycast:
+        return None
+    return addon.preferences
+
+
+def GetCursorRay(context: bpy.types.Context, mousepos: tuple):
+    """World space origin and direction of the view ray through a mouse position in region coords"""
+    # imported on first raycast instead of on add-on registration
+    from bpy_extras.view3d_utils import region_2d_to_origin_3d, region_2d_to_vector_3d
+    region = context.region
+    region_data = context.region_data
+    return region_2d_to_origin_3d(region, region_data, mousepos), region_2d_to_vector_3d(region, region_data, mousepos)
+
+
+def GetParallelRaycastSettings(context: bpy.types.Context):
+    """Returns the add-on preferences when parallel raycasts are enabled, None otherwise"""
+    addon = context.preferences.addons.get(__package__)
+    if addon is None or not addon.preferences.useParallelRaycast:
+        return None
+    return addon.preferences
+
+
+def GetProxyRaycastSettings(context: bpy.types.Context):
+    """Returns the add-on preferences when proxy raycasts are enabled, None otherwise"""
+    addon = context.preferences.addons.get(__package__)
+    if addon is None or not addon.preferences.useProxyRaycast:
+        return None
+    return addon.preferences
+
+
+def GetVectorizedRaycastSettings(context: bpy.types.Context):
+    """Returns the add-on preferences when vectorized raycasts are enabled, None otherwise"""
+    addon = context.preferences.addons.get(__package__)
+    if addon is None or not addon.preferences.useVectorizedRaycast:
+        return None
+    return addon.preferences
+
+
+@profiled("raycastCursor")
+def raycastCursor(context: bpy.types.Context, mousepos: tuple, debug=False):  # -> bpy.types.Object,
+    """takes in the current context, a mouse position as a tuple x,y (region coords) and gives back the hit object, hit location, hit normal, hit index and hit distance"""
+    origin_3d, vector_3d = GetCursorRay(context, mousepos)
+
+    # visible meshes, without the ones the raycast filter in the preferences leaves out
+    candidates = GetRaycastCandidates(context)
+
+    objects = [(obj, None) for obj in candidates]
+    profiler.count("raycast.candidates", len(objects))
+
+    # very heavy meshes are raycast against decimated proxies in the loop below, see proxymesh.py
+    proxySettings = GetProxyRaycastSettings(context)
+
+    # one vectorized test against the world space triangles of all objects, see raykernel.py
+    if GetVectorizedRaycastSettings(context) and not proxySettings:
+        from .acceleration import GetWorldTriangles
+        meshObjects = [obj for obj, src in objects]
+        objectIndices, locations, normals, polygonIndices, distances = GetWorldTriangles(
+            context, meshObjects).rayCast(origin_3d, vector_3d)
+        if objectIndices[0] < 0:
+            return None, None, None, None, None
+        profiler.count("raycast.hits")
+        return (meshObjects[objectIndices[0]], mathutils.Vector(locations[0]), mathutils.Vector(normals[0]),
+                int(polygonIndices[0]), float(distances[0]))
+
+    # triangle arrays of all objects tested in a thread pool, see parallelraycast.py
+    if GetParallelRaycastSettings(context) and not proxySettings:
+        from .parallelraycast import RaycastObjectsParallel
+        hitobj, hitlocation, hitnormal, hitindex, hitdistance = RaycastObjectsParallel(
+            context, [obj for obj, src in objects], origin_3d, vector_3d)
+        if hitobj:
+            profiler.count("raycast.hits")
+        return hitobj, hitlocation, hitnormal, hitindex, hitdistance
+
+    # heavy meshes can be raycast against the add-ons own BVH, see acceleration.py
+    accelerationSettings = GetAccelerationSettings(context)
+    if accelerationSettings:
+        from .acceleration import GetObjectBVH
+    if proxySettings:
+        from .acceleration import GetObjectProxyBVH, RememberProxyHit
+
+    if debug:
+        print(
+            f"mousePos: {mousepos} , origin_3d:{origin_3d} , vector_3d:{vector_3d} ")
+    hitobj = None
+    hitlocation = None
+    hitnormal = None
+    hitindex = None
+    hitdistance = sys.maxsize
+    hitproxy = False
+
+    for obj, src in objects:
+        mx = obj.matrix_world
+        mxi = mx.inverted_safe()
+
+        ray_origin = mxi @ origin_3d
+        ray_direction = mxi.to_3x3() @ vector_3d
+
+        proxy = GetObjectProxyBVH(context, obj, proxySettings) if proxySettings else None
+        bvh = proxy or (GetObjectBVH(context, obj, accelerationSettings) if accelerationSettings else None)
+        if bvh:
+            success, location, normal, index = bvh.rayCast(
+                ray_origin, ray_direction)
+            if success:
+                location, normal = mathutils.Vector(location), mathutils.Vector(normal)
+            else:
+                location, normal = mathutils.Vector((0.0, 0.0, 0.0)), mathutils.Vector((0.0, 0.0, 0.0))
+        else:
+            success, location, normal, index = obj.ray_cast(
+                origin=ray_origin, direction=ray_direction)
+        distance = (mx @ location - origin_3d).length
+
+        if debug:
+            print("candidate:", success, obj.name,
+                  location, normal, index, distance)
+
+        if success and distance < hitdistance:
+            hitobj, hitlocation, hitnormal, hitindex, hitdistance = obj, mx @ location, mx.to_3x3() @ normal, index, distance
+            hitproxy = proxy is not None
+
+    if debug:
+        print("best hit:", hitobj.name if hitobj else None, hitlocation,
+              hitnormal, hitindex, hitdistance if hitobj else None)
+        print()
+
+    if hitobj:
+        profiler.count("raycast.hits")
+        if hitproxy:
+            profiler.count("raycast.proxyHits")
+            RememberProxyHit(hitobj, origin_3d, vector_3d, hitlocation)
+        return hitobj, hitlocation, hitnormal, hitindex, hitdistance
+
+    return None, None, None, None, None
+
+
+def GetSmoothHitNormal(context: bpy.types.Context, obj: bpy.types.Object, hitLocation: mathutils.Vector, hitIndex: int) -> mathutils.Vector:
+    """Interpolated vertex normal at a raycastCursor hit in world space, from mesh arrays cached per object"""
+    from .acceleration import GetObjectMeshAdjacency
+    adjacency = GetObjectMeshAdjacency(context, obj)
+    mx = obj.matrix_world
+    localLocation = mx.inverted_safe() @ hitLocation
+    triangle = adjacency.triangleAt(hitIndex, localLocation)
+    normal = mathutils.Vector(adjacency.interpolatedNormal(triangle, localLocation))
+    # normals transform with the inverse transpose
+    return (mx.inverted_safe().transposed().to_3x3() @ normal).normalized()
+
+
+def GetHitNormal(context: bpy.types.Context, obj: bpy.types.Object, hitLocation: mathutils.Vector, hitNormal: mathutils.Vector, hitIndex: int) -> mathutils.Vector:
+    """The smoothed normal when enabled in the preferences, else the face normal of the hit"""
+    addon = context.preferences.addons.get(__package__)
+    if addon is None or not addon.preferences.useSmoothHitNormals or obj.type != "MESH":
+        return hitNormal
+    return GetSmoothHitNormal(context, obj, hitLocation, hitIndex)
+
+# Object Creation
+
+
+def CreateLight(context: bpy.types.Context, pivotPosition: mathutils.Vector, lightType: str) -> bpy.types.Object:
+    """Creates a Light at position, Light types are POINT, SUN, SPOT, AREA"""
+    # TODO : Create an Area Light always as a Rectangle
+    # TODO : Change the initial Brightness of the sun to 3
+    # Create light datablock
+    lightData = bpy.data.lights.new(
+        name=lightType + "LightData", type=lightType)
+    lightData.energy = 100
+    # Create new object, pass the light data
+    lightObject = bpy.data.objects.new(
+        name=lightType + "Light", object_data=lightData)
+    # Light Control Settings
+    SetLightPivot(lightObject, None, pivotPosition)
+    # link empty to Scene
+    # if context.collection == context.scene.collection:
+    #     lightCollection = bpy.data.collections.new(
+    #         "Lighting")  # create collection
+    #     context.scene.collection.children.link(
+    #         lightCollection)  # link collection
+    #     lightCollection.objects.link(lightObject)  # link light
+    #     lightCollectionLayerColl: bpy.types.LayerCollection = lightCollection
+    #     context.view_layer.active_layer_collection = lightCollectionLayerColl  # set active
+    # else:
+    context.collection.objects.link(lightObject)
+
+    return lightObject
+
+
+def PositionLight(lightObject: bpy.types.Object, normal: mathutils.Vector, lightDistance: float):
+    if not lightObject.lightControl.hasPivotPoint:
+        print(
+            f"The Object that was tried to be positioned, doesnt have a pivot Point. Object is {lightObject}")
+        return
+
+    # Set position
+    pivotPosition = mathutils.Vector(lightObject.lightControl.pivotPoint)
+    lightObject.location = pivotPosition + \
+        (normal * mathutils.Vector((lightDistance, lightDistance, lightDistance)))
+    # Set rotation
+    lightObject.rotation_euler = lookAtRotation(normal, "-z")
+
+
+def GetPivotMatrix(pivotObject: bpy.types.Object) -> mathutils.Matrix:
+    """World matrix of the pivot from its location and rotation, valid before the depsgraph evaluated it"""
+    return mathutils.Matrix.LocRotScale(pivotObject.location, pivotObject.rotation_euler, None)
+
+
+def UnparentAndKeepPositionRemoveParent(parent: bpy.types.Object, child: bpy.types.Object):
+    # world transform from the pivot, matrix_world may not be evaluated yet
+    worldMatrix: mathutils.Matrix = GetPivotMatrix(
+        parent) @ child.matrix_parent_inverse @ child.matrix_basis
+    # Unparent
+    child.parent = None
+    child.matrix_world = worldMatrix
+    # remove pivot Object
+    bpy.data.objects.remove(parent, do_unlink=True)
+
+# Light Adjustment Functions
+
+
+def GetLightType(lightObject: bpy.types.Object):
+    lightObjectData: bpy.types.Light = lightObject.data
+    '''Returns the Type of Light as tuple - 1. AREA,SUN,POINT,SPOT as string, 2. lightData'''
+    if lightObjectData.type == 'AREA':
+        return ('AREA', bpy.types.AreaLight(lightObject.data))
+    elif lightObjectData.type == 'POINT':
+        return ('POINT', bpy.types.PointLight(lightObject.data))
+    elif lightObjectData.type == 'SPOT':
+        return ('SPOT', bpy.types.SpotLight(lightObject.data))
+    elif lightObjectData.type == 'SUN':
+        return ('SUN', bpy.types.SunLight(lightObject.data))
+    else:
+        return ('NONE', None)
+
+
+def GetLightBrightness(lightObject: bpy.types.Object) -> float:
+    # Get enery based on Lamp Type
+    lightObjectData: bpy.types.Light = lightObject.data
+
+    if lightObjectData.type == 'AREA':
+        areaLightObjectData: bpy.types.AreaLight = lightObject.data
+        return areaLightObjectData.energy
+    elif lightObjectData.type == 'POINT':
+        pointLightObjectData: bpy.types.PointLight = lightObject.data
+        return pointLightObjectData.energy
+    elif lightObjectData.type == 'SPOT':
+        spotLightObjectData: bpy.types.SpotLight = lightObject.data
+        return spotLightObjectData.energy
+    elif lightObjectData.type == 'SUN':
+        sunLightObjectData: bpy.types.SunLight = lightObject.data
+        return sunLightObjectData.energy
+    else:
+        return -1.0
+
+
+def SetLightBrightnessClamped(lightObject: bpy.types.Object, newIntensity: float, minimumIntensity: float = 0.001, maximumIntensity: float = 10000000):
+    '''Set the Brightness of a Lamp, min 0.001, max 10000000'''
+    # Set enery based on Lamp Type
+    lightObjectData: bpy.types.Light = lightObject.data
+
+    if lightObjectData.type == 'AREA':
+        areaLightObjectData: bpy.types.AreaLight = lightObject.data
+        areaLightObjectData.energy = newIntensity
+        areaLightObjectData.energy = bl_math.clamp(
+            areaLightObjectData.energy, minimumIntensity, maximumIntensity)
+    elif lightObjectData.type == 'POINT':
+        pointLightObjectData: bpy.types.PointLight = lightObject.data
+        pointLightObjectData.energy = newIntensity
+        pointLightObjectData.energy = bl_math.clamp(
+            pointLightObjectData.energy, minimumIntensity, maximumIntensity)
+    elif lightObjectData.type == 'SPOT':
+        spotLightObjectData: bpy.types.SpotLight = lightObject.data
+        spotLightObjectData.energy = newIntensity
+        spotLightObjectData.energy = bl_math.clamp(
+            spotLightObjectData.energy, minimumIntensity, maximumIntensity)
+    elif lightObjectData.type == 'SUN':
+        sunLightObjectData: bpy.types.SunLight = lightObject.data
+        sunLightObjectData.energy = newIntensity
+        sunLightObjectData.energy = bl_math.clamp(
+            sunLightObjectData.energy, minimumIntensity, maximumIntensity)
+
+
+def SetLightBrightnessByRatioClamped(lightObject: bpy.types.Object, changeRatePercent: float, minimumIntensity: float = 0.001, maximumIntensity: float = 10000000):
+    '''Change Brightness of a Lamp by a percentage Factor, clamped to min 0.001, max 10000000'''
+    SetLightBrightnessClamped(lightObject, GetLightBrightness(
+        lightObject) * changeRatePercent, minimumIntensity, maximumIntensity)
+
+
+def GetLightSize(lightObject: bpy.types.Object) -> float:
+    # Get lightSize based on Lamp Type
+    lightObjectData: bpy.types.Light = lightObject.data
+
+    if lightObjectData.type == 'AREA':
+        areaLightObjectData: bpy.types.AreaLight = lightObject.data
+        return areaLightObjectData.size
+    elif lightObjectData.type == 'POINT':
+        pointLightObjectData: bpy.types.PointLight = lightObject.data
+        return pointLightObjectData.shadow_soft_size
+    elif lightObjectData.type == 'SPOT':
+        spotLightObjectData: bpy.types.SpotLight = lightObject.data
+        return spotLightObjectData.shadow_soft_size
+    else:
+        return -1.0
+
+
+def SetLightSizeClamped(lightObject: bpy.types.Object, lightSize: float, minimumSize: float = 0.001, maximumSize: float = 10000000):
+    # Set lightSize based on Lamp Type
+    lightObjectData: bpy.types.Light = lightObject.data
+
+    if lightObjectData.type == 'AREA':
+        areaLightObjectData: bpy.types.AreaLight = lightObject.data
+        areaLightObjectData.size = clamp(lightSize, minimumSize, maximumSize)
+    elif lightObjectData.type == 'POINT':
+        pointLightObjectData: bpy.types.PointLight = lightObject.data
+        pointLightObjectData.shadow_soft_size = clamp(
+            lightSize, minimumSize, maximumSize)
+    elif lightObjectData.type == 'SPOT':
+        spotLightObjectData: bpy.types.SpotLight = lightObject.data
+        spotLightObjectData.shadow_soft_size = clamp(
+            lightSize, minimumSize, maximumSize)
+
+
+def GetLightDistance(lightObject: bpy.types.Object) -> float:
+    # Get light Distance to pivot
+    pivotPosition: mathutils.Vector = GetLightPivot(lightObject)
+    lightPosition: mathutils.Vector = mathutils.Vector(
+        (lightObject.location.x, lightObject.location.y, lightObject.location.z))
+    distance: mathutils.Vector = lightPosition - pivotPosition
+    return distance.magnitude
+
+
+def SetLightDistance(lightObject: bpy.types.Object, lightDistance: float):
+    '''Scales the location Vector based on Ratio between lightDistance Parameter and current Distance (CAUTION: only works when Parented to Pivot)'''
+    # Set light Distance to pivot
+    currentDistance: float = GetLightDistance(lightObject)
+    scalingRatio: float = lightDistance / currentDistance
+    lightObject.location *= scalingRatio
+
+
+def GetLightAngle(lightObject: bpy.types.Object) -> float:
+    # Get light Angle based on Lamp Type
+    lightObjectData: bpy.types.Light = lightObject.data
+
+    if lightObjectData.type == 'AREA':
+        areaLightObjectData: bpy.types.AreaLight = lightObject.data
+        return areaLightObjectData.spread
+    elif lightObjectData.type == 'SPOT':
+        spotLightObjectData: bpy.types.SpotLight = lightObject.data
+        return spotLightObjectData.spot_size
+    elif lightObjectData.type == 'SUN':
+        sunLightObjectData: bpy.types.SunLight = lightObject.data
+        return sunLightObjectData.angle
+    else:
+        return -1.0
+
+
+def SetLightAngle(lightObject: bpy.types.Object, lightAngle: float):
+    # Set light Angle based on Lamp Type
+    lightObjectData: bpy.types.Light = lightObject.data
+
+    if lightObjectData.type == 'AREA':
+        areaLightObjectData: bpy.types.AreaLight = lightObject.data
+        areaLightObjectData.spread = lightAngle
+    elif lightObjectData.type == 'SPOT':
+        spotLightObjectData: bpy.types.SpotLight = lightObject.data
+        spotLightObjectData.spot_size = lightAngle
+    elif lightObjectData.type == 'SUN':
+        sunLightObjectData: bpy.types.SunLight = lightObject.data
+        sunLightObjectData.angle = lightAngle
+
+
+def GetLightPivot(lightObject: bpy.types.Object) -> mathutils.Vector:
+    # Get Light Pivot, the origin for lights that were never placed
+    return mathutils.Vector(lightObject.lightControl.pivotPoint)
+
+
+def SetLightPivot(lightObject: bpy.types.Object, pivotObject: bpy.types.Object, lightPivot: mathutils.Vector):
+    # Set Light Pivot
+    settings = lightObject.lightControl
+    settings.pivotPoint = lightPivot
+    settings.hasPivotPoint = True
+
+
+def GetLightTilt(lightObject: bpy.types.Object):
+    '''Tilt of the light relative to looking at the pivot, None when it was never tilted'''
+    settings = lightObject.lightControl
+    return mathutils.Euler(settings.tilt) if settings.hasTilt else None
+
+
+def SetLightTilt(lightObject: bpy.types.Object, tilt):
+    settings = lightObject.lightControl
+    settings.tilt = tilt
+    settings.hasTilt = True
+
+
+def GetLightColor(lightObject: bpy.types.Object) -> mathutils.Color:
+    # Get light color based on Lamp Type
+    lightObjectData: bpy.types.Light = lightObject.data
+
+    if lightObjectData.type == 'AREA':
+        areaLightObjectData: bpy.types.AreaLight = lightObject.data
+        return areaLightObjectData.color
+    elif lightObjectData.type == 'POINT':
+        pointLightObjectData: bpy.types.PointLight = lightObject.data
+        return pointLightObjectData.color
+    elif lightObjectData.type == 'SPOT':
+        spotLightObjectData: bpy.types.SpotLight = lightObject.data
+        return spotLightObjectData.color
+    elif lightObjectData.type == 'SUN':
+        sunLightObjectData: bpy.types.SunLight = lightObject.data
+        return sunLightObjectData.color
+    else:
+        return mathutils.Color((1.0, 1.0, 1.0))
+
+
+def SetLightColor(lightObject: bpy.types.Object, lightColor: mathutils.Color):
+    # Set light color based on Lamp Type
+    lightObjectData: bpy.types.Light = lightObject.data
+
+    if lightObjectData.type == 'AREA':
+        areaLightObjectData: bpy.types.AreaLight = lightObject.data
+        areaLightObjectData.color = lightColor
+    elif lightObjectData.type == 'POINT':
+        pointLightObjectData: bpy.types.PointLight = lightObject.data
+        pointLightObjectData.color = lightColor
+    elif lightObjectData.type == 'SPOT':
+        spotLightObjectData: bpy.types.SpotLight = lightObject.data
+        spotLightObjectData.color = lightColor
+    elif lightObjectData.type == 'SUN':
+        sunLightObjectData: bpy.types.SunLight = lightObject.data
+        sunLightObjectData.color = lightColor
+
+
+def GetLightOrbit(pivotObject: bpy.types.Object) -> mathutils.Euler:
+    if pivotObject:
+        rotation: mathutils.Euler = (
+            (pivotObject.rotation_euler.x, pivotObject.rotation_euler.y, pivotObject.rotation_euler.z))
+        return rotation
+    else:
+        print("Cant get Light Orbit, there is no Object")
+        return mathutils.Euler((0.0, 0.0, 0.0))
+
+
+def SetLightOrbit(pivotObject: bpy.types.Object, rotation: mathutils.Vector):
+    pivotObject.rotation_euler = rotation
+
+
+# scene ID property holding the user orbit presets, name => (elevation, azimuth) in degrees like CLASSIC_ORBIT_PRESETS
+ORBIT_PRESETS_PROPERTY: str = "lightControlOrbitPresets"
+
+
+def GetSceneOrbitPresets(scene: bpy.types.Scene) -> dict:
+    presets = scene.get(ORBIT_PRESETS_PROPERTY)
+    if not presets:
+        return {}
+    return {name: tuple(angles) for name, angles in presets.items()}
+
+
+def AddSceneOrbitPreset(scene: bpy.types.Scene, elevation: float, azimuth: float) -> str:
+    '''Stores an orbit (radians, azimuth relative to the viewer) as a preset of the scene, returns its name'''
+    presets = GetSceneOrbitPresets(scene)
+    name = f"Preset {len(presets) + 1}"
+    presets[name] = (round(degrees(elevation), 2), round(degrees(azimuth), 2))
+    scene[ORBIT_PRESETS_PROPERTY] = presets
+    return name
+
+
+def BuildOrbitSnapIndex(scene: bpy.types.Scene):
+    '''Snap index over the classic lighting positions and the presets stored in the scene'''
+    from .orbitsnap import CLASSIC_ORBIT_PRESETS, OrbitSnapIndex
+    return OrbitSnapIndex({**CLASSIC_ORBIT_PRESETS, **GetSceneOrbitPresets(scene)})
+
+
+def GetViewerAzimuth(regionData: bpy.types.RegionView3D) -> float:
+    '''Azimuth of the direction from the view towards the viewer, the front of the orbit presets'''
+    from . import coremath
+    towardsViewer = regionData.view_rotation @ mathutils.Vector((0.0, 0.0, 1.0))
+    return float(coremath.vectorToAzimuthElevation(towardsViewer)[2])
+
+
+def GetLightValues(lightObject: bpy.types.Object, pivotObject: bpy.types.Object):
+    lightOrbit = GetLightOrbit(pivotObject)
+    lightDistance = GetLightDistance(lightObject)
+    lightSize = GetLightSize(lightObject)
+    lightBrightness = GetLightBrightness(lightObject)
+    lightAngle = GetLightAngle(lightObject)
+    lightPivot = GetLightPivot(lightObject)
+    tempColor = GetLightColor(lightObject)
+    lightColor = mathutils.Color((
+        tempColor.r, tempColor.g, tempColor.b))  # Make Copy of Color
+    return lightOrbit, lightDistance, lightSize, lightBrightness, lightAngle, lightPivot, lightColor
+
+
+def SetLightOrbitByDelta(self, pivotObject: bpy.types.Object, delta: mathutils.Vector, rotationSpeed: float, slowChange: bool, slowChangeSpeed: float) -> bool:
+    '''Adds to the Orientation of an Object an Azimuth and Elevation based on a delta, Rotation Order should be XYZ'''
+    from . import coremath
+    if pivotObject.rotation_mode != 'XYZ':
+        self.report(
+            {'INFO'}, 'cant guarantee expected Result, set Rotation Mode to XYZ')
+    # add delta rotation to existing rotation and clamp it
+    pivotObject.rotation_euler = mathutils.Euler(coremath.orbitByDelta(
+        pivotObject.rotation_euler, delta, rotationSpeed, slowChange, slowChangeSpeed))
+
+
+def SetLightDistanceByDeltaClamped(lightObject: bpy.types.Object, delta: mathutils.Vector, zoomSpeedPercent: float, slowChange: bool, slowChangeSpeed: float, minimumDistance: float = 0.001, maximumDistance: float = 1000000.0):
+    '''changes the light distance based on a percentage per delta'''
+    # Get Delta
+    step: float = delta.x
+    # Adjust Rate of Change
+    if slowChange:
+        step *= slowChangeSpeed
+    step *= zoomSpeedPercent
+    # Calculate Position
+    newPosition = mathutils.Vector((clamp(lightObject.location[0] * (
+        1 + step), minimumDistance, maximumDistance), lightObject.location[1], lightObject.location[2]))
+    # Calculate Compensation of Lighting by Distance
+    pivotPoint: mathutils.Vector = GetLightPivot(lightObject)
+    oldLightDistanceToPivot: float = (
+        lightObject.location - pivotPoint).magnitude
+    newLightDistanceToPivot: float = (
+        newPosition - pivotPoint).magnitude
+    adjustedIntensity: float = intensityByInverseSquareLaw(GetLightBrightness(
+        lightObject), oldLightDistanceToPivot, newLightDistanceToPivot)
+    # TODO: not the prettiest but for now it will do
+    if newLightDistanceToPivot < 100.0:
+        # Adjust Light Intensity
+        SetLightBrightnessClamped(
+            lightObject, adjustedIntensity, minimumDistance, maximumDistance)
+        # Set Position
+        lightObject.location = newPosition
+
+
+def SetLightBrightnessByDeltaClamped(lightObject: bpy.types.Object, delta: mathutils.Vector, brightnessChangePercent: float, slowChange: bool, slowChangeSpeed: float, minimumIntensity: float = 0.001, maximumIntensity: float = 10000000):
+    # Get Delta
+    step: float = delta.x
+    # Adjust Rate of Change
+    if slowChange:
+        step *= slowChangeSpeed
+    step *= brightnessChangePercent
+    rateOfChange: float = 1.0 + step
+    # Set enery based on Lamp Type
+    SetLightBrightnessByRatioClamped(
+        lightObject, rateOfChange, minimumIntensity, maximumIntensity)
+
+
+def SetLightSizeByDeltaClamped(lightObject: bpy.types.Object, delta: mathutils.Vector, sizeChangeSensitivity: float, slowChange: bool, slowChangeSpeed: float,  minimumSize: float = 0.001, maximumSize: float = 10000000):
+    # Multiplication Factor
+    step = delta.x * sizeChangeSensitivity
+    if slowChange:
+        step *= slowChangeSpeed
+    rateOfChange = 1.0 + step
+    # Setting Size
+    SetLightSizeClamped(lightObject, GetLightSize(
+        lightObject) * rateOfChange, minimumSize, maximumSize)
+
+
+def SetLightAngleByDelta(lightObject: bpy.types.Object, delta: mathutils.Vector, angleChangeSensitivity: float, slowChange: bool, slowChangeSpeed: float,):
+    # Get Delta
+    step: mathutils.Vector = mathutils.Vector(
+        (delta.x, delta.y, delta.z))
+    # Adjust Rate of Change
+    if slowChange:
+        step *= slowChangeSpeed
+    step *= angleChangeSensitivity
+    rateOfChangeX: float = 1.0 + step.x
+    rateOfChangeY: float = 1.0 + step.y
+    lightObjectData: bpy.types.Light = lightObject.data
+    if lightObjectData.type == 'SPOT':
+        spotLightObjectData: bpy.types.SpotLight = lightObjectData
+        spotLightObjectData.spot_size = bl_math.clamp(
+            spotLightObjectData.spot_size * rateOfChangeX, 0.017, 3.1415)  # in Radians
+        spotLightObjectData.spot_blend = bl_math.clamp(
+            spotLightObjectData.spot_blend * rateOfChangeY, 0.01, 1.0)
+    elif lightObjectData.type == 'AREA':
+        areaLightObjectData: bpy.types.AreaLight = lightObjectData
+        areaLightObjectData.spread = bl_math.clamp(
+            areaLightObjectData.spread * rateOfChangeX, 0.017, 3.1415)  # in Radians
+    elif lightObjectData.type == 'SUN':
+        sunLightObjectData: bpy.types.SunLight = lightObjectData
+        sunLightObjectData.angle = bl_math.clamp(
+            sunLightObjectData.angle * rateOfChangeX, 0.001, 180.0)
+
+
+def SetLight_Pivot_Position_Rotation_ByNormal(lightObject: bpy.types.Object, pivotObject: bpy.types.Object, hitLocation: mathutils.Vector, hitNormal: mathutils.Vector):
+    pivotObject.location = hitLocation
+    SetLightPivot(lightObject, pivotObject, hitLocation)
+    pivotObject.rotation_euler = lookAtRotation(
+        hitNormal, "-x")
+
+
+def SetLight_Pivot_Position_Rotation_ByReflection(activeRegion3D: bpy.types.RegionView3D, lightObject: bpy.types.Object, pivotObject: bpy.types.Object, hitLocation: mathutils.Vector, hitNormal: mathutils.Vector):
+    cameraPosition: mathutils.Vector = activeRegion3D.view_matrix.inverted().translation
+    camToHit: mathutils.Vector = hitLocation - cameraPosition
+    reflection: mathutils.Vector = camToHit.reflect(hitNormal)
+    pivotObject.rotation_euler = lookAtRotation(
+        reflection, "-x")
+    pivotObject.location = hitLocation
+    SetLightPivot(lightObject, pivotObject, hitLocation)
+    # self.activeRegion3D.view_matrix = view_matrix # Change View matrix.
+    # context.space_data.region_3d.view_perspective = 'CAMERA' # Set as Cam
+
+
+def SetLight_Pivot_Position_ByHit(lightObject: bpy.types.Object, pivotObject: bpy.types.Object, hitLocation: mathutils.Vector):
+    pivotObject.location = hitLocation
+    SetLightPivot(lightObject, pivotObject, hitLocation)
+
+
+def SetLight_Pivot_ByHit(lightObject: bpy.types.Object, pivotObject: bpy.types.Object, hitLocation: mathutils.Vector):
+    from . import coremath
+    # Position Calculation, light world position from the pivot so no view layer update is needed
+    lightPosition: mathutils.Vector = GetPivotMatrix(
+        pivotObject) @ lightObject.location
+    pivotLocation, pivotRotation, lightLocation = coremath.pivotByHit(
+        lightPosition, pivotObject.location, hitLocation, lightObject.location)
+    pivotObject.location = pivotLocation
+    pivotObject.rotation_euler = pivotRotation
+    # Set Position
+    lightObject.location = lightLocation
+    # Update Pivot Attribute
+    SetLightPivot(lightObject, pivotObject, hitLocation)
+
+
+def SetLightColorByDelta(lightObject: bpy.types.Object, delta: mathutils.Vector, hueChangeSensitivity: float, saturationChangeSensitivity: float):
+    # Get Light Color
+    lightObjectData: bpy.types.Light = lightObject.data
+    lightColor: mathutils.Color = lightObjectData.color
+    # Calculate Rate of Change
+    hue: float = (lightColor.hsv[0] + delta.y *
+                  hueChangeSensitivity) % 1.0
+    sat: float = bl_math.clamp(
+        lightColor.hsv[1] + delta.x * saturationChangeSensitivity, 0.0, 1.0)
+    val: float = lightColor.hsv[2]
+    # Set light Color
+    lightColor.hsv = (hue, sat, val)
+
+
+def GetLightValuesForDrawingLabels(lightObject: bpy.types.Object, pivotObject: bpy.types.Object):
+    lightSize: str = '{0:.2f}'.format(
+        GetLightSize(lightObject)) + " m"  # 2 Decimals
+
+    lightDistance: str = '{0:.2f}'.format(
+        GetLightDistance(lightObject)) + " m"  # 2 Decimals
+
+    lightBrightness: str = '{0:.2f}'.format(
+        GetLightBrightness(lightObject)) + " w"  # 2 Decimals
+
+    lightAngle: str = '{0:.2f}'.format(degrees(
+        GetLightAngle(lightObject))) + " °"  # 2 Decimals
+
+    pivot: mathutils.Vector = GetLightPivot(lightObject)
+    lightPivot: str = '{0:.1f}'.format(
+        pivot.x) + " x " + '{0:.1f}'.format(pivot.y) + " y " + '{0:.1f}'.format(pivot.z) + " z "
+
+    orbit: mathutils.Euler = GetLightOrbit(pivotObject)
+    lightOrbit: str = '{0:.1f}'.format(
+        degrees(orbit[1])) + " ° " + '{0:.1f}'.format((degrees(orbit[2]) + 180.0) % 360.0) + " °"
+
+    color: mathutils.Color = GetLightColor(lightObject).hsv
+    lightColor: str = '{0:.1f}'.format(
+        color[0] * 360.0) + " hue " + '{0:.0f}'.format(color[1] * 100.0) + " sat"
+
+    return lightSize, lightDistance, lightBrightness, lightAngle, lightPivot, lightOrbit, lightColor
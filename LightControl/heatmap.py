@@ -0,0 +1,90 @@
+import mathutils
+import numpy as np
+import bpy
+
+from .acceleration import GetSceneBVH
+from .batchraycast import RaycastRegionPixels, RegionPixelGrid
+from .contributions import ContributionCache
+from .irradiance import heatmapColors
+from .profiling import profiled, profiler
+from .shadows import ShadowCache
+
+
+#################################################################
+########################## HEATMAP ##############################
+#################################################################
+
+
+def GetLightIrradianceParameters(lightObject: bpy.types.Object, matrixWorld: mathutils.Matrix) -> tuple:
+    """Arguments of irradianceFromLight after positions and normals, for a light placed at matrixWorld"""
+    lightData: bpy.types.Light = lightObject.data
+    direction: mathutils.Vector = (matrixWorld.to_3x3() @ mathutils.Vector((0.0, 0.0, -1.0))).normalized()
+    spotSize = lightData.spot_size if lightData.type == 'SPOT' else np.pi
+    spotBlend = lightData.spot_blend if lightData.type == 'SPOT' else 0.0
+    return (lightData.type, tuple(matrixWorld.to_translation()), tuple(direction), lightData.energy, spotSize, spotBlend)
+
+
+class HeatmapOverlay:
+    """Irradiance at a grid of surface samples under the viewport pixels, drawn as colored points.
+    The contribution of every light is kept in a ContributionCache, every update only recomputes the edited light
+    at the samples on screen, samples of views left behind stay cached until the memory limit evicts them.
+    With shadows every lit sample casts a shadow ray to the light, reused while the light moves only a little"""
+
+    def __init__(self, spacing: int, cacheSizeLimit: int = 256, useShadows: bool = False):
+        self.spacing = spacing
+        self.viewMatrix: mathutils.Matrix = None
+        self.shadows = ShadowCache() if useShadows else None
+        self.sceneBVH = None
+        self.contributions = ContributionCache(
+            cacheSizeLimit * 1024 * 1024, self.occluded if useShadows else None)
+        self.pixels: np.ndarray = np.empty((0, 2), dtype=np.float32)
+        self.sampleIds: np.ndarray = np.empty(0, dtype=np.int64)
+        # irradiance shown hottest, taken from the first update so changes stay comparable
+        self.reference: float = 0.0
+        self.colors: np.ndarray = np.empty((0, 4), dtype=np.float32)
+
+    def occluded(self, parameters: tuple, sampleIds: np.ndarray, positions: np.ndarray, normals: np.ndarray) -> np.ndarray:
+        return self.shadows.occluded(self.sceneBVH, parameters, sampleIds, positions, normals)
+
+    def syncLights(self, context: bpy.types.Context, editedLightObject: bpy.types.Object):
+        """Recomputes the columns of lights that changed outside the operator and drops deleted or hidden ones"""
+        lights = {obj.as_pointer(): obj for obj in context.visible_objects if obj.type == 'LIGHT'}
+        for key in [key for key in self.contributions.columns if key not in lights]:
+            self.contributions.removeLight(key)
+        for key, obj in lights.items():
+            if obj == editedLightObject:
+                continue
+            parameters = GetLightIrradianceParameters(obj, obj.matrix_world)
+            if self.contributions.parameters.get(key) != parameters:
+                self.contributions.setLight(key, parameters)
+
+    @profiled("heatmapSamples")
+    def takeSamples(self, context: bpy.types.Context, editedLightObject: bpy.types.Object):
+        pixels = RegionPixelGrid(context.region, self.spacing)
+        objects, objectIndices, locations, normals, polygonIndices, distances = RaycastRegionPixels(context, pixels)
+        hit = objectIndices >= 0
+        self.sceneBVH = GetSceneBVH(context, objects)
+        self.viewMatrix = context.region_data.view_matrix.copy()
+        self.pixels = pixels[hit].astype(np.float32)
+        positions = locations[hit]
+        # raycasts hit both sides, face the normals towards the viewer
+        cameraPosition = np.array(self.viewMatrix.inverted().translation, dtype=np.float32)
+        normals = normals[hit]
+        flip = np.einsum("ij,ij->i", normals, cameraPosition - positions) < 0.0
+        normals[flip] *= -1.0
+        self.syncLights(context, editedLightObject)
+        self.sampleIds = self.contributions.addSamples(positions, normals)
+        self.reference = 0.0
+
+    @profiled("heatmapUpdate")
+    def update(self, context: bpy.types.Context, editedLightObject: bpy.types.Object, matrixWorld: mathutils.Matrix):
+        """Recomputes the edited lights contribution, samples are taken again when the view moved"""
+        if self.viewMatrix is None or self.viewMatrix != context.region_data.view_matrix:
+            self.takeSamples(context, editedLightObject)
+        self.contributions.setLight(editedLightObject.as_pointer(),
+                                    GetLightIrradianceParameters(editedLightObject, matrixWorld), self.sampleIds)
+        profiler.count("heatmap.columnRows", len(self.sampleIds))
+        total = self.contributions.query(self.sampleIds)
+        if not self.reference and len(total):
+            self.reference = float(np.percentile(total, 95))
+        self.colors = heatmapColors(total, self.reference)
@@ -0,0 +1,64 @@
+"""Approximate irradiance of Blender lights at surface samples, on NumPy arrays and without bpy.
+Good enough to compare lights and show falloff while adjusting, not a replacement for a render"""
+import numpy as np
+
+
+#################################################################
+######################## IRRADIANCE #############################
+#################################################################
+
+
+def smoothstep(values: np.ndarray) -> np.ndarray:
+    values = np.clip(values, 0.0, 1.0)
+    return values * values * (3.0 - 2.0 * values)
+
+
+def irradianceFromLight(positions: np.ndarray, normals: np.ndarray, lightType: str, lightPosition, lightDirection,
+                        energy: float, spotSize: float = np.pi, spotBlend: float = 0.0) -> np.ndarray:
+    """Irradiance (N,) float32 in W/m^2 at sample positions with unit normals (N,3) from one light.
+    lightDirection is the unit vector the light shines along (-Z of the light), energy is watts or sun strength.
+    Point, spot and area lights fall off with the inverse square law, area lights emit with a cosine lobe,
+    spot cones are blended like Blender does with spotBlend"""
+    positions = np.asarray(positions, dtype=np.float32)
+    normals = np.asarray(normals, dtype=np.float32)
+    lightDirection = np.asarray(lightDirection, dtype=np.float32)
+    if lightType == 'SUN':
+        return (energy * np.maximum(normals @ -lightDirection, 0.0)).astype(np.float32)
+
+    toLight = np.asarray(lightPosition, dtype=np.float32) - positions
+    distanceSquared = np.maximum(np.einsum("ij,ij->i", toLight, toLight), 1e-8)
+    toLight /= np.sqrt(distanceSquared)[:, None]
+    receiving = np.maximum(np.einsum("ij,ij->i", normals, toLight), 0.0)
+    if lightType == 'AREA':
+        emitting = np.maximum(toLight @ -lightDirection, 0.0)
+        return (energy / np.pi * receiving * emitting / distanceSquared).astype(np.float32)
+    irradiance = energy / (4.0 * np.pi) * receiving / distanceSquared
+    if lightType == 'SPOT':
+        cosHalfSize = np.cos(spotSize * 0.5)
+        cosAngle = toLight @ -lightDirection
+        blendWidth = max(spotBlend * (1.0 - cosHalfSize), 1e-6)
+        irradiance *= smoothstep((cosAngle - cosHalfSize) / blendWidth)
+    return irradiance.astype(np.float32)
+
+
+# blue => cyan => green => yellow => red
+HEATMAP_COLORS: np.ndarray = np.array((
+    (0.0, 0.0, 0.6),
+    (0.0, 0.7, 1.0),
+    (0.1, 0.9, 0.2),
+    (1.0, 0.9, 0.0),
+    (1.0, 0.1, 0.0),
+), dtype=np.float32)
+
+
+def heatmapColors(irradiance: np.ndarray, reference: float, stops: float = 6.0, alpha: float = 0.6) -> np.ndarray:
+    """RGBA (N,4) float32 on a log2 scale, reference maps to the hottest color and reference / 2^stops to the coldest"""
+    reference = max(float(reference), 1e-8)
+    position = np.clip(np.log2(np.maximum(irradiance, 1e-12) / reference) / stops + 1.0, 0.0, 1.0)
+    scaled = position * (len(HEATMAP_COLORS) - 1)
+    lower = np.minimum(scaled.astype(np.int64), len(HEATMAP_COLORS) - 2)
+    fraction = (scaled - lower)[:, None]
+    colors = np.empty((len(irradiance), 4), dtype=np.float32)
+    colors[:, :3] = HEATMAP_COLORS[lower] * (1.0 - fraction) + HEATMAP_COLORS[lower + 1] * fraction
+    colors[:, 3] = alpha
+    return colors
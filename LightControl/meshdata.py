@@ -0,0 +1,57 @@
+import numpy as np
+import bpy
+
+
+#################################################################
+######################## MESH DATA ##############################
+#################################################################
+
+
+def GetMeshTriangles(mesh: bpy.types.Mesh):
+    """Returns vertex positions (V,3) float32, loop triangle vertex indices (T,3) int32 and the polygon index of every triangle (T) int32, all in object space"""
+    mesh.calc_loop_triangles()
+    vertices = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", vertices)
+    triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", triangles)
+    polygonIndices = np.empty(len(mesh.loop_triangles), dtype=np.int32)
+    mesh.loop_triangles.foreach_get("polygon_index", polygonIndices)
+    return vertices.reshape(-1, 3), triangles.reshape(-1, 3), polygonIndices
+
+
+def GetMeshVertexNormals(mesh: bpy.types.Mesh) -> np.ndarray:
+    """Vertex normals (V,3) float32 in object space"""
+    normals = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    if hasattr(mesh, "vertex_normals"):  # Blender 3.5+
+        mesh.vertex_normals.foreach_get("vector", normals)
+    else:
+        mesh.vertices.foreach_get("normal", normals)
+    return normals.reshape(-1, 3)
+
+
+def GetEvaluatedMeshTriangles(context: bpy.types.Context, obj: bpy.types.Object):
+    """Same as GetMeshTriangles for the mesh with modifiers applied, which is what obj.ray_cast hits"""
+    depsgraph = context.evaluated_depsgraph_get()
+    evaluatedObject = obj.evaluated_get(depsgraph)
+    mesh = evaluatedObject.to_mesh()
+    try:
+        return GetMeshTriangles(mesh)
+    finally:
+        evaluatedObject.to_mesh_clear()
+
+
+def GetEvaluatedMeshSurface(context: bpy.types.Context, obj: bpy.types.Object):
+    """GetEvaluatedMeshTriangles and the vertex normals of the same evaluated mesh"""
+    depsgraph = context.evaluated_depsgraph_get()
+    evaluatedObject = obj.evaluated_get(depsgraph)
+    mesh = evaluatedObject.to_mesh()
+    try:
+        return (*GetMeshTriangles(mesh), GetMeshVertexNormals(mesh))
+    finally:
+        evaluatedObject.to_mesh_clear()
+
+
+def GetEvaluatedFaceCount(context: bpy.types.Context, obj: bpy.types.Object) -> int:
+    depsgraph = context.evaluated_depsgraph_get()
+    evaluatedMesh: bpy.types.Mesh = obj.evaluated_get(depsgraph).data
+    return len(evaluatedMesh.polygons)
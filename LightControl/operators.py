@@ -0,0 +1,950 @@
+import sys
+import time
+from math import pi
+from math import radians
+import mathutils
+import bpy
+from bpy.types import Menu
+
+from .functions import (intensityByInverseSquareLaw, lookAtRotation, raycastCursor, GetHitNormal, CreateLight, PositionLight,
+                        UnparentAndKeepPositionRemoveParent, GetLightType, SetLightBrightnessClamped, SetLightSizeClamped,
+                        SetLightDistance, SetLightAngle, GetLightPivot, SetLightPivot, SetLightColor, SetLightOrbit, GetLightValues,
+                        SetLightOrbitByDelta, SetLightDistanceByDeltaClamped, SetLightBrightnessByDeltaClamped,
+                        SetLightSizeByDeltaClamped, SetLightAngleByDelta, SetLight_Pivot_Position_Rotation_ByNormal,
+                        SetLight_Pivot_Position_Rotation_ByReflection, SetLight_Pivot_Position_ByHit, SetLight_Pivot_ByHit,
+                        SetLightColorByDelta, GetLightValuesForDrawingLabels, GetPivotMatrix, boolToFloat, GetLightTilt, SetLightTilt,
+                        AddSceneOrbitPreset, BuildOrbitSnapIndex, GetViewerAzimuth)
+from .properties import MigrateLightProperties
+from .profiling import SyncProfilerWithPreferences, profiled, profiler
+from .pivotframe import PivotFrame, SessionLight
+from .rigs import ExportRig, ImportRig
+from .recording import EventRecorder, LoadEventRecording, ApplyEventRecordingStartState, CreateEventRecordingFilepath, RecordedEvent, isFinishedOrCancelled
+
+
+#################################################################
+######################## OPERATORS ##############################
+#################################################################
+
+
+class LIGHTCONTROL_OT_add_light(bpy.types.Operator):
+    bl_idname = "lightcontrol.add_light"
+    bl_label = "Adds an Area Light"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    # Properties
+    lightType: bpy.props.EnumProperty(items=[('POINT', 'Point Light', ''), ('AREA', 'Area Light', ''), ('SPOT', 'Spot Light', ''), (
+        'SUN', 'Sun Light', '')], name="Light Types", description="Which Light Type should be spawned", default='AREA')
+    initialLightDistancePercent: float = 0.45  # range from 0.0 to 1.0
+
+    def invoke(self, context: bpy.types.Context, event: bpy.types.Event):
+        # Addon Preferences
+        preferences = context.preferences
+        addon_prefs = preferences.addons[__package__].preferences
+        if self.lightType == 'AREA':
+            addon_prefs.areaLightCountSpawned += 1
+        elif self.lightType == 'POINT':
+            addon_prefs.pointLightCountSpawned += 1
+        elif self.lightType == 'SPOT':
+            addon_prefs.spotLightCountSpawned += 1
+        elif self.lightType == 'SUN':
+            addon_prefs.sunLightCountSpawned += 1
+        # Cancel if Light type doesnt work
+        if self.lightType not in {'AREA', 'POINT', 'SPOT', 'SUN'}:
+            print("Couldnt add this lighttype.")
+            return {'CANCELLED'}
+        # Set Mouse Position based on Pie Menu Call
+        mousePosition: tuple[int, int] = (
+            event.mouse_region_x, event.mouse_region_y)
+        if context.scene['PieMenuMousePosition']:
+            # Set Mouse Pos
+            mousePosition = int(
+                context.scene.PieMenuMousePosition[0]), int(context.scene.PieMenuMousePosition[1])
+            # Delete Property
+            del bpy.types.Scene.PieMenuMousePosition
+        # Raycast and Cancel if nothing hit
+        hitobj, hitlocation, hitnormal, hitindex, hitdistance = raycastCursor(
+            context, mousepos=mousePosition, debug=False)
+        if not hitobj:
+            print('No Object under Mouse Cursor - Nothing Added')
+            self.report(
+                {'INFO'}, 'No Object under Mouse Cursor - Nothing Added')
+            return {'CANCELLED'}
+        # Calculate Light Distance
+        pivotPoint = mathutils.Vector(
+            (hitlocation[0], hitlocation[1], hitlocation[2]))
+        r3d = context.area.spaces.active.region_3d
+        cameraPosition: mathutils.Vector = r3d.view_matrix.inverted().translation
+        lightDistance: float = (
+            cameraPosition - pivotPoint).magnitude * self.initialLightDistancePercent
+        # Create Light
+        lightObject = CreateLight(context, pivotPoint, str(self.lightType))
+        # Calculate Light Intensity
+        lightIntensity: float = 3.0  # light Intensity when Sunlight
+        lightObjectData: bpy.types.Light = lightObject.data
+        if lightObjectData.type == 'AREA':  # Light Intensity when Area
+            lightIntensity = intensityByInverseSquareLaw(
+                40, 2.5, lightDistance)
+        elif lightObjectData.type != 'SUN':  # Light Intensity when other light Type
+            lightIntensity = intensityByInverseSquareLaw(
+                60, 2.5, lightDistance)
+        # Set Light Intensity
+        SetLightBrightnessClamped(lightObject, lightIntensity)
+        # Position Light
+        hitnormal = GetHitNormal(context, hitobj, hitlocation, hitnormal, hitindex)
+        PositionLight(lightObject, mathutils.Vector(
+            (hitnormal[0], hitnormal[1], hitnormal[2])), lightDistance)
+        # Set as selected and active Object
+        for obj in context.selected_objects:  # deselect all
+            obj.select_set(False)
+        lightObject.select_set(True)
+        context.view_layer.objects.active = lightObject
+        # Set Flag on lightObject so it can be deleted if action canceled
+        lightObject.lightControl.deleteOnCancel = True
+        # Go into Adjust Light mode
+        print("invoke Adjust Light no Params")
+        if bpy.ops.lightcontrol.adjust_light.poll():
+            # , deleteOnCancelModal = True)
+            bpy.ops.lightcontrol.adjust_light('INVOKE_DEFAULT')
+        return {'FINISHED'}
+
+
+class LIGHTCONTROL_MT_add_light_pie_menu(Menu):
+    # label is displayed at the center of the pie menu.
+    bl_label = "Add Light at Mouse Position"
+
+    def draw(self, context):
+        layout = self.layout
+
+        pie = layout.menu_pie()
+        # operator_enum will just spread all available options
+        # for the type enum of the operator on the pie
+        pie.operator_enum("lightcontrol.add_light", "lightType")
+
+
+class LIGHTCONTROL_OT_add_light_pie_menu_call(bpy.types.Operator):
+    bl_idname = 'lightcontrol.add_light_pie_menu_call'
+    bl_label = 'Lightcontrol Add Pie Menu'
+    bl_description = 'Call Add Light Pie Menu, to create a Light Source at Cursor'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def invoke(self, context: bpy.types.Context, event: bpy.types.Event):
+        bpy.ops.wm.call_menu_pie(name="LIGHTCONTROL_MT_add_light_pie_menu")
+        # remember Mouse position when Object was created
+        bpy.types.Scene.PieMenuMousePosition = bpy.props.FloatVectorProperty(
+            name="Pie Menu Mouse Position", description="Mouse Position when Pie Menu was Initialized")
+        context.scene.PieMenuMousePosition = (
+            (event.mouse_region_x, event.mouse_region_y, 0.0))
+        return {'FINISHED'}
+
+
+class LIGHTCONTROL_OT_adjust_light(bpy.types.Operator):
+    """Takes control of Blender and Lets you adjust the Light"""
+    bl_idname = "lightcontrol.adjust_light"
+    bl_label = "Adjust Light"
+    # grab cursor and blocking activates continous grab
+    bl_options = {'REGISTER', 'UNDO', 'GRAB_CURSOR', 'BLOCKING'}
+
+    # temporary storeage
+    pivotObject: bpy.types.Object = None
+    # set when adjusting without pivot empty, then pivotObject is a PivotFrame
+    sessionLight: SessionLight = None
+    initialMatrixWorld: mathutils.Matrix = None
+    initialTiltProperty: tuple = None
+    # raycasts near the last pivot hit, None when disabled in the preferences
+    pivotRaycaster = None
+    # walks the pivot over the surface, None when disabled in the preferences
+    pivotSlider = None
+    # irradiance overlay, created the first time it is shown
+    heatmap = None
+    showHeatmap: bool = False
+    # orbit snapping to lighting presets, the index is built the first time snapping is used
+    snapOrbit: bool = False
+    orbitSnapIndex = None
+    # orbit following the mouse while snapped, None until the orbit is dragged
+    freeOrbit = None
+    snappedOrbitPreset: str = ""
+    activeSpace3D: bpy.types.SpaceView3D = None
+    activeRegion3D: bpy.types.RegionView3D = None
+    currentLightType = None
+    # settings for modal
+    zoomSpeedPercent = 0.01
+    rotationSpeed = 0.006
+    brightnessChangePercent = 0.01
+    angleChangeSensitivity = 0.01
+    sizeChangeSensitivity = 0.01
+    hueChangeSensitivity = 0.0003
+    tiltChangeSensitivity = 0.01
+    saturationChangeSensitivity = 0.002
+    mouseWheelSensitivity = 20.0
+    slowChangeSpeedPercent = 0.2
+    emptyDisplaySize = 0.04
+    # Input enablers for modal
+    approveOperation: bool = False
+    cancelOperation: bool = False
+    changeLightOrbit: bool = False
+    changeLightSize: bool = False
+    changeLightDistance: bool = False
+    changeLightBrightness: bool = False
+    changeLightAngle: bool = False
+    changeLightColor: bool = False
+    changeLightPivot: bool = False
+    changeLightTilt: bool = False
+    toggleViewportVisibility: bool = False
+    # values for drawing
+    lightSize: str = ""
+    lightDistance: str = ""
+    lightBrightness: str = ""
+    lightAngle: str = ""
+    lightPivot: str = ""
+    lightOrbit: str = ""
+    lightColor: str = ""
+    lightTilt: str = ""
+    # values for reverting
+    initialLightOrbit: mathutils.Vector = mathutils.Vector(
+        (0.0, 0.0, 0.0))
+    initialLightDistance: float = 0.0
+    initialLightSize: float = 0.0
+    initialLightBrightness: float = 0.0
+    initialLightAngle: float = 0.0
+    initialLightPivot: mathutils.Vector = mathutils.Vector((0.0, 0.0, 0.0))
+    initialLightColor: mathutils.Color = mathutils.Color((0.0, 0.0, 0.0))
+    initialLightTilt: mathutils.Vector = mathutils.Vector((0.0, 0.0, 0.0))
+    # event recording and replay
+    recorder: EventRecorder = None
+    replayEvents: list = None
+    replayIndex: int = 0
+    replayStart: float = 0.0
+    replayTimer = None
+    replayFilepath: bpy.props.StringProperty(options={'HIDDEN', 'SKIP_SAVE'})
+    replayRealTime: bpy.props.BoolProperty(options={'HIDDEN', 'SKIP_SAVE'})
+
+    @ classmethod
+    def poll(cls, context):
+        # true when in 3D View and Active Object is Light.
+        if context.active_object == None:
+            print("No Active Object to adjust the lighting of")
+            return False
+        return context.area.type == 'VIEW_3D' and context.active_object.type == 'LIGHT'
+
+    def execute(self, context: bpy.types.Context):
+        print("Adjust Light Can only be invoked, not executed.")
+        return {'CANCELLED'}
+
+    def invoke(self, context: bpy.types.Context, event: bpy.types.Event):
+        # Profiling
+        SyncProfilerWithPreferences(context)
+        # Event Recording and Replay
+        self.recorder = None
+        self.replayEvents = None
+        if self.replayFilepath:
+            header, self.replayEvents = LoadEventRecording(
+                bpy.path.abspath(self.replayFilepath))
+        else:
+            addon = context.preferences.addons.get(__package__)
+            if addon is not None and addon.preferences.recordEvents:
+                self.recorder = EventRecorder(context, context.active_object)
+        # Draw Operator Options, drawing imports gpu and blf so it is loaded on first use
+        from .drawing import drawOperationOptions
+        args = (self, context)
+        self._handle = bpy.types.SpaceView3D.draw_handler_add(
+            drawOperationOptions, args, 'WINDOW', 'POST_PIXEL')
+        # Set the current active Region3D as Reference
+        for area in bpy.context.screen.areas:
+            if area.type == 'VIEW_3D':
+                self.activeSpace3D = bpy.types.SpaceView3D(area.spaces.active)
+                self.activeRegion3D = bpy.types.RegionView3D(
+                    area.spaces[0].region_3d)
+        # and self.activeSpace3D.show_gizmo
+        self.toggleViewportVisibility = self.activeSpace3D.overlay.show_overlays
+        # Set light Object as the active object
+        lightObject = context.active_object
+        # light control settings of lights placed with older versions are still ID properties
+        MigrateLightProperties(lightObject)
+        # Set current Light Type
+        lightObjectData: bpy.types.Light = lightObject.data
+        self.currentLightType = lightObjectData.type
+        # Initialize Light Values for drawing
+        self.lightSize, self.lightDistance, self.lightBrightness, self.lightAngle, self.lightPivot, self.lightOrbit, self.lightColor = GetLightValuesForDrawingLabels(
+            lightObject, self.pivotObject)
+        settings = lightObject.lightControl
+        if not settings.hasPivotPoint:
+            print("pivotPoint not set => origin")
+            SetLightPivot(lightObject, None, mathutils.Vector((0.0, 0.0, 0.0)))
+        if GetLightType(lightObject)[0] not in {'AREA', 'SPOT'} and not settings.hasTilt:
+            print("Tilt not set => none")
+            SetLightTilt(lightObject, (0.0, 0.0, 0.0))
+        # unrotated light, tilt is relative to -Z looking at the pivot
+        tilt = GetLightTilt(lightObject)
+        if tilt is not None:
+            tiltRotation = (tilt.x, pi*0.5 + tilt.y, tilt.z)
+        else:
+            tiltRotation = (0, pi*0.5, 0)  # make -Z look forward
+        addon = context.preferences.addons.get(__package__)
+        if addon is not None and addon.preferences.usePivotEmpty:
+            self.beginWithPivotEmpty(context, lightObject, tiltRotation)
+        else:
+            self.beginWithPivotFrame(context, lightObject, tiltRotation)
+        # Start building raycast acceleration in the background while the user is still orbiting
+        if addon is not None and (addon.preferences.useAcceleratedRaycast or addon.preferences.useProxyRaycast) and addon.preferences.buildBVHInBackground:
+            from .acceleration import PrepareObjectBVHs
+            PrepareObjectBVHs(context, addon.preferences)
+        self.heatmap = None
+        self.showHeatmap = False
+        self.snapOrbit = False
+        self.orbitSnapIndex = None
+        self.freeOrbit = None
+        self.snappedOrbitPreset = ""
+        # Pivot Raycasts
+        self.pivotRaycaster = None
+        if addon is not None and addon.preferences.useCoherentPivotRaycast:
+            from .coherentray import CoherentRaycaster
+            self.pivotRaycaster = CoherentRaycaster(addon.preferences.proxyRaycastMinimumFaces)
+        self.pivotSlider = None
+        if addon is not None and addon.preferences.slidePivotOnSurface:
+            from .surfaceslide import SurfaceSlider
+            self.pivotSlider = SurfaceSlider(
+                self.pivotRaycaster.raycast if self.pivotRaycaster else raycastCursor)
+        # Initialize Initial Light Values for Reverting
+        self.initialLightOrbit, self.initialLightDistance, self.initialLightSize, self.initialLightBrightness, self.initialLightAngle, self.initialLightPivot, self.initialLightColor = GetLightValues(
+            self.sessionLight if self.sessionLight else lightObject, self.pivotObject)
+        # Replay
+        if self.replayEvents is not None:
+            if not self.replayRealTime:
+                return self.replayAtFullSpeed(context)
+            self.replayIndex = 0
+            self.replayStart = time.perf_counter()
+            self.replayTimer = context.window_manager.event_timer_add(
+                0.001, window=context.window)
+
+        context.window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def beginWithPivotEmpty(self, context: bpy.types.Context, lightObject: bpy.types.Object, tiltRotation: tuple):
+        # create pivot
+        self.sessionLight = None
+        self.pivotObject = bpy.data.objects.new("temporaryPivot", None)
+        self.pivotObject.empty_display_type = 'ARROWS'  # 'SINGLE_ARROW'
+        self.pivotObject.location = GetLightPivot(lightObject)
+        bpy.context.scene.collection.objects.link(self.pivotObject)
+        # size pivot correctly
+        cameraPosition: mathutils.Vector = self.activeRegion3D.view_matrix.inverted().translation
+        distance: mathutils.Vector = self.pivotObject.location - cameraPosition
+        self.pivotObject.empty_display_size = distance.magnitude * self.emptyDisplaySize
+        # unrotate and place light
+        pivotToLight: mathutils.Vector = lightObject.location - self.pivotObject.location
+        lightObject.rotation_euler = tiltRotation
+        lightObject.location = mathutils.Vector((pivotToLight.magnitude, 0, 0))
+        # set parenting of light and pivot
+        lightObject.parent_type = 'OBJECT'
+        lightObject.parent = self.pivotObject
+        # rotate pivot
+        rot = lookAtRotation(pivotToLight, "-x")
+        self.pivotObject.rotation_euler = rot
+
+    def beginWithPivotFrame(self, context: bpy.types.Context, lightObject: bpy.types.Object, tiltRotation: tuple):
+        """Orbit kept in Python, only the lights matrix_world is written, no objects or relations are added"""
+        from .drawing import drawPivotFrame
+        self.initialMatrixWorld = lightObject.matrix_world.copy()
+        self.initialTiltProperty = GetLightTilt(lightObject)
+        pivotLocation: mathutils.Vector = GetLightPivot(lightObject)
+        pivotToLight: mathutils.Vector = lightObject.matrix_world.to_translation() - pivotLocation
+        self.pivotObject = PivotFrame(
+            pivotLocation, lookAtRotation(pivotToLight, "-x"))
+        self.sessionLight = SessionLight(lightObject, self.pivotObject, mathutils.Vector(
+            (pivotToLight.magnitude, 0, 0)), tiltRotation)
+        self.sessionLight.apply()
+        # size pivot correctly
+        cameraPosition: mathutils.Vector = self.activeRegion3D.view_matrix.inverted().translation
+        distance: mathutils.Vector = self.pivotObject.location - cameraPosition
+        self.pivotObject.empty_display_size = distance.magnitude * self.emptyDisplaySize
+        # Draw Pivot in place of the empty
+        self._pivotHandle = bpy.types.SpaceView3D.draw_handler_add(
+            drawPivotFrame, (self, context), 'WINDOW', 'POST_VIEW')
+
+    def getLightMatrixWorld(self, lightObject: bpy.types.Object) -> mathutils.Matrix:
+        """Current world matrix of the adjusted light, also while the pivot empty is not evaluated yet"""
+        if self.sessionLight:
+            return self.sessionLight.matrix_world
+        return GetPivotMatrix(self.pivotObject) @ lightObject.matrix_basis
+
+    def updateHeatmap(self, context: bpy.types.Context, lightObject: bpy.types.Object):
+        if self.heatmap is None:
+            from .heatmap import HeatmapOverlay
+            addon = context.preferences.addons.get(__package__)
+            self.heatmap = HeatmapOverlay(
+                addon.preferences.heatmapSpacing if addon is not None else 24,
+                addon.preferences.contributionCacheSizeLimit if addon is not None else 256,
+                addon.preferences.useHeatmapShadows if addon is not None else False)
+        self.heatmap.update(
+            context, lightObject, self.getLightMatrixWorld(lightObject))
+
+    def snapLightOrbit(self, context: bpy.types.Context, delta: mathutils.Vector, slowChange: bool):
+        """Orbits like SetLightOrbitByDelta but keeps the free orbit apart and puts the pivot on the nearest preset in reach"""
+        from . import coremath
+        from .orbitsnap import wrapAngle
+        if self.orbitSnapIndex is None:
+            self.orbitSnapIndex = BuildOrbitSnapIndex(context.scene)
+        if self.freeOrbit is None:
+            self.freeOrbit = tuple(self.pivotObject.rotation_euler)
+        self.freeOrbit = tuple(coremath.orbitByDelta(
+            self.freeOrbit, delta, self.rotationSpeed, slowChange, self.slowChangeSpeedPercent))
+        addon = context.preferences.addons.get(__package__)
+        snapAngle = addon.preferences.orbitSnapAngle if addon is not None else radians(10.0)
+        viewerAzimuth = GetViewerAzimuth(self.activeRegion3D)
+        rotation = list(self.freeOrbit)
+        preset = self.orbitSnapIndex.snap(-rotation[1], rotation[2] - viewerAzimuth, snapAngle)
+        self.snappedOrbitPreset = self.orbitSnapIndex.names[preset] if preset >= 0 else ""
+        if preset >= 0:
+            rotation[1] = -self.orbitSnapIndex.elevations[preset]
+            # stay on the same turn as the free orbit so releasing the snap does not spin the light
+            target = viewerAzimuth + self.orbitSnapIndex.azimuths[preset]
+            rotation[2] += float(wrapAngle(target - rotation[2]))
+        SetLightOrbit(self.pivotObject, mathutils.Euler(rotation))
+
+    def refineProxyPivot(self, context: bpy.types.Context, lightObject: bpy.types.Object):
+        """Moves the pivot onto the real mesh when it was last dropped on a proxy. The light moves along and keeps
+        its distance and aim, through the parent or the session light's apply"""
+        acceleration = sys.modules.get(__package__ + ".acceleration")
+        if acceleration is None:
+            return
+        exactLocation = acceleration.RefineProxyHit(context, self.pivotObject.location)
+        if exactLocation is not None:
+            self.pivotObject.location = exactLocation
+            SetLightPivot(lightObject, self.pivotObject, exactLocation)
+
+    def saveOrbitPreset(self, context: bpy.types.Context):
+        """Stores the current orbit relative to the view as a preset of the scene"""
+        rotation = self.pivotObject.rotation_euler
+        name = AddSceneOrbitPreset(context.scene, -rotation[1], rotation[2] - GetViewerAzimuth(self.activeRegion3D))
+        self.orbitSnapIndex = None
+        self.report({'INFO'}, f"Saved orbit as {name}")
+
+    def modal(self, context, event):
+        if self.replayEvents is not None:
+            return self.replayInRealTime(context, event)
+        if self.recorder:
+            self.recorder.record(event)
+        result = self.processEvent(context, event)
+        if self.recorder and isFinishedOrCancelled(result):
+            filepath = CreateEventRecordingFilepath(
+                context, self.recorder.header["light"])
+            self.recorder.save(filepath)
+            self.report({'INFO'}, f'Recorded Light Adjustment to {filepath}')
+        return result
+
+    def replayAtFullSpeed(self, context):
+        start = time.perf_counter()
+        result = {'CANCELLED'}
+        replayed = 0
+        for event in self.replayEvents:
+            result = self.processEvent(context, event)
+            replayed += 1
+            if isFinishedOrCancelled(result):
+                break
+        else:
+            # recording ended without approve or cancel
+            result = self.processEvent(context, RecordedEvent(
+                (0.0, 'ESC', 'PRESS', 0, 0, 0, 0, 0, 0, 0)))
+        milliseconds = (time.perf_counter() - start) * 1000.0
+        self.report(
+            {'INFO'}, f'Replayed {replayed} Events in {milliseconds:.1f} ms')
+        return result
+
+    def replayInRealTime(self, context, event):
+        if event.type == 'ESC':  # abort replay
+            self.replayIndex = len(self.replayEvents)
+        elif event.type != 'TIMER':
+            return {'RUNNING_MODAL'}
+        # process all recorded events that are due
+        elapsed = time.perf_counter() - self.replayStart
+        while self.replayIndex < len(self.replayEvents) and self.replayEvents[self.replayIndex].time <= elapsed:
+            result = self.processEvent(
+                context, self.replayEvents[self.replayIndex])
+            self.replayIndex += 1
+            if isFinishedOrCancelled(result):
+                context.window_manager.event_timer_remove(self.replayTimer)
+                return result
+        # recording ended without approve or cancel
+        if self.replayIndex >= len(self.replayEvents):
+            context.window_manager.event_timer_remove(self.replayTimer)
+            return self.processEvent(context, RecordedEvent((0.0, 'ESC', 'PRESS', 0, 0, 0, 0, 0, 0, 0)))
+        return {'RUNNING_MODAL'}
+
+    @profiled("modal")
+    def processEvent(self, context, event):
+        # count Events
+        if profiler.enabled:
+            profiler.count("events")
+            profiler.count("events." + event.type)
+
+        # draw Labels
+        context.area.tag_redraw()
+
+        # save the active object
+        lightObject: bpy.types.Object = context.active_object
+        # without pivot empty adjustments go to the session light, local to the pivot frame
+        adjustedLight = self.sessionLight if self.sessionLight else lightObject
+
+        # Set pivot empty display size based on distance
+        cameraPosition: mathutils.Vector = self.activeRegion3D.view_matrix.inverted().translation
+        newDistance: mathutils.Vector = self.pivotObject.location - cameraPosition
+        self.pivotObject.empty_display_size = newDistance.magnitude * self.emptyDisplaySize
+
+        # Calculate delta for later usage
+        mouseWheelDeltaUP = boolToFloat(event.type == 'WHEELUPMOUSE')
+        mouseWheelDeltaDOWN = -boolToFloat(event.type == 'WHEELDOWNMOUSE')
+        mouseWheelDelta: mathutils.Vector = mathutils.Vector(((mouseWheelDeltaUP +
+                                                               mouseWheelDeltaDOWN) * self.mouseWheelSensitivity, 0.0, 0.0))
+        delta: mathutils.Vector = mathutils.Vector(
+            (event.mouse_x - event.mouse_prev_x, event.mouse_y - event.mouse_prev_y, 0.0))
+        delta += mouseWheelDelta
+
+        # Update Labels for Drawing
+        with profiler.stage("labels"):
+            self.lightSize, self.lightDistance, self.lightBrightness, self.lightAngle, self.lightPivot, self.lightOrbit, self.lightColor = GetLightValuesForDrawingLabels(
+                adjustedLight, self.pivotObject)
+        if self.snapOrbit:
+            self.lightOrbit += f"  Snap {self.snappedOrbitPreset}" if self.snappedOrbitPreset else "  Snap"
+
+        # Set Input Enabeling Variables
+        if event.type in {'LEFTMOUSE', 'RET'}:
+            self.approveOperation = True
+        if event.type in {'RIGHTMOUSE', 'ESC'}:
+            self.cancelOperation = True
+        if event.type == 'S':
+            self.changeLightSize = event.value == 'PRESS'
+        if event.type == 'B':
+            self.changeLightBrightness = event.value == 'PRESS'
+        if event.type == 'D':
+            self.changeLightDistance = event.value == 'PRESS'
+        if event.type == 'C':
+            self.changeLightColor = event.value == 'PRESS'
+        if event.type == 'A':
+            self.changeLightAngle = event.value == 'PRESS'
+        if event.type == 'T':
+            self.changeLightTilt = event.value == 'PRESS'
+        if event.type in {'SPACE', 'R'}:
+            self.changeLightOrbit = event.value == 'PRESS'
+            self.freeOrbit = None
+        if event.type == 'V':
+            if event.value == 'PRESS':
+                self.toggleViewportVisibility = not self.toggleViewportVisibility
+        if event.type == 'H':
+            if event.value == 'PRESS':
+                self.showHeatmap = not self.showHeatmap
+        if event.type == 'O':
+            if event.value == 'PRESS':
+                self.snapOrbit = not self.snapOrbit
+                self.snappedOrbitPreset = ""
+        if event.type == 'P':
+            if event.value == 'PRESS':
+                self.saveOrbitPreset(context)
+        self.changeLightPivot = event.type == 'MOUSEMOVE' and event.ctrl
+        if self.pivotSlider and not (self.changeLightPivot and not event.shift):
+            self.pivotSlider.reset()
+
+        # Pass through Navigation
+        # allow view navigation, and collapsing the panels
+
+        if self.approveOperation:
+            # Remove Operation Labels
+            bpy.types.SpaceView3D.draw_handler_remove(self._handle, 'WINDOW')
+            self.refineProxyPivot(context, lightObject)
+            lightObject.lightControl.orbit = self.pivotObject.rotation_euler
+            if self.sessionLight:
+                bpy.types.SpaceView3D.draw_handler_remove(
+                    self._pivotHandle, 'WINDOW')
+                self.sessionLight.apply()
+            else:
+                # Unparent
+                UnparentAndKeepPositionRemoveParent(
+                    self.pivotObject, lightObject)
+            # set Light as Active Object
+            context.view_layer.objects.active = lightObject
+            # clear the Set Light Tag
+            lightObject.lightControl.deleteOnCancel = False
+            # the same numbers are in the profiler counts, the summaries are only printed while profiling
+            if profiler.enabled and self.pivotRaycaster and self.pivotRaycaster.fullQueries:
+                print(self.pivotRaycaster.summary())
+            if profiler.enabled and self.pivotSlider and self.pivotSlider.raycasts:
+                print(self.pivotSlider.summary())
+            if profiler.enabled and self.heatmap and self.heatmap.shadows and self.heatmap.shadows.tracedRays:
+                print(self.heatmap.shadows.summary())
+            print('finished adjusting Light')
+            return {'FINISHED'}
+
+        if self.cancelOperation:
+            # Remove Operation Labels
+            bpy.types.SpaceView3D.draw_handler_remove(self._handle, 'WINDOW')
+            # Reset Values
+            SetLightPivot(lightObject, self.pivotObject,
+                          self.initialLightPivot)
+            SetLightSizeClamped(lightObject, self.initialLightSize)
+            SetLightBrightnessClamped(lightObject, self.initialLightBrightness)
+            SetLightAngle(lightObject, self.initialLightAngle)
+            SetLightColor(lightObject, self.initialLightColor)
+            if self.sessionLight:
+                bpy.types.SpaceView3D.draw_handler_remove(
+                    self._pivotHandle, 'WINDOW')
+                # Restore Transform
+                lightObject.matrix_world = self.initialMatrixWorld
+                if self.initialTiltProperty is not None:
+                    SetLightTilt(lightObject, self.initialTiltProperty)
+            else:
+                SetLightDistance(lightObject, self.initialLightDistance)
+                SetLightOrbit(self.pivotObject, self.initialLightOrbit)
+                self.pivotObject.location = self.initialLightPivot
+                # Unparent
+                UnparentAndKeepPositionRemoveParent(
+                    self.pivotObject, lightObject)
+            # set Light as Active Object
+            context.view_layer.objects.active = lightObject
+            # delete light as well if True
+            if lightObject.lightControl.deleteOnCancel:
+                bpy.data.objects.remove(lightObject, do_unlink=True)
+            print('canceled adjusting Light')
+            return {'CANCELLED'}
+
+        if event.type in {'MIDDLEMOUSE', 'N'}:
+            return {'PASS_THROUGH'}
+
+        elif self.changeLightTilt:
+            # break early
+            if GetLightType(adjustedLight)[0] not in {'AREA', 'SPOT'}:
+                return {'RUNNING_MODAL'}
+            # Multiplication Factor
+            rateOfChange: mathutils.Vector = delta * self.tiltChangeSensitivity
+            if event.shift:
+                rateOfChange *= self.slowChangeSpeedPercent
+            rateOfChangeAngleX: float = radians(rateOfChange.x)
+            rateOfChangeAngleY: float = radians(rateOfChange.y)
+            # Setting Tilt
+            tilt = (adjustedLight.rotation_euler.x + rateOfChangeAngleX,
+                    adjustedLight.rotation_euler.y + rateOfChangeAngleY, adjustedLight.rotation_euler.z)
+            adjustedLight.rotation_euler = mathutils.Euler(tilt)
+            # Update Tilt on Object
+            SetLightTilt(adjustedLight, (
+                adjustedLight.rotation_euler.x, adjustedLight.rotation_euler.y - pi*0.5, adjustedLight.rotation_euler.z))
+
+        elif self.changeLightColor:
+            SetLightColorByDelta(
+                adjustedLight, delta, self.hueChangeSensitivity, self.saturationChangeSensitivity)
+
+        elif self.changeLightPivot:
+            # RAYCAST
+            mousepos = (event.mouse_region_x, event.mouse_region_y)
+            if self.pivotSlider and not event.shift:  # move and normal modes slide along the surface
+                hitObj, hitLocation, hitNormal, hitIndex, hitDistance = self.pivotSlider.slide(
+                    context, mousepos)
+            elif self.pivotRaycaster:
+                hitObj, hitLocation, hitNormal, hitIndex, hitDistance = self.pivotRaycaster.raycast(
+                    context, mousepos)
+            else:
+                hitObj, hitLocation, hitNormal, hitIndex, hitDistance = raycastCursor(
+                    context, mousepos=mousepos, debug=False)
+            if hitObj:
+                profiler.count("pivot.updates")
+                if event.alt:  # normal based modes
+                    hitNormal = GetHitNormal(
+                        context, hitObj, hitLocation, hitNormal, hitIndex)
+                if event.alt and event.shift:  # rotate Pivot, reflected view vector
+                    SetLight_Pivot_Position_Rotation_ByReflection(
+                        self.activeRegion3D, adjustedLight, self.pivotObject, hitLocation, hitNormal)
+                    adjustedLight.rotation_euler = (0, pi*0.5, 0)
+                    SetLightTilt(adjustedLight, (0.0, 0.0, 0.0))
+                elif event.shift:  # only move pivot
+                    SetLight_Pivot_ByHit(
+                        adjustedLight, self.pivotObject, hitLocation)
+                    adjustedLight.rotation_euler = (0, pi*0.5, 0)
+                    SetLightTilt(adjustedLight, (0.0, 0.0, 0.0))
+                elif event.alt:  # rotate Pivot, normal of Object
+                    SetLight_Pivot_Position_Rotation_ByNormal(
+                        adjustedLight, self.pivotObject, hitLocation, hitNormal)
+                    adjustedLight.rotation_euler = (0, pi*0.5, 0)
+                    SetLightTilt(adjustedLight, (0.0, 0.0, 0.0))
+                else:  # move pivot and light object
+                    SetLight_Pivot_Position_ByHit(
+                        adjustedLight, self.pivotObject, hitLocation)
+
+        elif self.changeLightAngle:
+
+            if GetLightType(adjustedLight)[0] not in {'AREA', 'SPOT', 'SUN'}:
+                return {'RUNNING_MODAL'}
+            SetLightAngleByDelta(
+                adjustedLight, delta, self.angleChangeSensitivity, event.shift, self.slowChangeSpeedPercent)
+
+        elif self.changeLightSize:
+            if GetLightType(adjustedLight)[0] not in {'AREA', 'POINT', 'SPOT'}:
+                return {'RUNNING_MODAL'}
+            SetLightSizeByDeltaClamped(
+                adjustedLight, delta, self.sizeChangeSensitivity, event.shift, self.slowChangeSpeedPercent)
+
+        elif self.changeLightBrightness:
+            SetLightBrightnessByDeltaClamped(
+                adjustedLight, delta, self.brightnessChangePercent, event.shift, self.slowChangeSpeedPercent)
+
+        elif self.changeLightDistance:
+            if GetLightType(adjustedLight)[0] == 'SUN':
+                return {'RUNNING_MODAL'}
+            SetLightDistanceByDeltaClamped(
+                adjustedLight, delta, self.zoomSpeedPercent, event.shift, self.slowChangeSpeedPercent)
+
+        elif self.changeLightOrbit:
+            if self.snapOrbit:
+                self.snapLightOrbit(context, delta, event.shift)
+            else:
+                SetLightOrbitByDelta(self, self.pivotObject, delta,
+                                     self.rotationSpeed, event.shift, self.slowChangeSpeedPercent)
+
+        # Write the adjusted transform to the light
+        if self.sessionLight:
+            self.sessionLight.apply()
+
+        # Update Heatmap with the edited light only
+        if self.showHeatmap:
+            self.updateHeatmap(context, lightObject)
+
+        # Set Visibility
+        if self.activeSpace3D:
+            self.activeSpace3D.overlay.show_overlays = self.toggleViewportVisibility
+            # self.activeSpace3D.show_gizmo = self.toggleViewportVisibility
+
+        # TODO : Change Pivot Point Size depending on Distance to Pivot
+
+        return {'RUNNING_MODAL'}
+
+
+class LIGHTCONTROL_OT_export_profile(bpy.types.Operator):
+    """Writes the recorded Profiling Samples as Chrome Trace JSON (open in chrome://tracing or Perfetto)"""
+    bl_idname = "lightcontrol.export_profile"
+    bl_label = "Export Profile"
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    filter_glob: bpy.props.StringProperty(default="*.json", options={'HIDDEN'})
+
+    def invoke(self, context: bpy.types.Context, event: bpy.types.Event):
+        if not self.filepath:
+            self.filepath = "lightcontrol_trace.json"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context: bpy.types.Context):
+        if not profiler.samples and not profiler.counterSamples:
+            self.report({'INFO'}, 'No Profiling Samples recorded - Nothing Exported')
+            return {'CANCELLED'}
+        profiler.exportChromeTrace(bpy.path.abspath(self.filepath))
+        self.report({'INFO'}, f'Exported Profile to {self.filepath}')
+        return {'FINISHED'}
+
+
+class LIGHTCONTROL_OT_replay_events(bpy.types.Operator):
+    """Replays a recorded Adjust Light Session on the Light it was recorded with"""
+    bl_idname = "lightcontrol.replay_events"
+    bl_label = "Replay Light Adjustment"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    filter_glob: bpy.props.StringProperty(default="*.jsonl", options={'HIDDEN'})
+    realTime: bpy.props.BoolProperty(
+        name="Real Time", description="Replay with the recorded Timing instead of as fast as possible", default=False)
+
+    @ classmethod
+    def poll(cls, context):
+        return context.area is not None and context.area.type == 'VIEW_3D'
+
+    def invoke(self, context: bpy.types.Context, event: bpy.types.Event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context: bpy.types.Context):
+        try:
+            header, events = LoadEventRecording(bpy.path.abspath(self.filepath))
+        except (OSError, ValueError) as error:
+            self.report({'ERROR'}, f'Could not load Recording: {error}')
+            return {'CANCELLED'}
+        # Restore Light and View
+        lightObject = ApplyEventRecordingStartState(context, header)
+        if lightObject is None:
+            self.report(
+                {'ERROR'}, f'Light {header["light"]} of the Recording not found - Nothing Replayed')
+            return {'CANCELLED'}
+        if context.region and tuple(header["region"]) != (context.region.width, context.region.height):
+            self.report(
+                {'WARNING'}, 'Viewport Size differs from the Recording, Raycasts may hit differently')
+        # Set as selected and active Object
+        for obj in context.selected_objects:  # deselect all
+            obj.select_set(False)
+        lightObject.select_set(True)
+        context.view_layer.objects.active = lightObject
+        # Go into Adjust Light mode with the Recording
+        if bpy.ops.lightcontrol.adjust_light.poll():
+            bpy.ops.lightcontrol.adjust_light(
+                'INVOKE_DEFAULT', replayFilepath=self.filepath, replayRealTime=self.realTime)
+        return {'FINISHED'}
+
+
+class LIGHTCONTROL_OT_export_rig(bpy.types.Operator):
+    """Writes the Lights of the Scene as a Light Rig, one JSON Line per Light"""
+    bl_idname = "lightcontrol.export_rig"
+    bl_label = "Export Light Rig"
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    filter_glob: bpy.props.StringProperty(default="*.jsonl", options={'HIDDEN'})
+    selectedOnly: bpy.props.BoolProperty(
+        name="Selected Only", description="Export only the selected Lights", default=False)
+
+    def invoke(self, context: bpy.types.Context, event: bpy.types.Event):
+        if not self.filepath:
+            self.filepath = bpy.path.clean_name(context.scene.name) + "_rig.jsonl"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context: bpy.types.Context):
+        objects = context.selected_objects if self.selectedOnly else context.scene.objects
+        try:
+            written = ExportRig(bpy.path.abspath(self.filepath), objects)
+        except OSError as error:
+            self.report({'ERROR'}, f'Could not write Light Rig: {error}')
+            return {'CANCELLED'}
+        self.report({'INFO'}, f'Exported {written} Lights to {self.filepath}')
+        return {'FINISHED'}
+
+
+class LIGHTCONTROL_OT_import_rig(bpy.types.Operator):
+    """Creates the Lights of a Light Rig in a new Collection"""
+    bl_idname = "lightcontrol.import_rig"
+    bl_label = "Import Light Rig"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    filter_glob: bpy.props.StringProperty(default="*.jsonl", options={'HIDDEN'})
+
+    def invoke(self, context: bpy.types.Context, event: bpy.types.Event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context: bpy.types.Context):
+        filepath = bpy.path.abspath(self.filepath)
+        collection = bpy.data.collections.new(bpy.path.display_name_from_filepath(filepath))
+        try:
+            created, skipped = ImportRig(filepath, collection)
+        except (OSError, ValueError) as error:
+            bpy.data.collections.remove(collection)
+            self.report({'ERROR'}, f'Could not load Light Rig: {error}')
+            return {'CANCELLED'}
+        # linked last so the scene is not updated while the Lights are created
+        context.scene.collection.children.link(collection)
+        if skipped:
+            self.report({'WARNING'}, f'Imported {created} Lights, skipped {skipped} of unknown Type')
+        else:
+            self.report({'INFO'}, f'Imported {created} Lights')
+        return {'FINISHED'}
+
+
+class LIGHTCONTROL_OT_save_rig_cache(bpy.types.Operator):
+    """Stores the Lights of the active Collection as a binary Rig Cache, an existing Cache only gets its changed Columns rewritten"""
+    bl_idname = "lightcontrol.save_rig_cache"
+    bl_label = "Save Rig Cache"
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    filter_glob: bpy.props.StringProperty(default="*.lcrig", options={'HIDDEN'})
+
+    def invoke(self, context: bpy.types.Context, event: bpy.types.Event):
+        if not self.filepath:
+            self.filepath = bpy.path.clean_name(context.collection.name) + ".lcrig"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context: bpy.types.Context):
+        from .rigcache import RigCacheLights, SaveRigCache
+        lightObjects = RigCacheLights(context.collection)
+        if not lightObjects:
+            self.report({'INFO'}, f'No Lights in {context.collection.name} - Nothing Saved')
+            return {'CANCELLED'}
+        try:
+            rewritten = SaveRigCache(bpy.path.abspath(self.filepath), lightObjects)
+        except OSError as error:
+            self.report({'ERROR'}, f'Could not write Rig Cache: {error}')
+            return {'CANCELLED'}
+        self.report({'INFO'}, f'Saved {len(lightObjects)} Lights, rewrote {", ".join(rewritten) or "nothing"}')
+        return {'FINISHED'}
+
+
+class LIGHTCONTROL_OT_load_rig_cache(bpy.types.Operator):
+    """Applies a binary Rig Cache onto the active Collection when it holds that Rig, otherwise creates its Lights in a new Collection"""
+    bl_idname = "lightcontrol.load_rig_cache"
+    bl_label = "Load Rig Cache"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    filter_glob: bpy.props.StringProperty(default="*.lcrig", options={'HIDDEN'})
+
+    def invoke(self, context: bpy.types.Context, event: bpy.types.Event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context: bpy.types.Context):
+        from .rigcache import ApplyRigCache, ReadRigCache, RigCacheMatches
+        filepath = bpy.path.abspath(self.filepath)
+        try:
+            names, columns = ReadRigCache(filepath)
+        except (OSError, ValueError) as error:
+            self.report({'ERROR'}, f'Could not load Rig Cache: {error}')
+            return {'CANCELLED'}
+        if RigCacheMatches(context.collection, names, columns):
+            applied = ApplyRigCache(context.collection, names, columns)
+            self.report({'INFO'}, f'Updated {applied} Lights of {context.collection.name}')
+            return {'FINISHED'}
+        collection = bpy.data.collections.new(bpy.path.display_name_from_filepath(filepath))
+        applied = ApplyRigCache(collection, names, columns)
+        # linked last so the scene is not updated while the Lights are created
+        context.scene.collection.children.link(collection)
+        self.report({'INFO'}, f'Created {applied} Lights')
+        return {'FINISHED'}
+
+
+class LIGHTCONTROL_OT_reset_profile(bpy.types.Operator):
+    """Clears the recorded Profiling Samples and Counters"""
+    bl_idname = "lightcontrol.reset_profile"
+    bl_label = "Reset Profile"
+
+    def execute(self, context: bpy.types.Context):
+        profiler.reset()
+        return {'FINISHED'}
+
+
+# class LIGHTCONTROL_OT_create_world_setup(bpy.types.Operator):
+#     bl_idname = "lightcontrol.create_world_setup"
+#     bl_label = "Add mapping"
+#     bl_description = "Add mapping to world, if not existent"
+#     bl_options = {'REGISTER', 'UNDO'}
+
+#     def execute(self,context):
+
+#         # world = bpy.data.worlds.new("World HDRI")
+#         world = context.scene.world
+#         world.name = "World HDRI"
+#         world['is_world_hdri'] = True
+#         world.use_nodes = True
+#         nodes = world.node_tree.nodes
+#         links = world.node_tree.links
+
+#         # Mapping
+#         mapping = nodes.new('ShaderNodeMapping')
+#         mapping.location = (-200,0)
+
+#         coord = nodes.new('ShaderNodeTexCoord')
+#         coord.location = (-400,0)
+
+#         # Texture
+#         img = nodes.new('ShaderNodeTexEnvironment')
+#         img.location = (0,0)
+#         img.name = 'World HDRI Tex'
+
+#         # Shader
+#         bg = nodes['Background']
+#         bg.location = (300,0)
+
+#         # Output
+#         output = nodes['World Output']
+#         output.location = (500,0)
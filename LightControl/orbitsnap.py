@@ -0,0 +1,81 @@
+"""Snapping the orbit to lighting presets with a precomputed grid over the orbit sphere, on NumPy arrays and without bpy.
+Presets are (elevation, azimuth) in degrees, elevation is up from the horizon and azimuth is measured from the viewer
+around the pivot, positive to the right of the view. Pivot eulers store the same orbit as (x, -elevation, azimuth)"""
+import numpy as np
+
+
+#################################################################
+######################### ORBIT SNAP ############################
+#################################################################
+
+
+# size of one grid cell in radians
+ORBIT_SNAP_RESOLUTION: float = np.radians(1.0)
+# elevation of the clock positions, the classic key height
+CLOCK_ELEVATION: float = 30.0
+
+# name => (elevation, azimuth) in degrees, the viewer sits at 6 o'clock
+CLASSIC_ORBIT_PRESETS: dict = {
+    "Front": (0.0, 0.0),
+    "Key Right": (45.0, 45.0),
+    "Key Left": (45.0, -45.0),
+    "Fill Right": (15.0, 60.0),
+    "Fill Left": (15.0, -60.0),
+    "Side Right": (0.0, 90.0),
+    "Side Left": (0.0, -90.0),
+    "Rim Right": (30.0, 135.0),
+    "Rim Left": (30.0, -135.0),
+    "Back": (30.0, 180.0),
+    "Butterfly": (50.0, 0.0),
+    "Top": (90.0, 0.0),
+    **{f"{hour} O'Clock": (CLOCK_ELEVATION, (hour - 6) * 30.0) for hour in range(1, 13)},
+}
+
+
+def sphereDirections(elevations, azimuths) -> np.ndarray:
+    """Unit vectors (...,3) for elevations and azimuths in radians"""
+    elevations = np.asarray(elevations, dtype=np.float64)
+    azimuths = np.asarray(azimuths, dtype=np.float64)
+    cosElevation = np.cos(elevations)
+    return np.stack((cosElevation * np.cos(azimuths), cosElevation * np.sin(azimuths), np.sin(elevations)), axis=-1)
+
+
+def wrapAngle(angles) -> np.ndarray:
+    """Angles in radians wrapped into [-pi, pi)"""
+    return (np.asarray(angles) + np.pi) % (2.0 * np.pi) - np.pi
+
+
+class OrbitSnapIndex:
+    """Presets on the orbit sphere plus an elevation x azimuth grid that stores the nearest preset of every cell,
+    built once so that snapping while dragging is a single lookup instead of comparing every preset"""
+
+    def __init__(self, presets: dict, resolution: float = ORBIT_SNAP_RESOLUTION):
+        self.names = list(presets)
+        angles = np.radians(np.array(list(presets.values()), dtype=np.float64).reshape(-1, 2))
+        self.elevations = angles[:, 0]
+        self.azimuths = wrapAngle(angles[:, 1])
+        self.directions = sphereDirections(self.elevations, self.azimuths)
+        self.elevationCells = int(np.ceil(np.pi / resolution))
+        self.azimuthCells = int(np.ceil(2.0 * np.pi / resolution))
+        self.nearest = np.full((self.elevationCells, self.azimuthCells), -1, dtype=np.int32)
+        if not self.names:
+            return
+        cellElevations = (np.arange(self.elevationCells) + 0.5) * np.pi / self.elevationCells - np.pi * 0.5
+        cellAzimuths = (np.arange(self.azimuthCells) + 0.5) * 2.0 * np.pi / self.azimuthCells - np.pi
+        for row, elevation in enumerate(cellElevations):
+            cellDirections = sphereDirections(np.full(self.azimuthCells, elevation), cellAzimuths)
+            self.nearest[row] = np.argmax(cellDirections @ self.directions.T, axis=1)
+
+    def lookup(self, elevation: float, azimuth: float) -> int:
+        """Index of the preset nearest to the cell of the orbit, -1 without presets"""
+        row = int((elevation + np.pi * 0.5) / np.pi * self.elevationCells)
+        column = int((wrapAngle(azimuth) + np.pi) / (2.0 * np.pi) * self.azimuthCells)
+        return int(self.nearest[min(max(row, 0), self.elevationCells - 1), min(column, self.azimuthCells - 1)])
+
+    def snap(self, elevation: float, azimuth: float, maximumAngle: float) -> int:
+        """Index of the nearest preset if it is within maximumAngle radians of the orbit, else -1"""
+        preset = self.lookup(elevation, azimuth)
+        if preset < 0:
+            return -1
+        cosAngle = float(sphereDirections(elevation, azimuth) @ self.directions[preset])
+        return preset if cosAngle >= np.cos(maximumAngle) else -1
@@ -0,0 +1,129 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import mathutils
+import numpy as np
+import bpy
+
+from .acceleration import GetObjectTriangles
+from .bvh import intersectRayTriangles
+from .profiling import profiled, profiler
+
+
+#################################################################
+####################### PARALLEL RAYCAST ########################
+#################################################################
+
+
+# triangles below which a chunk is not worth a task of its own
+MINIMUM_CHUNK_TRIANGLES: int = 20000
+
+_raycastPool: ThreadPoolExecutor = None
+
+
+def _getRaycastPool() -> ThreadPoolExecutor:
+    global _raycastPool
+    if _raycastPool is None:
+        _raycastPool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1,
+                                          thread_name_prefix="LightControlRaycast")
+    return _raycastPool
+
+
+def SplitIntoChunks(triangleCounts: list, chunkCount: int) -> list:
+    """Consecutive index ranges with about the same number of triangles each"""
+    total = sum(triangleCounts)
+    chunkCount = max(1, min(chunkCount, total // MINIMUM_CHUNK_TRIANGLES, len(triangleCounts)))
+    target = total / chunkCount
+    chunks = []
+    begin = 0
+    accumulated = 0
+    for i, count in enumerate(triangleCounts):
+        accumulated += count
+        if accumulated >= target * (len(chunks) + 1) and len(chunks) < chunkCount - 1:
+            chunks.append(range(begin, i + 1))
+            begin = i + 1
+    chunks.append(range(begin, len(triangleCounts)))
+    return [chunk for chunk in chunks if len(chunk)]
+
+
+def _intersectChunk(chunk: range, triangleSets: list, origins: np.ndarray, directions: np.ndarray) -> tuple:
+    """Nearest hit of one ray per object over a chunk of objects: distance, object index and triangle, runs in a worker"""
+    bestT = np.inf
+    bestObject = -1
+    bestTriangle = -1
+    for i in chunk:
+        triangles = triangleSets[i]
+        if not len(triangles):
+            continue
+        t = intersectRayTriangles(origins[i], directions[i], triangles[:, 0], triangles[:, 1], triangles[:, 2])
+        nearest = int(np.argmin(t))
+        if t[nearest] < bestT:
+            bestT, bestObject, bestTriangle = float(t[nearest]), i, nearest
+    return bestT, bestObject, bestTriangle
+
+
+def RaysHitBounds(origins: np.ndarray, directions: np.ndarray, boundsMin: np.ndarray, boundsMax: np.ndarray) -> np.ndarray:
+    """Slab test of one ray per object (O,3) against that objects bounds (O,3), True (O,) where the ray enters them"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inverseDirections = np.where(directions != 0.0, 1.0 / directions, np.inf)
+        t1 = (boundsMin - origins) * inverseDirections
+        t2 = (boundsMax - origins) * inverseDirections
+    tNear = np.nanmax(np.minimum(t1, t2), axis=1)
+    tFar = np.nanmin(np.maximum(t1, t2), axis=1)
+    return tFar >= np.maximum(tNear, 0.0)
+
+
+@profiled("raycastObjectsParallel")
+def RaycastObjectsParallel(context: bpy.types.Context, objects: list, origin_3d: mathutils.Vector, vector_3d: mathutils.Vector):
+    """The nearest hit of a world ray against the evaluated meshes of objects, same results as raycastCursor.
+    Rays are moved into object space for all objects at once and slab tested against the object bounds (broad phase),
+    the triangle tests of the objects left run in a thread pool by object chunk (narrow phase, NumPy releases the GIL
+    for the heavy parts) and the chunk results are reduced to the nearest hit"""
+    if not objects:
+        return None, None, None, None, None
+    # with a unit world direction t in object space is the world distance
+    matrices = np.array([obj.matrix_world for obj in objects], dtype=np.float64)
+    inverses = np.linalg.pinv(matrices)
+    origins = inverses[:, :3, :3] @ np.array(origin_3d) + inverses[:, :3, 3]
+    directions = inverses[:, :3, :3] @ np.array(vector_3d)
+    corners = np.array([obj.bound_box for obj in objects], dtype=np.float64).reshape(-1, 8, 3)
+    survivors = np.nonzero(RaysHitBounds(origins, directions, corners.min(axis=1), corners.max(axis=1)))[0]
+    profiler.count("raycast.boundsCulled", len(objects) - len(survivors))
+    if not len(survivors):
+        return None, None, None, None, None
+    objects = [objects[i] for i in survivors]
+    origins = origins[survivors]
+    directions = directions[survivors]
+
+    triangleSets = []
+    polygonSets = []
+    for obj in objects:
+        triangles, polygonIndices = GetObjectTriangles(context, obj)
+        triangleSets.append(triangles)
+        polygonSets.append(polygonIndices)
+
+    chunks = SplitIntoChunks([len(triangles) for triangles in triangleSets], os.cpu_count() or 1)
+    profiler.count("raycast.parallelChunks", len(chunks))
+    if len(chunks) == 1:
+        results = [_intersectChunk(chunks[0], triangleSets, origins, directions)]
+    else:
+        results = list(_getRaycastPool().map(
+            _intersectChunk, chunks, [triangleSets] * len(chunks), [origins] * len(chunks), [directions] * len(chunks)))
+    distance, objectIndex, triangle = min(results)
+    if objectIndex < 0:
+        return None, None, None, None, None
+
+    mx = objects[objectIndex].matrix_world
+    edges = triangleSets[objectIndex][triangle].astype(np.float64)
+    normal = np.cross(edges[1], edges[2])
+    normal /= np.linalg.norm(normal) or 1.0
+    location = origins[objectIndex] + directions[objectIndex] * distance
+    return (objects[objectIndex], mx @ mathutils.Vector(location), mx.to_3x3() @ mathutils.Vector(normal),
+            int(polygonSets[objectIndex][triangle]), distance)
+
+
+def unregister():
+    global _raycastPool
+    if _raycastPool is not None:
+        _raycastPool.shutdown(wait=False, cancel_futures=True)
+        _raycastPool = None
@@ -0,0 +1,101 @@
+import mathutils
+import bpy
+
+
+#################################################################
+####################### PIVOT FRAME #############################
+#################################################################
+
+
+class PivotFrame:
+    """Stands in for the temporary pivot empty. The orbit is kept in Python as location and XYZ euler
+    (0, elevation, azimuth), so a session doesnt add objects or parent relations to the scene"""
+    rotation_mode: str = 'XYZ'
+
+    def __init__(self, location: mathutils.Vector, rotation: mathutils.Euler):
+        self.location = location
+        self.rotation_euler = rotation
+        # read and written by the modal like on the empty
+        self.empty_display_size: float = 1.0
+
+    @property
+    def location(self) -> mathutils.Vector:
+        return self._location
+
+    @location.setter
+    def location(self, value):
+        self._location = mathutils.Vector(value)
+
+    @property
+    def rotation_euler(self) -> mathutils.Euler:
+        return self._rotation
+
+    @rotation_euler.setter
+    def rotation_euler(self, value):
+        self._rotation = mathutils.Euler(value, 'XYZ')
+
+    @property
+    def matrix_world(self) -> mathutils.Matrix:
+        return mathutils.Matrix.LocRotScale(self._location, self._rotation, None)
+
+
+class SessionLight:
+    """Stands in for the light object while adjusting without a pivot empty. location and rotation_euler are
+    local to the PivotFrame like they were when parented to the empty (distance along +X and tilt), everything
+    else is passed on to the light object. apply writes the resulting matrix_world to the light"""
+
+    def __init__(self, lightObject: bpy.types.Object, pivotFrame: PivotFrame, location: mathutils.Vector, rotation: mathutils.Euler):
+        object.__setattr__(self, "lightObject", lightObject)
+        object.__setattr__(self, "pivotFrame", pivotFrame)
+        object.__setattr__(self, "scale", lightObject.matrix_world.to_scale())
+        self.location = location
+        self.rotation_euler = rotation
+
+    @property
+    def location(self) -> mathutils.Vector:
+        return self._location
+
+    @location.setter
+    def location(self, value):
+        object.__setattr__(self, "_location", mathutils.Vector(value))
+
+    @property
+    def rotation_euler(self) -> mathutils.Euler:
+        return self._rotation
+
+    @rotation_euler.setter
+    def rotation_euler(self, value):
+        object.__setattr__(self, "_rotation", mathutils.Euler(value, 'XYZ'))
+
+    @property
+    def matrix_local(self) -> mathutils.Matrix:
+        return mathutils.Matrix.LocRotScale(self._location, self._rotation, self.scale)
+
+    @property
+    def matrix_world(self) -> mathutils.Matrix:
+        return self.pivotFrame.matrix_world @ self.matrix_local
+
+    def apply(self):
+        """Single RNA write per event, no parent relation and no view layer update needed"""
+        self.lightObject.matrix_world = self.matrix_world
+
+    def __getattr__(self, name: str):
+        return getattr(self.lightObject, name)
+
+    def __setattr__(self, name: str, value):
+        if name in ("location", "rotation_euler"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.lightObject, name, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.lightObject
+
+    def __getitem__(self, key: str):
+        return self.lightObject[key]
+
+    def __setitem__(self, key: str, value):
+        self.lightObject[key] = value
+
+    def __delitem__(self, key: str):
+        del self.lightObject[key]
@@ -0,0 +1,264 @@
+import bpy
+
+from .profiling import SyncProfilerWithPreferences
+
+
+#################################################################
+####################### PREFERENCES #############################
+#################################################################
+
+
+class LIGHTCONTROL_Addon_Preferences(bpy.types.AddonPreferences):
+    # this must match the add-on name, use '__package__'
+    # when defining this in a submodule of a python package.
+    bl_idname = __package__
+
+    areaLightCountSpawned: bpy.props.IntProperty(
+        name="Spawned Area Lights",
+        default=0,
+    )
+    pointLightCountSpawned: bpy.props.IntProperty(
+        name="Spawned Point Lights",
+        default=0,
+    )
+    sunLightCountSpawned: bpy.props.IntProperty(
+        name="Spawned Sun Lights",
+        default=0,
+    )
+    spotLightCountSpawned: bpy.props.IntProperty(
+        name="Spawned Spot Lights",
+        default=0,
+    )
+    profilingEnabled: bpy.props.BoolProperty(
+        name="Enable Profiling",
+        description="Record timings and counters of the Adjust Light operator into a ring buffer",
+        default=False,
+        update=lambda self, context: SyncProfilerWithPreferences(context),
+    )
+    recordEvents: bpy.props.BoolProperty(
+        name="Record Light Adjustments",
+        description="Save the events of every Adjust Light session, to replay them with Replay Light Adjustment",
+        default=False,
+    )
+    recordingDirectory: bpy.props.StringProperty(
+        name="Recording Directory",
+        description="Where recordings are saved, the temporary directory when empty",
+        subtype='DIR_PATH',
+        default="",
+    )
+    usePivotEmpty: bpy.props.BoolProperty(
+        name="Use Pivot Empty",
+        description="Parent the light to a temporary empty while adjusting, like older versions. Slower in big scenes, every session rebuilds the depsgraph relations",
+        default=False,
+    )
+    useCoherentPivotRaycast: bpy.props.BoolProperty(
+        name="Coherent Pivot Raycasts",
+        description="While dragging the pivot, test the triangles around the last hit first and only raycast the whole scene when they miss or could be occluded",
+        default=True,
+    )
+    slidePivotOnSurface: bpy.props.BoolProperty(
+        name="Slide Pivot on Surface",
+        description="Ctrl and Ctrl+Alt drags walk the pivot over the mesh it was dropped on instead of raycasting the scene every event, smoother and cheaper on dense scans",
+        default=False,
+    )
+    useSmoothHitNormals: bpy.props.BoolProperty(
+        name="Smooth Hit Normals",
+        description="Place lights along the vertex normals interpolated at the hit instead of the face normal, steadier on faceted or noisy scans",
+        default=False,
+    )
+    orbitSnapAngle: bpy.props.FloatProperty(
+        name="Orbit Snap Angle",
+        description="Orbit snapping (O while adjusting a light) jumps to a lighting preset closer than this angle",
+        default=0.1745329,
+        min=0.0,
+        max=0.7853982,
+        subtype='ANGLE',
+    )
+    heatmapSpacing: bpy.props.IntProperty(
+        name="Heatmap Spacing",
+        description="Pixels between the surface samples of the irradiance heatmap (H while adjusting a light), smaller is finer but slower",
+        default=24,
+        min=4,
+        max=128,
+        subtype='PIXEL',
+    )
+    contributionCacheSizeLimit: bpy.props.IntProperty(
+        name="Heatmap Cache Size (MB)",
+        description="Memory for the irradiance of every light at the heatmap samples, samples of views not looked at recently are dropped above this size",
+        default=256,
+        min=1,
+    )
+    useHeatmapShadows: bpy.props.BoolProperty(
+        name="Heatmap Shadows",
+        description="Cast a shadow ray from every heatmap sample to each light, rays are reused while a light moves only a few centimeters",
+        default=False,
+    )
+    useProxyRaycast: bpy.props.BoolProperty(
+        name="Proxy Raycast",
+        description="Raycast very heavy meshes against a decimated proxy while adjusting, the pivot is moved onto the real mesh on approve",
+        default=False,
+    )
+    proxyRaycastMinimumFaces: bpy.props.IntProperty(
+        name="Proxy Minimum Faces",
+        description="Meshes with at least this many faces are raycast against their proxy",
+        default=5000000,
+        min=0,
+    )
+    proxyTriangleCount: bpy.props.IntProperty(
+        name="Proxy Triangles",
+        description="About how many triangles a proxy keeps, bounds the cost of a raycast whatever the size of the mesh",
+        default=200000,
+        min=1000,
+    )
+    useRaycastFilter: bpy.props.BoolProperty(
+        name="Raycast Filter",
+        description="Leave meshes out of pivot and placement raycasts by collection, ray visibility, holdout, property and light linking",
+        default=False,
+    )
+    raycastIncludeCollections: bpy.props.StringProperty(
+        name="Include Collections",
+        description="Comma separated collections, only their objects are raycast. All collections when empty",
+        default="",
+    )
+    raycastExcludeCollections: bpy.props.StringProperty(
+        name="Exclude Collections",
+        description="Comma separated collections whose objects are never raycast",
+        default="",
+    )
+    raycastSkipCameraInvisible: bpy.props.BoolProperty(
+        name="Skip Camera Invisible",
+        description="Leave out objects with camera ray visibility disabled, like blockers hidden from the camera",
+        default=True,
+    )
+    raycastSkipHoldouts: bpy.props.BoolProperty(
+        name="Skip Holdouts",
+        description="Leave out holdout objects and objects in holdout collections of the view layer",
+        default=True,
+    )
+    raycastRespectLightLinking: bpy.props.BoolProperty(
+        name="Respect Light Linking",
+        description="Leave out objects the adjusted light is not linked to (Blender 4.0 and newer)",
+        default=True,
+    )
+    raycastIgnoreProperty: bpy.props.StringProperty(
+        name="Ignore Property",
+        description="Objects with this custom property set to a true value are left out",
+        default="lightControlIgnore",
+    )
+    useAcceleratedRaycast: bpy.props.BoolProperty(
+        name="Accelerated Raycast",
+        description="Raycast heavy meshes against a BVH built by the add-on instead of obj.ray_cast",
+        default=False,
+    )
+    acceleratedRaycastMinimumFaces: bpy.props.IntProperty(
+        name="Minimum Faces",
+        description="Meshes with fewer faces keep using obj.ray_cast",
+        default=100000,
+        min=0,
+    )
+    buildBVHInBackground: bpy.props.BoolProperty(
+        name="Build in Background",
+        description="Build BVHs in worker threads, raycasts use the regular path until an objects BVH is ready",
+        default=True,
+    )
+    useVectorizedRaycast: bpy.props.BoolProperty(
+        name="Vectorized Raycast",
+        description="Test all meshes at once against cached world space triangles instead of calling ray_cast per object, fast for modest scenes",
+        default=False,
+    )
+    useParallelRaycast: bpy.props.BoolProperty(
+        name="Parallel Raycast",
+        description="Test the triangles of all meshes in worker threads instead of one object after another, for scenes with many heavy meshes that change too often for BVHs",
+        default=False,
+    )
+    useBVHDiskCache: bpy.props.BoolProperty(
+        name="BVH Disk Cache",
+        description="Store built BVHs on disk by mesh content, so the next session loads instead of rebuilding them",
+        default=False,
+    )
+    bvhCacheDirectory: bpy.props.StringProperty(
+        name="BVH Cache Directory",
+        description="Where BVHs are cached, a folder in the Blender user datafiles when empty",
+        subtype='DIR_PATH',
+        default="",
+    )
+    bvhCacheSizeLimit: bpy.props.IntProperty(
+        name="BVH Cache Size (MB)",
+        description="Least recently used BVHs are deleted when the cache grows above this size",
+        default=4096,
+        min=1,
+    )
+    profilingShowHUD: bpy.props.BoolProperty(
+        name="Show Profiling HUD",
+        description="Draw a line with the last timings while adjusting a light",
+        default=False,
+        update=lambda self, context: SyncProfilerWithPreferences(context),
+    )
+
+    def draw(self, context):
+        layout = self.layout
+        layout.label(text="Spawned Area Lights " +
+                     str(self.areaLightCountSpawned))
+        layout.label(text="Spawned Point Lights " +
+                     str(self.pointLightCountSpawned))
+        layout.label(text="Spawned Sun Lights " +
+                     str(self.sunLightCountSpawned))
+        layout.label(text="Spawned Spot Lights " +
+                     str(self.spotLightCountSpawned))
+        # Profiling
+        row = layout.row()
+        row.prop(self, "profilingEnabled")
+        row.prop(self, "profilingShowHUD")
+        row = layout.row()
+        row.operator("lightcontrol.export_profile")
+        row.operator("lightcontrol.reset_profile")
+        # Light Rigs
+        row = layout.row()
+        row.operator("lightcontrol.export_rig")
+        row.operator("lightcontrol.import_rig")
+        row = layout.row()
+        row.operator("lightcontrol.save_rig_cache")
+        row.operator("lightcontrol.load_rig_cache")
+        # Event Recording
+        layout.prop(self, "recordEvents")
+        layout.prop(self, "recordingDirectory")
+        layout.prop(self, "usePivotEmpty")
+        row = layout.row()
+        row.prop(self, "useCoherentPivotRaycast")
+        row.prop(self, "slidePivotOnSurface")
+        row = layout.row()
+        row.prop(self, "useSmoothHitNormals")
+        row.prop(self, "orbitSnapAngle")
+        row = layout.row()
+        row.prop(self, "heatmapSpacing")
+        row.prop(self, "contributionCacheSizeLimit")
+        row.prop(self, "useHeatmapShadows")
+        # Proxy Raycast
+        row = layout.row()
+        row.prop(self, "useProxyRaycast")
+        row.prop(self, "proxyRaycastMinimumFaces")
+        row.prop(self, "proxyTriangleCount")
+        # Raycast Filter
+        row = layout.row()
+        row.prop(self, "useRaycastFilter")
+        row.prop(self, "raycastIgnoreProperty")
+        row = layout.row()
+        row.prop(self, "raycastIncludeCollections")
+        row.prop(self, "raycastExcludeCollections")
+        row = layout.row()
+        row.prop(self, "raycastSkipCameraInvisible")
+        row.prop(self, "raycastSkipHoldouts")
+        row.prop(self, "raycastRespectLightLinking")
+        # Raycast Acceleration
+        row = layout.row()
+        row.prop(self, "useAcceleratedRaycast")
+        row.prop(self, "acceleratedRaycastMinimumFaces")
+        row.prop(self, "buildBVHInBackground")
+        row = layout.row()
+        row.prop(self, "useVectorizedRaycast")
+        row.prop(self, "useParallelRaycast")
+        row = layout.row()
+        row.prop(self, "useBVHDiskCache")
+        row.prop(self, "bvhCacheSizeLimit")
+        layout.prop(self, "bvhCacheDirectory")
+        # layout.prop(self, "areaLightCountSpawned")
@@ -0,0 +1,131 @@
+import json
+import time
+from collections import deque
+
+import bpy
+
+
+#################################################################
+######################## PROFILING ##############################
+#################################################################
+
+
+class _NullStage:
+    """Stage that does nothing, handed out while profiling is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _ProfilerStage:
+    def __init__(self, profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start: int = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.profiler.record(self.name, self.start,
+                             time.perf_counter_ns() - self.start)
+        return False
+
+
+class Profiler:
+    """Collects stage timings and counters into a ring buffer, only a bool check when disabled"""
+
+    def __init__(self, capacity: int = 8192):
+        self.enabled: bool = False
+        self.showHUD: bool = False
+        # ring buffer of (name, start ns, duration ns)
+        self.samples: deque = deque(maxlen=capacity)
+        # ring buffer of (name, timestamp ns, value)
+        self.counterSamples: deque = deque(maxlen=capacity)
+        self.counters: dict[str, int] = {}
+        self.lastDuration: dict[str, int] = {}
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _ProfilerStage(self, name)
+
+    def record(self, name: str, start: int, duration: int):
+        self.samples.append((name, start, duration))
+        self.lastDuration[name] = duration
+
+    def count(self, name: str, amount: int = 1):
+        if not self.enabled:
+            return
+        value = self.counters.get(name, 0) + amount
+        self.counters[name] = value
+        self.counterSamples.append((name, time.perf_counter_ns(), value))
+
+    def reset(self):
+        self.samples.clear()
+        self.counterSamples.clear()
+        self.counters.clear()
+        self.lastDuration.clear()
+
+    def summary(self) -> str:
+        """One line for the HUD, last duration of the main stages in ms and raycast counters"""
+        parts = []
+        for name in ("modal", "raycastCursor", "drawOperationOptions"):
+            if name in self.lastDuration:
+                parts.append(
+                    f"{name} {self.lastDuration[name] / 1000000.0:.2f} ms")
+        parts.append(f"events {self.counters.get('events', 0)}")
+        parts.append(
+            f"ray candidates {self.counters.get('raycast.candidates', 0)} hits {self.counters.get('raycast.hits', 0)}")
+        return " | ".join(parts)
+
+    def chromeTrace(self) -> dict:
+        """Returns the buffered samples as a Chrome trace (chrome://tracing, Perfetto) dictionary"""
+        traceEvents = []
+        for name, start, duration in self.samples:
+            traceEvents.append({"name": name, "cat": "lightcontrol", "ph": "X",
+                                "ts": start / 1000.0, "dur": duration / 1000.0, "pid": 0, "tid": 0})
+        for name, timestamp, value in self.counterSamples:
+            traceEvents.append({"name": name, "cat": "lightcontrol", "ph": "C",
+                                "ts": timestamp / 1000.0, "pid": 0, "tid": 0, "args": {"value": value}})
+        traceEvents.sort(key=lambda e: e["ts"])
+        return {"traceEvents": traceEvents, "displayTimeUnit": "ms"}
+
+    def exportChromeTrace(self, filepath: str):
+        with open(filepath, "w") as file:
+            json.dump(self.chromeTrace(), file)
+
+
+profiler = Profiler()
+
+
+def profiled(name: str):
+    """Decorator that times a function as a profiler stage, calls straight through when disabled"""
+    def decorator(function):
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.record(name, start, time.perf_counter_ns() - start)
+        wrapper.__name__ = function.__name__
+        wrapper.__doc__ = function.__doc__
+        return wrapper
+    return decorator
+
+
+def SyncProfilerWithPreferences(context: bpy.types.Context):
+    addon = context.preferences.addons.get(__package__)
+    if addon is None:
+        return
+    profiler.enabled = addon.preferences.profilingEnabled
+    profiler.showHUD = addon.preferences.profilingShowHUD
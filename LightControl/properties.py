@@ -0,0 +1,116 @@
+import bpy
+from bpy.app.handlers import persistent
+
+
+#################################################################
+######################## LIGHT PROPERTIES #######################
+#################################################################
+
+
+class LIGHTCONTROL_PG_light_settings(bpy.types.PropertyGroup):
+    """Pivot, tilt and orbit of a light placed with the add-on, typed RNA instead of ID properties so they can be
+    read directly, driven and used with foreach_get"""
+    pivotPoint: bpy.props.FloatVectorProperty(
+        name="Pivot Point",
+        description="World position the light orbits around",
+        size=3,
+        subtype='TRANSLATION',
+    )
+    hasPivotPoint: bpy.props.BoolProperty(
+        name="Has Pivot Point",
+        description="The pivot point was set, lights that were never placed keep the origin",
+        default=False,
+    )
+    tilt: bpy.props.FloatVectorProperty(
+        name="Tilt",
+        description="Rotation of the light relative to looking at the pivot",
+        size=3,
+        subtype='EULER',
+    )
+    hasTilt: bpy.props.BoolProperty(
+        name="Has Tilt",
+        default=False,
+    )
+    orbit: bpy.props.FloatVectorProperty(
+        name="Orbit",
+        description="XYZ euler of the pivot when the light was last adjusted",
+        size=3,
+        subtype='EULER',
+    )
+    deleteOnCancel: bpy.props.BoolProperty(
+        name="Delete on Cancel",
+        description="The light was just added and is removed again when adjusting it is cancelled",
+        default=False,
+    )
+
+
+def _vectorProperty(value):
+    """Three floats of an ID property, None when it is not a sequence of three numbers"""
+    try:
+        values = tuple(float(v) for v in value)
+    except (TypeError, ValueError):
+        return None
+    return values if len(values) == 3 else None
+
+
+def MigrateLightProperties(obj: bpy.types.Object) -> bool:
+    """Moves the pivotPoint, tilt and deleteOnCancel ID properties of older versions into obj.lightControl,
+    malformed values are dropped. Returns True when anything was moved"""
+    settings: LIGHTCONTROL_PG_light_settings = obj.lightControl
+    moved = False
+    if "pivotPoint" in obj:
+        pivotPoint = _vectorProperty(obj["pivotPoint"])
+        if pivotPoint is not None:
+            settings.pivotPoint = pivotPoint
+            settings.hasPivotPoint = True
+        del obj["pivotPoint"]
+        moved = True
+    if "tilt" in obj:
+        tilt = _vectorProperty(obj["tilt"])
+        if tilt is not None:
+            settings.tilt = tilt
+            settings.hasTilt = True
+        del obj["tilt"]
+        moved = True
+    if "deleteOnCancel" in obj:
+        settings.deleteOnCancel = bool(obj["deleteOnCancel"])
+        del obj["deleteOnCancel"]
+        moved = True
+    return moved
+
+
+def MigrateAllLightProperties() -> int:
+    """MigrateLightProperties for every light in the file, returns how many were migrated"""
+    migrated = sum(MigrateLightProperties(obj) for obj in bpy.data.objects if obj.type == 'LIGHT' and obj.library is None)
+    if migrated:
+        print(f"Light Control: moved the custom properties of {migrated} lights into Light Control settings")
+    return migrated
+
+
+@persistent
+def _onLoadPost(*args):
+    MigrateAllLightProperties()
+
+
+def _migrateOnRegister():
+    # bpy.data is not accessible while the add-on registers
+    MigrateAllLightProperties()
+    return None
+
+
+def register(migrateOnLoad: bool = True):
+    """migrateOnLoad=False only adds the settings, for tools that have to see the ID properties of older versions"""
+    bpy.utils.register_class(LIGHTCONTROL_PG_light_settings)
+    bpy.types.Object.lightControl = bpy.props.PointerProperty(type=LIGHTCONTROL_PG_light_settings)
+    if migrateOnLoad:
+        bpy.app.handlers.load_post.append(_onLoadPost)
+        bpy.app.timers.register(_migrateOnRegister, first_interval=0.0)
+
+
+def unregister():
+    if _onLoadPost in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_onLoadPost)
+    if bpy.app.timers.is_registered(_migrateOnRegister):
+        bpy.app.timers.unregister(_migrateOnRegister)
+    del bpy.types.Object.lightControl
+    bpy.utils.unregister_class(LIGHTCONTROL_PG_light_settings)
@@ -0,0 +1,59 @@
+"""Decimated stand-ins for very heavy meshes by vertex clustering, on NumPy arrays and without bpy.
+Vertices are snapped to a voxel grid and merged per cell, triangles that collapse are dropped. The proxy surface
+stays within one cell diagonal of the original, good enough to pick a pivot, not to place it exactly"""
+import numpy as np
+
+
+#################################################################
+########################## PROXY MESH ###########################
+#################################################################
+
+
+# the grid is refined or coarsened this many times to get near the target triangle count
+PROXY_RESOLUTION_STEPS: int = 4
+
+
+def clusterMesh(vertices: np.ndarray, triangleIndices: np.ndarray, polygonIndices: np.ndarray, resolution: int) -> tuple:
+    """Merges the vertices of every cell of a resolution^3 grid over the bounds into their mean.
+    Returns proxy vertices (V,3) float32, triangles (T,3) int32 and the source polygon of every triangle (T) int32"""
+    vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+    triangleIndices = np.asarray(triangleIndices, dtype=np.int64).reshape(-1, 3)
+    if not len(vertices) or not len(triangleIndices):
+        return vertices, triangleIndices.astype(np.int32), np.asarray(polygonIndices, dtype=np.int32)
+    boundsMin = vertices.min(axis=0)
+    cellSize = max(float((vertices.max(axis=0) - boundsMin).max()) / resolution, 1e-9)
+    cells = np.minimum(((vertices - boundsMin) / cellSize).astype(np.int64), resolution - 1)
+    cellKeys = (cells[:, 0] * resolution + cells[:, 1]) * resolution + cells[:, 2]
+    _, vertexClusters = np.unique(cellKeys, return_inverse=True)
+    vertexClusters = vertexClusters.reshape(-1)
+    counts = np.bincount(vertexClusters).astype(np.float64)
+    proxyVertices = np.stack([np.bincount(vertexClusters, weights=vertices[:, axis]) / counts
+                              for axis in range(3)], axis=1).astype(np.float32)
+
+    proxyTriangles = vertexClusters[triangleIndices]
+    kept = ((proxyTriangles[:, 0] != proxyTriangles[:, 1]) & (proxyTriangles[:, 1] != proxyTriangles[:, 2])
+            & (proxyTriangles[:, 0] != proxyTriangles[:, 2]))
+    proxyTriangles = proxyTriangles[kept]
+    proxyPolygons = np.asarray(polygonIndices, dtype=np.int32)[kept]
+    # both windings of a collapsed sheet end up in the same cells, keep one triangle per vertex set
+    _, first = np.unique(np.sort(proxyTriangles, axis=1), axis=0, return_index=True)
+    first.sort()
+    return proxyVertices, proxyTriangles[first].astype(np.int32), proxyPolygons[first]
+
+
+def BuildProxyMesh(vertices: np.ndarray, triangleIndices: np.ndarray, polygonIndices: np.ndarray, targetTriangles: int) -> tuple:
+    """clusterMesh with a grid resolution chosen so that the proxy has about targetTriangles triangles.
+    Meshes that are already small enough come back unchanged"""
+    triangleIndices = np.asarray(triangleIndices).reshape(-1, 3)
+    if len(triangleIndices) <= targetTriangles:
+        return vertices, triangleIndices, polygonIndices
+    # a surface fills about resolution^2 cells with two triangles each
+    resolution = max(2, int(np.sqrt(targetTriangles * 0.5)))
+    proxy = clusterMesh(vertices, triangleIndices, polygonIndices, resolution)
+    for _ in range(PROXY_RESOLUTION_STEPS):
+        ratio = len(proxy[1]) / max(targetTriangles, 1)
+        if 0.7 <= ratio <= 1.1:
+            break
+        resolution = max(2, int(resolution / np.sqrt(max(ratio, 1e-3))))
+        proxy = clusterMesh(vertices, triangleIndices, polygonIndices, resolution)
+    return proxy
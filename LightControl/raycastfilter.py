@@ -0,0 +1,170 @@
+import bpy
+from bpy.app.handlers import persistent
+
+from .profiling import profiled, profiler
+
+
+#################################################################
+######################## RAYCAST FILTER #########################
+#################################################################
+
+
+# (filter settings, visible mesh pointers, candidate objects) of the last compile
+_candidates: tuple = (None, (), [])
+_handlersRegistered: bool = False
+
+
+def GetRaycastFilterSettings(context: bpy.types.Context):
+    """Returns the add-on preferences when the raycast filter is enabled, None otherwise"""
+    addon = context.preferences.addons.get(__package__)
+    if addon is None or not addon.preferences.useRaycastFilter:
+        return None
+    return addon.preferences
+
+
+def SplitNames(text: str) -> frozenset:
+    """Comma separated names as a set, empty entries are dropped"""
+    return frozenset(name.strip() for name in text.split(",") if name.strip())
+
+
+def _collectionObjects(names: frozenset) -> set:
+    """Pointers of the objects in the named collections and their children"""
+    pointers = set()
+    for name in names:
+        collection = bpy.data.collections.get(name)
+        if collection is None:
+            print(f"Raycast filter: no collection named {name}")
+            continue
+        pointers.update(obj.as_pointer() for obj in collection.all_objects)
+    return pointers
+
+
+def _holdoutCollections(viewLayer: bpy.types.ViewLayer) -> set:
+    """Pointers of the collections set to holdout in the view layer, children of a holdout count as holdout"""
+    pointers = set()
+    layerCollections = [(viewLayer.layer_collection, False)]
+    while layerCollections:
+        layerCollection, parentHoldout = layerCollections.pop()
+        holdout = parentHoldout or layerCollection.holdout
+        if holdout:
+            pointers.add(layerCollection.collection.as_pointer())
+        layerCollections.extend((child, holdout) for child in layerCollection.children)
+    return pointers
+
+
+def _lightLinkingReceivers(lightObject: bpy.types.Object) -> tuple:
+    """Pointers of the objects a light is linked to and excluded from, (None, empty set) without light linking.
+    Light linking exists since Blender 4.0, older versions have no receiver collection"""
+    lightLinking = getattr(lightObject, "light_linking", None) if lightObject else None
+    receivers = lightLinking.receiver_collection if lightLinking else None
+    if receivers is None:
+        return None, set()
+    includes, excludes = set(), set()
+    for item in receivers.collection_objects:
+        linked = includes if item.light_linking.link_state == 'INCLUDE' else excludes
+        linked.add(item.object.as_pointer())
+    for item in receivers.collection_children:
+        linked = includes if item.light_linking.link_state == 'INCLUDE' else excludes
+        linked.update(obj.as_pointer() for obj in item.collection.all_objects)
+    return includes if includes else None, excludes
+
+
+def _filterKey(context: bpy.types.Context, preferences) -> tuple:
+    activeObject = context.active_object
+    lightObject = activeObject if activeObject and activeObject.type == 'LIGHT' and preferences.raycastRespectLightLinking else None
+    return (preferences.raycastIncludeCollections, preferences.raycastExcludeCollections,
+            preferences.raycastSkipCameraInvisible, preferences.raycastSkipHoldouts, preferences.raycastIgnoreProperty,
+            lightObject.as_pointer() if lightObject else 0)
+
+
+@profiled("compileRaycastCandidates")
+def CompileRaycastCandidates(context: bpy.types.Context, meshObjects: list, preferences) -> list:
+    """The meshes raycasts may hit after the collection lists, ray visibility, holdouts, the ignore property
+    and the light linking of the active light were applied"""
+    includeNames = SplitNames(preferences.raycastIncludeCollections)
+    included = _collectionObjects(includeNames) if includeNames else None
+    excluded = _collectionObjects(SplitNames(preferences.raycastExcludeCollections))
+    holdoutCollections = _holdoutCollections(context.view_layer) if preferences.raycastSkipHoldouts else set()
+    activeObject = context.active_object
+    linkedIncludes, linkedExcludes = _lightLinkingReceivers(
+        activeObject if activeObject and activeObject.type == 'LIGHT' and preferences.raycastRespectLightLinking else None)
+    ignoreProperty = preferences.raycastIgnoreProperty
+
+    candidates = []
+    for obj in meshObjects:
+        key = obj.as_pointer()
+        if included is not None and key not in included:
+            continue
+        if key in excluded or key in linkedExcludes:
+            continue
+        if linkedIncludes is not None and key not in linkedIncludes:
+            continue
+        if preferences.raycastSkipCameraInvisible and not getattr(obj, "visible_camera", True):
+            continue
+        if preferences.raycastSkipHoldouts and (getattr(obj, "is_holdout", False) or any(
+                collection.as_pointer() in holdoutCollections for collection in obj.users_collection)):
+            continue
+        if ignoreProperty and obj.get(ignoreProperty):
+            continue
+        candidates.append(obj)
+    profiler.count("raycast.filteredOut", len(meshObjects) - len(candidates))
+    return candidates
+
+
+def GetRaycastCandidates(context: bpy.types.Context) -> list:
+    """Visible meshes that raycasts test. With the filter enabled the compiled candidates are reused
+    while the filter settings, the active light and the visible meshes stay the same"""
+    global _candidates
+    meshObjects = [obj for obj in context.visible_objects if obj.type == "MESH"]
+    preferences = GetRaycastFilterSettings(context)
+    if preferences is None:
+        return meshObjects
+    key = _filterKey(context, preferences)
+    pointers = tuple(obj.as_pointer() for obj in meshObjects)
+    cachedKey, cachedPointers, candidates = _candidates
+    if cachedKey != key or cachedPointers != pointers:
+        candidates = CompileRaycastCandidates(context, meshObjects, preferences)
+        _candidates = (key, pointers, candidates)
+        _registerHandlers()
+    return candidates
+
+
+def ClearRaycastCandidates():
+    global _candidates
+    _candidates = (None, (), [])
+
+
+@persistent
+def _onDepsgraphUpdate(scene, depsgraph):
+    # moving objects keeps the candidates, collections, visibility flags, holdouts and properties do not
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Collection):
+            ClearRaycastCandidates()
+            return
+        if isinstance(update.id, bpy.types.Object) and not (update.is_updated_transform or update.is_updated_geometry):
+            ClearRaycastCandidates()
+            return
+
+
+@persistent
+def _onLoadPost(*args):
+    ClearRaycastCandidates()
+
+
+def _registerHandlers():
+    global _handlersRegistered
+    if _handlersRegistered:
+        return
+    bpy.app.handlers.depsgraph_update_post.append(_onDepsgraphUpdate)
+    bpy.app.handlers.load_post.append(_onLoadPost)
+    _handlersRegistered = True
+
+
+def unregister():
+    global _handlersRegistered
+    if _onDepsgraphUpdate in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_onDepsgraphUpdate)
+    if _onLoadPost in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_onLoadPost)
+    _handlersRegistered = False
+    ClearRaycastCandidates()
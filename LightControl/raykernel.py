@@ -0,0 +1,201 @@
+import numpy as np
+
+from .bvh import EPSILON
+
+
+#################################################################
+########################## RAY KERNEL ###########################
+#################################################################
+
+
+# rays x triangles tested per step, keeps each temporary array around 12 MB
+KERNEL_CHUNK_ELEMENTS: int = 1 << 20
+
+
+def intersectRaysTriangles(origins: np.ndarray, directions: np.ndarray, v0: np.ndarray, edge1: np.ndarray, edge2: np.ndarray) -> tuple:
+    """Moeller-Trumbore for R rays (R,3) against T triangles given as first vertex and two edges (T,3).
+    Returns the nearest ray parameter t (R,), inf on a miss, and the index of the hit triangle (R,), -1 on a miss.
+    Hits both sides like obj.ray_cast, rays are processed in chunks of KERNEL_CHUNK_ELEMENTS ray triangle pairs"""
+    origins = np.asarray(origins, dtype=np.float32).reshape(-1, 3)
+    directions = np.asarray(directions, dtype=np.float32).reshape(-1, 3)
+    rayCount = len(origins)
+    bestT = np.full(rayCount, np.inf, dtype=np.float32)
+    bestTriangle = np.full(rayCount, -1, dtype=np.int64)
+    if not len(v0):
+        return bestT, bestTriangle
+    step = max(1, KERNEL_CHUNK_ELEMENTS // len(v0))
+    for begin in range(0, rayCount, step):
+        end = min(begin + step, rayCount)
+        direction = directions[begin:end, None, :]
+        p = np.cross(direction, edge2)  # (r,T,3)
+        determinant = np.einsum("rtk,tk->rt", p, edge1)
+        valid = np.abs(determinant) > EPSILON
+        inverseDeterminant = 1.0 / np.where(valid, determinant, 1.0)
+        s = origins[begin:end, None, :] - v0
+        u = np.einsum("rtk,rtk->rt", s, p) * inverseDeterminant
+        del p
+        q = np.cross(s, edge1)
+        del s
+        v = np.einsum("rtk,rk->rt", q, directions[begin:end]) * inverseDeterminant
+        t = np.einsum("rtk,tk->rt", q, edge2) * inverseDeterminant
+        del q
+        hit = valid & (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) & (t > EPSILON)
+        t = np.where(hit, t, np.inf)
+        nearest = np.argmin(t, axis=1)
+        nearestT = t[np.arange(end - begin), nearest]
+        bestT[begin:end] = nearestT
+        bestTriangle[begin:end] = np.where(np.isfinite(nearestT), nearest, -1)
+    return bestT, bestTriangle
+
+
+class WorldTriangles:
+    """Loop triangles of one or many objects in world space, concatenated so that one call tests one ray against
+    all meshes or many rays against one mesh. Triangles are first vertex and two edges (T,3,3) float32,
+    the triangles of object i are triangles[objectOffsets[i]:objectOffsets[i + 1]]"""
+
+    def __init__(self, triangles: np.ndarray, polygonIndices: np.ndarray, objectOffsets: np.ndarray):
+        self.triangles = triangles
+        self.polygonIndices = polygonIndices
+        self.objectOffsets = objectOffsets
+
+    @classmethod
+    def concatenate(cls, triangleSets: list):
+        """triangleSets is a list of (triangles (T,3,3), polygonIndices (T)) per object"""
+        counts = [len(triangles) for triangles, _ in triangleSets]
+        objectOffsets = np.zeros(len(triangleSets) + 1, dtype=np.int64)
+        np.cumsum(counts, out=objectOffsets[1:])
+        if not triangleSets:
+            return cls(np.empty((0, 3, 3), dtype=np.float32), np.empty(0, dtype=np.int32), objectOffsets)
+        return cls(np.concatenate([triangles for triangles, _ in triangleSets]),
+                   np.concatenate([polygonIndices for _, polygonIndices in triangleSets]), objectOffsets)
+
+    @staticmethod
+    def transform(triangles: np.ndarray, matrix) -> np.ndarray:
+        """Object space triangles (T,3,3) as first vertex and two edges into world space with a 4x4 matrix"""
+        matrix = np.asarray(matrix, dtype=np.float32)
+        world = triangles @ matrix[:3, :3].T
+        world[:, 0] += matrix[:3, 3]
+        return world
+
+    def rayCast(self, origins, directions) -> tuple:
+        """R world rays at once: object index, location, normal, polygon index and distance per ray (R,...)
+        object index and polygon index are -1 and distance inf where nothing was hit. Distances are in units of the
+        direction vectors, world units for normalized directions"""
+        origins = np.asarray(origins, dtype=np.float32).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=np.float32).reshape(-1, 3)
+        distances, triangles = intersectRaysTriangles(
+            origins, directions, self.triangles[:, 0], self.triangles[:, 1], self.triangles[:, 2])
+        hit = triangles >= 0
+        hitTriangles = np.where(hit, triangles, 0)
+        locations = origins + directions * np.where(hit, distances, 0.0)[:, None]
+        normals = np.zeros_like(origins)
+        if len(self.triangles):
+            edges = self.triangles[hitTriangles]
+            normals = np.cross(edges[:, 1], edges[:, 2])
+            lengths = np.linalg.norm(normals, axis=1)
+            normals /= np.where(lengths > 0.0, lengths, 1.0)[:, None]
+            normals[~hit] = 0.0
+        objectIndices = np.where(hit, np.searchsorted(self.objectOffsets, hitTriangles, side="right") - 1, -1)
+        polygonIndices = np.where(hit, self.polygonIndices[hitTriangles] if len(self.triangles) else -1, -1)
+        return objectIndices, locations, normals, polygonIndices, distances
+
+    def occluded(self, origins, targets) -> np.ndarray:
+        """Shadow rays for R point pairs (R,3) at once, True (R,) where a triangle lies between origin and target.
+        Origins on a surface should be offset along the normal first, the kernel only skips hits closer than EPSILON"""
+        origins = np.asarray(origins, dtype=np.float32).reshape(-1, 3)
+        directions = np.asarray(targets, dtype=np.float32).reshape(-1, 3) - origins
+        # t is in units of the unnormalized direction, the target sits at t = 1
+        distances, triangles = intersectRaysTriangles(
+            origins, directions, self.triangles[:, 0], self.triangles[:, 1], self.triangles[:, 2])
+        return distances < 1.0
+
+
+class SceneBVH:
+    """The FlatBVHs of many objects with their world matrices, for batches of world rays. Every ray is first slab
+    tested against the world bounds of every object (broad phase), the rays left are traced through that object's
+    BVH in object space (narrow phase). Ray parameters t stay the same in object space, the directions are
+    transformed without normalizing them"""
+
+    def __init__(self, bvhs: list, matrices: list):
+        self.bvhs = bvhs
+        self.matrices = np.array(matrices, dtype=np.float64).reshape(-1, 4, 4)
+        self.inverses = np.linalg.inv(self.matrices) if len(bvhs) else self.matrices.copy()
+        self.boundsMin = np.full((len(bvhs), 3), np.inf)
+        self.boundsMax = np.full((len(bvhs), 3), -np.inf)
+        for i, bvh in enumerate(bvhs):
+            if not len(bvh.triangles):
+                continue
+            # world bounds of the eight corners of the root box
+            corners = np.array(np.meshgrid(*zip(bvh.boundsMin[0], bvh.boundsMax[0]), indexing="ij")).reshape(3, -1).T
+            world = corners @ self.matrices[i, :3, :3].T + self.matrices[i, :3, 3]
+            self.boundsMin[i] = world.min(axis=0)
+            self.boundsMax[i] = world.max(axis=0)
+
+    def candidates(self, origins: np.ndarray, directions: np.ndarray, maxT: np.ndarray) -> np.ndarray:
+        """(R,O) True where ray r passes the world bounds of object o before maxT (R,)"""
+        rayCount = len(origins)
+        passed = np.zeros((rayCount, len(self.bvhs)), dtype=bool)
+        with np.errstate(divide="ignore"):
+            inverseDirections = np.where(directions != 0.0, 1.0 / directions, np.inf)
+        step = max(1, KERNEL_CHUNK_ELEMENTS // max(len(self.bvhs), 1))
+        for begin in range(0, rayCount, step):
+            end = min(begin + step, rayCount)
+            with np.errstate(invalid="ignore"):
+                t1 = (self.boundsMin[None] - origins[begin:end, None, :]) * inverseDirections[begin:end, None, :]
+                t2 = (self.boundsMax[None] - origins[begin:end, None, :]) * inverseDirections[begin:end, None, :]
+            tNear = np.nanmax(np.minimum(t1, t2), axis=2)
+            tFar = np.nanmin(np.maximum(t1, t2), axis=2)
+            passed[begin:end] = (tFar >= np.maximum(tNear, 0.0)) & (tNear < maxT[begin:end, None])
+        return passed
+
+    def intersect(self, origins, directions, maxT=np.inf, anyHit: bool = False) -> tuple:
+        """Nearest hit of R world rays closer than maxT: ray parameter t (R,), object index (R,) and triangle index (R,)
+        into that objects BVH, inf, -1 and -1 on a miss. With anyHit rays stop at the first object they hit"""
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+        rayCount = len(origins)
+        bestT = np.array(np.broadcast_to(maxT, rayCount), dtype=np.float32)
+        bestObject = np.full(rayCount, -1, dtype=np.int64)
+        bestTriangle = np.full(rayCount, -1, dtype=np.int64)
+        candidates = self.candidates(origins, directions, bestT) if rayCount else np.zeros((0, len(self.bvhs)), dtype=bool)
+        for i in np.nonzero(candidates.any(axis=0))[0]:
+            rays = np.nonzero(candidates[:, i])[0]
+            if anyHit:
+                rays = rays[bestObject[rays] < 0]
+                if not len(rays):
+                    continue
+            inverse = self.inverses[i]
+            t, triangles = self.bvhs[i].rayCastMany(origins[rays] @ inverse[:3, :3].T + inverse[:3, 3],
+                                                    directions[rays] @ inverse[:3, :3].T, bestT[rays], anyHit)
+            hit = triangles >= 0
+            rays = rays[hit]
+            bestT[rays] = t[hit]
+            bestObject[rays] = i
+            bestTriangle[rays] = triangles[hit]
+        return np.where(bestObject >= 0, bestT, np.inf).astype(np.float32), bestObject, bestTriangle
+
+    def rayCast(self, origins, directions) -> tuple:
+        """Same results as WorldTriangles.rayCast: object index, location, normal, polygon index and distance per ray"""
+        origins = np.asarray(origins, dtype=np.float32).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=np.float32).reshape(-1, 3)
+        distances, objectIndices, triangles = self.intersect(origins, directions)
+        hit = objectIndices >= 0
+        locations = origins + directions * np.where(hit, distances, 0.0)[:, None]
+        normals = np.zeros_like(origins)
+        polygonIndices = np.full(len(origins), -1, dtype=np.int64)
+        for i in np.unique(objectIndices[hit]):
+            rays = np.nonzero(objectIndices == i)[0]
+            bvh = self.bvhs[i]
+            edges = bvh.triangles[triangles[rays]]
+            # normals go to world space with the inverse transpose
+            objectNormals = np.cross(edges[:, 1], edges[:, 2]) @ self.inverses[i, :3, :3]
+            lengths = np.linalg.norm(objectNormals, axis=1)
+            normals[rays] = objectNormals / np.where(lengths > 0.0, lengths, 1.0)[:, None]
+            polygonIndices[rays] = bvh.polygonIndices[triangles[rays]]
+        return objectIndices, locations, normals, polygonIndices, distances
+
+    def occluded(self, origins, targets) -> np.ndarray:
+        """Same as WorldTriangles.occluded, any hit queries through the object BVHs"""
+        origins = np.asarray(origins, dtype=np.float32).reshape(-1, 3)
+        directions = np.asarray(targets, dtype=np.float32).reshape(-1, 3) - origins
+        return self.intersect(origins, directions, 1.0, anyHit=True)[1] >= 0
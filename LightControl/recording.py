@@ -0,0 +1,134 @@
+import json
+import os
+import time
+
+import bpy
+import mathutils
+
+from .functions import (GetLightAngle, GetLightBrightness, GetLightColor, GetLightPivot, GetLightSize, GetLightTilt,
+                        SetLightAngle, SetLightBrightnessClamped, SetLightColor, SetLightPivot, SetLightSizeClamped,
+                        SetLightTilt)
+
+
+#################################################################
+###################### EVENT RECORDING ##########################
+#################################################################
+
+
+EVENT_RECORDING_VERSION: int = 1
+EVENT_RECORDING_FIELDS: tuple = ("time", "type", "value", "mouse_x", "mouse_y", "mouse_prev_x",
+                                 "mouse_prev_y", "mouse_region_x", "mouse_region_y", "modifiers")
+MODIFIER_CTRL: int = 1
+MODIFIER_SHIFT: int = 2
+MODIFIER_ALT: int = 4
+MODIFIER_OSKEY: int = 8
+
+
+def modifiersToBits(event) -> int:
+    return (MODIFIER_CTRL * event.ctrl) | (MODIFIER_SHIFT * event.shift) | (MODIFIER_ALT * event.alt) | (MODIFIER_OSKEY * event.oskey)
+
+
+def matrixToList(matrix: mathutils.Matrix) -> list:
+    return [value for row in matrix for value in row]
+
+
+def listToMatrix(values: list) -> mathutils.Matrix:
+    return mathutils.Matrix((values[0:4], values[4:8], values[8:12], values[12:16]))
+
+
+class RecordedEvent:
+    """Stands in for bpy.types.Event when feeding a recording back into the adjust_light modal"""
+    __slots__ = ("time", "type", "value", "mouse_x", "mouse_y", "mouse_prev_x", "mouse_prev_y",
+                 "mouse_region_x", "mouse_region_y", "ctrl", "shift", "alt", "oskey")
+
+    def __init__(self, record: list):
+        self.time, self.type, self.value, self.mouse_x, self.mouse_y, self.mouse_prev_x, self.mouse_prev_y, self.mouse_region_x, self.mouse_region_y, modifiers = record
+        self.ctrl = bool(modifiers & MODIFIER_CTRL)
+        self.shift = bool(modifiers & MODIFIER_SHIFT)
+        self.alt = bool(modifiers & MODIFIER_ALT)
+        self.oskey = bool(modifiers & MODIFIER_OSKEY)
+
+
+class EventRecorder:
+    """Records the events of one adjust_light session. Saved as JSON Lines, a header line with the
+    start state of light and view, then one array per event in the order of EVENT_RECORDING_FIELDS"""
+
+    def __init__(self, context: bpy.types.Context, lightObject: bpy.types.Object):
+        self.start: float = time.perf_counter()
+        self.events: list = []
+        region = context.region
+        regionData = context.region_data
+        tilt = GetLightTilt(lightObject)
+        self.header: dict = {
+            "version": EVENT_RECORDING_VERSION,
+            "fields": EVENT_RECORDING_FIELDS,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "blendFile": bpy.data.filepath,
+            "light": lightObject.name,
+            "lightMatrix": matrixToList(lightObject.matrix_world),
+            "pivotPoint": list(GetLightPivot(lightObject)),
+            "tilt": list(tilt) if tilt is not None else None,
+            "brightness": GetLightBrightness(lightObject),
+            "size": GetLightSize(lightObject),
+            "angle": GetLightAngle(lightObject),
+            "color": list(GetLightColor(lightObject)),
+            "region": (region.width, region.height),
+            "viewMatrix": matrixToList(regionData.view_matrix),
+            "windowMatrix": matrixToList(regionData.window_matrix),
+            "isPerspective": regionData.is_perspective,
+        }
+
+    def record(self, event: bpy.types.Event):
+        self.events.append((round(time.perf_counter() - self.start, 4), event.type, event.value, event.mouse_x, event.mouse_y,
+                            event.mouse_prev_x, event.mouse_prev_y, event.mouse_region_x, event.mouse_region_y, modifiersToBits(event)))
+
+    def save(self, filepath: str):
+        with open(filepath, "w") as file:
+            file.write(json.dumps(self.header, separators=(",", ":")) + "\n")
+            for record in self.events:
+                file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+def LoadEventRecording(filepath: str):
+    """Returns the header dictionary and the list of RecordedEvents of an event recording"""
+    with open(filepath) as file:
+        header = json.loads(file.readline())
+        if header.get("version") != EVENT_RECORDING_VERSION:
+            raise ValueError(
+                f"Event recording version {header.get('version')} is not supported, expected {EVENT_RECORDING_VERSION}")
+        events = [RecordedEvent(json.loads(line)) for line in file if line.strip()]
+    return header, events
+
+
+def ApplyEventRecordingStartState(context: bpy.types.Context, header: dict) -> bpy.types.Object:
+    """Restores light and view to how they were when the recording started, returns the light or None"""
+    lightObject = bpy.data.objects.get(header["light"])
+    if lightObject is None or lightObject.type != 'LIGHT':
+        return None
+    lightObject.matrix_world = listToMatrix(header["lightMatrix"])
+    SetLightPivot(lightObject, None, mathutils.Vector(header["pivotPoint"]))
+    if header["tilt"] is not None:
+        SetLightTilt(lightObject, header["tilt"])
+    SetLightBrightnessClamped(lightObject, header["brightness"])
+    SetLightSizeClamped(lightObject, header["size"])
+    SetLightAngle(lightObject, header["angle"])
+    SetLightColor(lightObject, mathutils.Color(header["color"]))
+    if context.region_data:
+        context.region_data.view_matrix = listToMatrix(header["viewMatrix"])
+    return lightObject
+
+
+def CreateEventRecordingFilepath(context: bpy.types.Context, lightName: str) -> str:
+    directory = ""
+    addon = context.preferences.addons.get(__package__)
+    if addon is not None:
+        directory = bpy.path.abspath(addon.preferences.recordingDirectory)
+    if not directory:
+        directory = bpy.app.tempdir
+    filename = bpy.path.clean_name(
+        f"lightcontrol_{time.strftime('%Y%m%d_%H%M%S')}_{lightName}") + ".jsonl"
+    return os.path.join(directory, filename)
+
+
+def isFinishedOrCancelled(result: set) -> bool:
+    return 'FINISHED' in result or 'CANCELLED' in result
@@ -0,0 +1,278 @@
+import os
+import struct
+
+import mathutils
+import numpy as np
+import bpy
+
+from .profiling import profiled, profiler
+from .rigs import RIG_LIGHT_TYPES
+
+
+#################################################################
+######################### RIG CACHE #############################
+#################################################################
+
+
+RIG_CACHE_MAGIC: bytes = b"LCRIG\x00\x00\x00"
+RIG_CACHE_VERSION: int = 1
+RIG_CACHE_EXTENSION: str = ".lcrig"
+# magic, version, light count, name table size in bytes, padded to the alignment
+RIG_CACHE_HEADER = struct.Struct("<8sIIQ")
+RIG_CACHE_ALIGNMENT: int = 64
+AREA_LIGHT_SHAPES: tuple = ('SQUARE', 'RECTANGLE', 'DISK', 'ELLIPSE')
+
+# column name, float32 values per light, the name table of NUL separated UTF-8 names follows the last column.
+# type and shape are indices into RIG_LIGHT_TYPES and AREA_LIGHT_SHAPES, size and angle mean what
+# GetLightSize and GetLightAngle return, pivotPoint and tilt are NaN for lights that have none.
+# location, rotation (XYZ euler) and scale are decomposed from the world matrix like the matrix of a rig record
+RIG_CACHE_LAYOUT: tuple = (
+    ("location", 3),
+    ("rotation", 3),
+    ("scale", 3),
+    ("type", 1),
+    ("shape", 1),
+    ("energy", 1),
+    ("color", 3),
+    ("size", 1),
+    ("sizeY", 1),
+    ("angle", 1),
+    ("spotBlend", 1),
+    ("pivotPoint", 3),
+    ("tilt", 3),
+)
+
+
+def _align(offset: int) -> int:
+    return (offset + RIG_CACHE_ALIGNMENT - 1) // RIG_CACHE_ALIGNMENT * RIG_CACHE_ALIGNMENT
+
+
+def _layoutOffsets(lightCount: int):
+    """Yields name, shape and byte offset of every column, then None, None and the offset of the name table"""
+    offset = _align(RIG_CACHE_HEADER.size)
+    for name, width in RIG_CACHE_LAYOUT:
+        yield name, (lightCount, width) if width > 1 else (lightCount,), offset
+        offset = _align(offset + lightCount * width * 4)
+    yield None, None, offset
+
+
+@profiled("gatherRigColumns")
+def GatherRigColumns(lightObjects: list) -> tuple:
+    """Names and float32 columns of the lights, transforms are decomposed from the world matrix"""
+    count = len(lightObjects)
+    columns = {name: np.zeros((count, width) if width > 1 else count, dtype=np.float32)
+               for name, width in RIG_CACHE_LAYOUT}
+    columns["pivotPoint"][:] = np.nan
+    columns["tilt"][:] = np.nan
+    for i, lightObject in enumerate(lightObjects):
+        lightData: bpy.types.Light = lightObject.data
+        location, rotation, scale = lightObject.matrix_world.decompose()
+        columns["location"][i] = location
+        columns["rotation"][i] = rotation.to_euler('XYZ')
+        columns["scale"][i] = scale
+        columns["type"][i] = RIG_LIGHT_TYPES.index(lightData.type)
+        columns["energy"][i] = lightData.energy
+        columns["color"][i] = lightData.color
+        if lightData.type == 'AREA':
+            columns["shape"][i] = AREA_LIGHT_SHAPES.index(lightData.shape)
+            columns["size"][i] = lightData.size
+            columns["sizeY"][i] = lightData.size_y
+            columns["angle"][i] = lightData.spread
+        elif lightData.type == 'SUN':
+            columns["angle"][i] = lightData.angle
+        else:
+            columns["size"][i] = lightData.shadow_soft_size
+            if lightData.type == 'SPOT':
+                columns["angle"][i] = lightData.spot_size
+                columns["spotBlend"][i] = lightData.spot_blend
+        settings = lightObject.lightControl
+        if settings.hasPivotPoint:
+            columns["pivotPoint"][i] = settings.pivotPoint
+        if settings.hasTilt:
+            columns["tilt"][i] = settings.tilt
+    return [lightObject.name for lightObject in lightObjects], columns
+
+
+def ReadRigCache(filepath: str) -> tuple:
+    """Names and columns of a rig cache, the columns are read only views of a memory map of the file"""
+    data = np.memmap(filepath, dtype=np.uint8, mode="r")
+    if len(data) < RIG_CACHE_HEADER.size:
+        raise ValueError("Not a Light Control rig cache")
+    magic, version, lightCount, nameTableSize = RIG_CACHE_HEADER.unpack_from(data, 0)
+    if magic != RIG_CACHE_MAGIC:
+        raise ValueError("Not a Light Control rig cache")
+    if version != RIG_CACHE_VERSION:
+        raise ValueError(f"Rig cache version {version} is not supported, expected {RIG_CACHE_VERSION}")
+    columns = {}
+    for name, shape, offset in _layoutOffsets(lightCount):
+        if name is None:
+            if offset + nameTableSize > len(data):
+                raise ValueError("Rig cache is truncated")
+            names = bytes(data[offset:offset + nameTableSize]).decode("utf-8").split("\0") if lightCount else []
+            break
+        count = int(np.prod(shape))
+        if offset + count * 4 > len(data):
+            raise ValueError("Rig cache is truncated")
+        columns[name] = np.frombuffer(data, dtype=np.float32, count=count, offset=offset).reshape(shape)
+    return names, columns
+
+
+def writeRigCache(filepath: str, columns: dict, nameTable: bytes, lightCount: int):
+    temporaryPath = filepath + ".tmp"
+    with open(temporaryPath, "wb") as file:
+        file.write(RIG_CACHE_HEADER.pack(RIG_CACHE_MAGIC, RIG_CACHE_VERSION, lightCount, len(nameTable)))
+        for name, shape, offset in _layoutOffsets(lightCount):
+            file.seek(offset)
+            file.write(nameTable if name is None else columns[name].tobytes())
+    os.replace(temporaryPath, filepath)
+
+
+def updateRigCache(filepath: str, columns: dict, nameTable: bytes, lightCount: int):
+    """Rewrites only the columns that differ from an existing cache of the same light count.
+    Returns the names of the rewritten columns, None when the file has to be written from scratch"""
+    try:
+        data = np.memmap(filepath, dtype=np.uint8, mode="r+")
+    except (OSError, ValueError):
+        return None
+    if len(data) < RIG_CACHE_HEADER.size:
+        return None
+    magic, version, cachedCount, nameTableSize = RIG_CACHE_HEADER.unpack_from(data, 0)
+    if magic != RIG_CACHE_MAGIC or version != RIG_CACHE_VERSION or cachedCount != lightCount:
+        return None
+    rewritten = []
+    for name, shape, offset in _layoutOffsets(lightCount):
+        if name is None:
+            nameTableOffset = offset
+            break
+        if offset + columns[name].nbytes > len(data):
+            return None
+        cached = data[offset:offset + columns[name].nbytes]
+        # compared bitwise, NaN pivots are equal to themselves
+        if not np.array_equal(cached.view(np.uint32), columns[name].reshape(-1).view(np.uint32)):
+            cached[:] = columns[name].reshape(-1).view(np.uint8)
+            rewritten.append(name)
+    namesChanged = nameTableSize != len(nameTable) or bytes(data[nameTableOffset:nameTableOffset + nameTableSize]) != nameTable
+    data.flush()
+    # the map has to be closed before the file is truncated
+    del data
+    if namesChanged:
+        with open(filepath, "r+b") as file:
+            file.write(RIG_CACHE_HEADER.pack(RIG_CACHE_MAGIC, RIG_CACHE_VERSION, lightCount, len(nameTable)))
+            file.seek(nameTableOffset)
+            file.write(nameTable)
+            file.truncate()
+        rewritten.append("names")
+    return rewritten
+
+
+@profiled("saveRigCache")
+def SaveRigCache(filepath: str, lightObjects: list) -> list:
+    """Stores the lights as a rig cache. A cache of the same number of lights is updated in place and
+    only its changed columns are written, returns the names of the columns written"""
+    names, columns = GatherRigColumns(lightObjects)
+    nameTable = "\0".join(names).encode("utf-8")
+    rewritten = updateRigCache(filepath, columns, nameTable, len(names))
+    if rewritten is None:
+        writeRigCache(filepath, columns, nameTable, len(names))
+        rewritten = [name for name, _ in RIG_CACHE_LAYOUT] + ["names"]
+    profiler.count("rigCache.columnsWritten", len(rewritten))
+    return rewritten
+
+
+def RigCacheLights(collection: bpy.types.Collection) -> list:
+    """The objects of the collection a rig cache is saved from and applied onto"""
+    return [obj for obj in collection.objects if obj.type == 'LIGHT']
+
+
+def RigCacheMatches(collection: bpy.types.Collection, names: list, columns: dict) -> bool:
+    """The lights of the collection are exactly the lights of the cache in order, so the cache can be applied onto it"""
+    lightObjects = RigCacheLights(collection)
+    if len(lightObjects) != len(names) or [obj.name for obj in lightObjects] != names:
+        return False
+    return all(obj.data.type == RIG_LIGHT_TYPES[int(lightType)]
+               for obj, lightType in zip(lightObjects, columns["type"]))
+
+
+def createRigCacheLights(collection: bpy.types.Collection, names: list, types: np.ndarray):
+    link = collection.objects.link
+    for name, lightType in zip(names, types.tolist()):
+        lightData = bpy.data.lights.new(name=name, type=RIG_LIGHT_TYPES[int(lightType)])
+        link(bpy.data.objects.new(name=name, object_data=lightData))
+
+
+def _setColumn(collection, attribute: str, rows: np.ndarray, values: np.ndarray):
+    """foreach_set of one attribute on some rows of a bpy.data collection. Its current values are read,
+    the rows replaced and everything written back"""
+    width = values.shape[1] if values.ndim > 1 else 1
+    current = np.empty(len(collection) * width, dtype=np.float32)
+    collection.foreach_get(attribute, current)
+    current.reshape(-1, width)[rows] = values.reshape(-1, width)
+    collection.foreach_set(attribute, current)
+
+
+def _dataRows(collection, items: list) -> np.ndarray:
+    """Rows of items in a bpy.data collection, the only collections that hold all objects and all light data"""
+    rows = {item.as_pointer(): row for row, item in enumerate(collection)}
+    return np.fromiter((rows[item.as_pointer()] for item in items), dtype=np.int64, count=len(items))
+
+
+def applyRigCacheTransforms(lightObjects: list, columns: dict):
+    """The cached transforms are world space. They are set with foreach_set where they equal the local transform,
+    lights with a parent or another rotation mode get their world matrix set one by one"""
+    simple = np.fromiter((obj.parent is None and obj.rotation_mode == 'XYZ' for obj in lightObjects),
+                         dtype=bool, count=len(lightObjects))
+    if simple.any():
+        rows = _dataRows(bpy.data.objects, [obj for obj, isSimple in zip(lightObjects, simple) if isSimple])
+        _setColumn(bpy.data.objects, "location", rows, columns["location"][simple])
+        _setColumn(bpy.data.objects, "rotation_euler", rows, columns["rotation"][simple])
+        _setColumn(bpy.data.objects, "scale", rows, columns["scale"][simple])
+    for i in np.flatnonzero(~simple).tolist():
+        lightObjects[i].matrix_world = mathutils.Matrix.LocRotScale(
+            columns["location"][i], mathutils.Euler(columns["rotation"][i], 'XYZ'), columns["scale"][i])
+    profiler.count("rigCache.transformsSetPerLight", int((~simple).sum()))
+
+
+@profiled("applyRigCache")
+def ApplyRigCache(collection: bpy.types.Collection, names: list, columns: dict) -> int:
+    """Applies a rig cache onto an empty collection, creating its lights, or onto the collection it matches.
+    Transforms, energies and colors are set with foreach_set, the settings that only some light types
+    have are set per light. Returns the number of lights"""
+    if len(collection.objects) == 0:
+        createRigCacheLights(collection, names, columns["type"])
+    elif not RigCacheMatches(collection, names, columns):
+        raise ValueError(f"Collection {collection.name} holds a different rig")
+    objects = RigCacheLights(collection)
+    applyRigCacheTransforms(objects, columns)
+
+    lightRows = _dataRows(bpy.data.lights, [obj.data for obj in objects])
+    _setColumn(bpy.data.lights, "energy", lightRows, columns["energy"])
+    _setColumn(bpy.data.lights, "color", lightRows, columns["color"])
+
+    shapes, sizes, sizesY, angles, spotBlends = (columns[name].tolist()
+                                                 for name in ("shape", "size", "sizeY", "angle", "spotBlend"))
+    pivotPoints, tilts = columns["pivotPoint"], columns["tilt"]
+    hasPivotPoints = ~np.isnan(pivotPoints[:, 0])
+    hasTilts = ~np.isnan(tilts[:, 0])
+    for i, obj in enumerate(objects):
+        lightData: bpy.types.Light = obj.data
+        if lightData.type == 'AREA':
+            lightData.shape = AREA_LIGHT_SHAPES[int(shapes[i])]
+            lightData.size = sizes[i]
+            lightData.size_y = sizesY[i]
+            lightData.spread = angles[i]
+        elif lightData.type == 'SUN':
+            lightData.angle = angles[i]
+        else:
+            lightData.shadow_soft_size = sizes[i]
+            if lightData.type == 'SPOT':
+                lightData.spot_size = angles[i]
+                lightData.spot_blend = spotBlends[i]
+        settings = obj.lightControl
+        settings.hasPivotPoint = bool(hasPivotPoints[i])
+        if hasPivotPoints[i]:
+            settings.pivotPoint = pivotPoints[i]
+        settings.hasTilt = bool(hasTilts[i])
+        if hasTilts[i]:
+            settings.tilt = tilts[i]
+    profiler.count("rigCache.applied", len(objects))
+    return len(objects)
@@ -0,0 +1,136 @@
+import json
+
+import bpy
+
+from .profiling import profiled, profiler
+from .recording import listToMatrix, matrixToList
+
+
+#################################################################
+########################## LIGHT RIGS ###########################
+#################################################################
+
+
+RIG_FORMAT: str = "lightcontrol-rig"
+RIG_VERSION: int = 1
+# records parsed and turned into lights at once on import, bounds the memory of the parser
+RIG_IMPORT_BATCH: int = 1024
+RIG_LIGHT_TYPES: tuple = ('POINT', 'SUN', 'SPOT', 'AREA')
+
+
+def LightRecord(lightObject: bpy.types.Object) -> dict:
+    """Everything a rig keeps of one light, JSON serializable"""
+    lightData: bpy.types.Light = lightObject.data
+    settings = lightObject.lightControl
+    record = {
+        "name": lightObject.name,
+        "type": lightData.type,
+        "matrix": matrixToList(lightObject.matrix_world),
+        "energy": lightData.energy,
+        "color": tuple(lightData.color),
+        "pivotPoint": tuple(settings.pivotPoint) if settings.hasPivotPoint else None,
+        "tilt": tuple(settings.tilt) if settings.hasTilt else None,
+    }
+    if lightData.type == 'AREA':
+        record.update(shape=lightData.shape, size=lightData.size,
+                      sizeY=lightData.size_y, spread=lightData.spread)
+    elif lightData.type == 'SUN':
+        record.update(angle=lightData.angle)
+    else:
+        record.update(size=lightData.shadow_soft_size)
+        if lightData.type == 'SPOT':
+            record.update(spotSize=lightData.spot_size, spotBlend=lightData.spot_blend)
+    return record
+
+
+def ApplyLightRecord(lightObject: bpy.types.Object, record: dict):
+    """Sets transform, light data and Light Control settings of a light of the record's type"""
+    lightData: bpy.types.Light = lightObject.data
+    lightObject.matrix_world = listToMatrix(record["matrix"])
+    lightData.energy = record["energy"]
+    lightData.color = record["color"]
+    if lightData.type == 'AREA':
+        lightData.shape = record.get("shape", 'SQUARE')
+        lightData.size = record["size"]
+        lightData.size_y = record.get("sizeY", record["size"])
+        lightData.spread = record.get("spread", lightData.spread)
+    elif lightData.type == 'SUN':
+        lightData.angle = record["angle"]
+    else:
+        lightData.shadow_soft_size = record["size"]
+        if lightData.type == 'SPOT':
+            lightData.spot_size = record.get("spotSize", lightData.spot_size)
+            lightData.spot_blend = record.get("spotBlend", lightData.spot_blend)
+    settings = lightObject.lightControl
+    settings.hasPivotPoint = record["pivotPoint"] is not None
+    if settings.hasPivotPoint:
+        settings.pivotPoint = record["pivotPoint"]
+    settings.hasTilt = record["tilt"] is not None
+    if settings.hasTilt:
+        settings.tilt = record["tilt"]
+
+
+@profiled("exportRig")
+def ExportRig(filepath: str, lightObjects) -> int:
+    """Writes a header line and one JSON line per light, lightObjects may be any iterable so the rig
+    is never held in memory. Returns the number of lights written"""
+    written = 0
+    with open(filepath, "w") as file:
+        file.write(json.dumps({"format": RIG_FORMAT, "version": RIG_VERSION,
+                               "blender": bpy.app.version_string}, separators=(",", ":")) + "\n")
+        for lightObject in lightObjects:
+            if lightObject.type != 'LIGHT':
+                continue
+            file.write(json.dumps(LightRecord(lightObject), separators=(",", ":")) + "\n")
+            written += 1
+    profiler.count("rig.exported", written)
+    return written
+
+
+def createRigLights(collection: bpy.types.Collection, records: list) -> list:
+    """Creates the lights of a batch of records without CreateLight, every light is set up before the batch
+    is linked into collection"""
+    lightObjects = []
+    for record in records:
+        lightData = bpy.data.lights.new(name=record["name"], type=record["type"])
+        lightObject = bpy.data.objects.new(name=record["name"], object_data=lightData)
+        ApplyLightRecord(lightObject, record)
+        lightObjects.append(lightObject)
+    link = collection.objects.link
+    for lightObject in lightObjects:
+        link(lightObject)
+    return lightObjects
+
+
+def readRigRecords(file):
+    """Yields the records of an open rig file line by line, after checking its header"""
+    header = json.loads(file.readline() or "{}")
+    if header.get("format") != RIG_FORMAT:
+        raise ValueError("Not a Light Control rig")
+    if header.get("version") != RIG_VERSION:
+        raise ValueError(f"Rig version {header.get('version')} is not supported, expected {RIG_VERSION}")
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+@profiled("importRig")
+def ImportRig(filepath: str, collection: bpy.types.Collection) -> tuple:
+    """Creates the lights of a rig file in collection, RIG_IMPORT_BATCH records at a time.
+    Returns the number of lights created and of records skipped for an unknown light type"""
+    created, skipped = 0, 0
+    batch = []
+    with open(filepath) as file:
+        for record in readRigRecords(file):
+            if record.get("type") not in RIG_LIGHT_TYPES:
+                skipped += 1
+                continue
+            batch.append(record)
+            if len(batch) == RIG_IMPORT_BATCH:
+                created += len(createRigLights(collection, batch))
+                batch.clear()
+        if batch:
+            created += len(createRigLights(collection, batch))
+    profiler.count("rig.imported", created)
+    return created, skipped
+
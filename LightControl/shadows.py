@@ -0,0 +1,99 @@
+from collections import OrderedDict
+
+import numpy as np
+import bpy
+
+from .acceleration import GetSceneBVH
+from .profiling import profiled, profiler
+from .raykernel import SceneBVH
+
+
+#################################################################
+########################## SHADOW RAYS ##########################
+#################################################################
+
+
+# shadow ray origins are pushed this far along the surface normal so they do not hit their own triangle
+SHADOW_BIAS: float = 1e-3
+# sun lights have no position, their shadow rays end this far against the sun direction
+SUN_DISTANCE: float = 1e5
+
+
+def ShadowRayTargets(parameters: tuple, positions: np.ndarray) -> np.ndarray:
+    """End points (N,3) of the shadow rays from positions to a light given as irradianceFromLight parameters"""
+    lightType, lightPosition, lightDirection = parameters[:3]
+    if lightType == 'SUN':
+        return positions - np.asarray(lightDirection, dtype=np.float32) * SUN_DISTANCE
+    return np.broadcast_to(np.asarray(lightPosition, dtype=np.float32), positions.shape)
+
+
+@profiled("shadowRays")
+def OccludedPairs(context: bpy.types.Context, points, lightPositions, normals=None, objects: list = None) -> np.ndarray:
+    """True (N,) where the visible meshes (or objects) block the segment from points[i] to lightPositions[i].
+    Any hit queries through the object BVHs of the scene. Points on a surface should come with their normals, the rays then start SHADOW_BIAS above the surface"""
+    if objects is None:
+        objects = [obj for obj in context.visible_objects if obj.type == "MESH"]
+    points = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+    if normals is not None:
+        points = points + np.asarray(normals, dtype=np.float32).reshape(-1, 3) * SHADOW_BIAS
+    profiler.count("shadows.tracedRays", len(points))
+    return GetSceneBVH(context, objects).occluded(points, lightPositions)
+
+
+class ShadowCache:
+    """Occlusion of shadow rays from samples to a light, keyed on the light position snapped to a grid of tolerance
+    and on the sample id. Moving a light by less than about tolerance reuses the rays of its previous position,
+    each grid cell keeps the samples it was asked for so that returning to a position costs nothing.
+    Everything is dropped when the scene BVH was gathered again"""
+
+    def __init__(self, tolerance: float = 0.05, maxEntries: int = 64):
+        self.tolerance = tolerance
+        self.maxEntries = maxEntries
+        # position key => (sample ids ascending (N,), occluded (N,) bool)
+        self.entries: OrderedDict = OrderedDict()
+        self.sceneBVH: SceneBVH = None
+        self.cachedRays: int = 0
+        self.tracedRays: int = 0
+
+    def positionKey(self, parameters: tuple) -> tuple:
+        lightType, lightPosition, lightDirection = parameters[:3]
+        if lightType == 'SUN':
+            # directions are unit vectors, snap them finer than positions
+            return ('SUN', *np.round(np.asarray(lightDirection) / (self.tolerance * 0.01)).astype(np.int64).tolist())
+        return ('POINT', *np.round(np.asarray(lightPosition) / self.tolerance).astype(np.int64).tolist())
+
+    def occluded(self, sceneBVH: SceneBVH, parameters: tuple, sampleIds, positions, normals) -> np.ndarray:
+        """True (N,) for samples the scene shadows from the light, only samples unknown at this light position are traced"""
+        if sceneBVH is not self.sceneBVH:
+            self.entries.clear()
+            self.sceneBVH = sceneBVH
+        sampleIds = np.asarray(sampleIds, dtype=np.int64)
+        key = self.positionKey(parameters)
+        knownIds, knownOccluded = self.entries.pop(key, (np.empty(0, dtype=np.int64), np.empty(0, dtype=bool)))
+        occluded = np.zeros(len(sampleIds), dtype=bool)
+        known = np.zeros(len(sampleIds), dtype=bool)
+        if len(knownIds):
+            rows = np.minimum(np.searchsorted(knownIds, sampleIds), len(knownIds) - 1)
+            known = knownIds[rows] == sampleIds
+            occluded[known] = knownOccluded[rows[known]]
+        missing = ~known
+        if missing.any():
+            origins = (np.asarray(positions, dtype=np.float32)[missing]
+                       + np.asarray(normals, dtype=np.float32)[missing] * SHADOW_BIAS)
+            occluded[missing] = sceneBVH.occluded(origins, ShadowRayTargets(parameters, origins))
+            knownIds = np.concatenate((knownIds, sampleIds[missing]))
+            knownOccluded = np.concatenate((knownOccluded, occluded[missing]))
+            order = np.argsort(knownIds, kind="stable")
+            knownIds, knownOccluded = knownIds[order], knownOccluded[order]
+        self.entries[key] = (knownIds, knownOccluded)
+        while len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False)
+        self.cachedRays += int(known.sum())
+        self.tracedRays += int(missing.sum())
+        profiler.count("shadows.cachedRays", int(known.sum()))
+        profiler.count("shadows.tracedRays", int(missing.sum()))
+        return occluded
+
+    def summary(self) -> str:
+        total = self.cachedRays + self.tracedRays
+        return f"{self.cachedRays} of {total} shadow rays reused ({self.cachedRays / max(total, 1):.0%})"
@@ -0,0 +1,91 @@
+import mathutils
+import numpy as np
+import bpy
+
+from .acceleration import GetObjectMeshAdjacency
+from .functions import GetCursorRay, raycastCursor
+from .profiling import profiled, profiler
+
+
+#################################################################
+######################## SURFACE SLIDE ##########################
+#################################################################
+
+
+class SurfaceSlider:
+    """Moves the pivot over the surface of the object it was dropped on instead of raycasting every event.
+    The cursor ray is intersected with the plane of the current triangle and the pivot walks there along the mesh,
+    see MeshAdjacency.walk. The raycast function (context, mousepos) is only used to pick the surface at the
+    start of a drag, or again when the cursor ray runs parallel to the surface or leaves it"""
+
+    def __init__(self, raycast=raycastCursor):
+        self.raycast = raycast
+        self.hitObject: bpy.types.Object = None
+        self.hitTriangle: int = -1
+        # object space
+        self.hitPoint: np.ndarray = None
+        # statistics
+        self.slides: int = 0
+        self.raycasts: int = 0
+
+    def summary(self) -> str:
+        return f"{self.slides} pivot moves slid along the surface, {self.raycasts} raycasts"
+
+    def reset(self):
+        self.hitObject = None
+
+    @profiled("surfaceSlide")
+    def slide(self, context: bpy.types.Context, mousepos: tuple):
+        """Same results as raycastCursor: hit object, hit location, hit normal, hit index and hit distance"""
+        if self.hitObject is not None:
+            result = self.slideToCursor(context, mousepos)
+            if result is not None:
+                self.slides += 1
+                profiler.count("pivot.slides")
+                return result
+        return self.pickSurface(context, mousepos)
+
+    def pickSurface(self, context: bpy.types.Context, mousepos: tuple):
+        self.raycasts += 1
+        profiler.count("pivot.slideRaycasts")
+        hitObj, hitLocation, hitNormal, hitIndex, hitDistance = self.raycast(context, mousepos)
+        self.hitObject = None
+        if hitObj is None:
+            return hitObj, hitLocation, hitNormal, hitIndex, hitDistance
+        # the loop triangle of the hit polygon that contains the hit
+        adjacency = GetObjectMeshAdjacency(context, hitObj)
+        mxi = hitObj.matrix_world.inverted_safe()
+        origin_3d, vector_3d = GetCursorRay(context, mousepos)
+        success, location, normal, index, triangle = adjacency.rayCast(
+            mxi @ origin_3d, mxi.to_3x3() @ vector_3d, adjacency.trianglesOfPolygon(hitIndex))
+        if success:
+            self.hitObject = hitObj
+            self.hitTriangle = triangle
+            self.hitPoint = location
+        return hitObj, hitLocation, hitNormal, hitIndex, hitDistance
+
+    def slideToCursor(self, context: bpy.types.Context, mousepos: tuple):
+        adjacency = GetObjectMeshAdjacency(context, self.hitObject)
+        mx = self.hitObject.matrix_world
+        mxi = mx.inverted_safe()
+        origin_3d, vector_3d = GetCursorRay(context, mousepos)
+        origin = np.array(mxi @ origin_3d)
+        direction = np.array(mxi.to_3x3() @ vector_3d)
+        # cursor ray against the plane of the current triangle
+        normal = adjacency.triangleNormals[self.hitTriangle]
+        facing = direction @ normal
+        if abs(facing) < 1e-6:
+            return None
+        t = ((self.hitPoint - origin) @ normal) / facing
+        if t <= 0.0:
+            return None
+        triangle, point, stopped = adjacency.walk(
+            self.hitTriangle, self.hitPoint, origin + direction * t - self.hitPoint)
+        if stopped and triangle == self.hitTriangle and np.allclose(point, self.hitPoint):
+            # stuck on an open boundary, let the raycast decide
+            return None
+        self.hitTriangle = triangle
+        self.hitPoint = point
+        hitLocation: mathutils.Vector = mx @ mathutils.Vector(point)
+        hitNormal: mathutils.Vector = mx.to_3x3() @ mathutils.Vector(adjacency.triangleNormals[triangle])
+        return self.hitObject, hitLocation, hitNormal, int(adjacency.polygonIndices[triangle]), (hitLocation - origin_3d).length
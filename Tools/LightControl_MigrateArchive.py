@@ -0,0 +1,276 @@
+"""Migrates and validates the Light Control data of many .blend files, each batch of files in a fresh Blender process
+
+Lights placed with older versions keep pivotPoint and tilt as ID properties, which can be missing, stale
+(the light no longer looks at its pivot) or hold ints. Every light gets its pivot recomputed by raycasting along
+its forward axis where needed, the values are written as floats into the Light Control settings of the object
+and the file is saved (Blender keeps the previous version as .blend1). Run headless from the repository root:
+
+    blender -b --factory-startup --python Tools/LightControl_MigrateArchive.py -- --root /archive --report report.json
+
+Check an archive without saving anything, then continue an interrupted run where it stopped:
+
+    blender -b --factory-startup --python Tools/LightControl_MigrateArchive.py -- --root /archive --dry-run --report check.json
+    blender -b --factory-startup --python Tools/LightControl_MigrateArchive.py -- --root /archive --report report.json --resume
+"""
+import argparse
+import fnmatch
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from math import degrees
+
+import bpy
+import mathutils
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from LightControl import properties  # noqa: E402
+
+RESULT_PREFIX = "LIGHTCONTROL_MIGRATION "
+# raycasts for missing pivots stop after this distance
+PIVOT_RAYCAST_DISTANCE: float = 10000.0
+
+
+#################################################################
+######################## VALIDATION #############################
+#################################################################
+
+
+def readVector(value):
+    """A stored pivotPoint or tilt as three floats, None when missing or malformed, and whether it was not floats"""
+    if value is None:
+        return None, False
+    try:
+        values = [value[i] for i in range(len(value))]
+    except TypeError:
+        return None, True
+    if len(values) != 3 or not all(isinstance(v, (int, float)) for v in values):
+        return None, True
+    return tuple(float(v) for v in values), getattr(value, "typecode", "d") not in ("f", "d")
+
+
+def raycastPivot(scene: bpy.types.Scene, depsgraph: bpy.types.Depsgraph, origin: mathutils.Vector, forward: mathutils.Vector):
+    success, location, normal, index, hitObject, matrix = scene.ray_cast(
+        depsgraph, origin, forward, distance=PIVOT_RAYCAST_DISTANCE)
+    return location if success else None
+
+
+def validateLight(scene: bpy.types.Scene, depsgraph: bpy.types.Depsgraph, lightObject: bpy.types.Object, matrixWorld: mathutils.Matrix, staleAngle: float) -> dict:
+    """Validates the pivot and tilt of one light and writes them back as floats, returns what was found and done.
+    Values read from ID properties are written back there for properties.MigrateLightProperties to move"""
+    issues = []
+    fromIdProperties = "pivotPoint" in lightObject or "tilt" in lightObject
+    pivot, pivotNotFloats = readVector(lightObject.get("pivotPoint"))
+    tilt, tiltNotFloats = readVector(lightObject.get("tilt"))
+    if pivot is None and lightObject.lightControl.hasPivotPoint:
+        pivot = tuple(lightObject.lightControl.pivotPoint)
+    if tilt is None and lightObject.lightControl.hasTilt:
+        tilt = tuple(lightObject.lightControl.tilt)
+    if pivotNotFloats:
+        issues.append("pivotTypeNormalized" if pivot is not None else "pivotMalformed")
+    if tiltNotFloats:
+        issues.append("tiltTypeNormalized" if tilt is not None else "tiltMalformed")
+
+    location = matrixWorld.to_translation()
+    forward = (matrixWorld.to_3x3() @ mathutils.Vector((0.0, 0.0, -1.0))).normalized()
+    recompute = pivot is None
+    if pivot is None:
+        issues.append("pivotMissing")
+    elif not any(tilt or ()):
+        # untilted lights look straight at their pivot
+        toPivot = mathutils.Vector(pivot) - location
+        if toPivot.length > 1e-6 and forward.angle(toPivot) > staleAngle:
+            issues.append("pivotStale")
+            recompute = True
+    if recompute:
+        hit = raycastPivot(scene, depsgraph, location, forward)
+        if hit is not None:
+            pivot = tuple(hit)
+            issues.append("pivotRecomputed")
+        elif pivot is None:
+            issues.append("pivotUnresolved")
+
+    if fromIdProperties:
+        if pivot is not None:
+            lightObject["pivotPoint"] = pivot
+        if tilt is not None:
+            lightObject["tilt"] = tilt
+    elif "pivotRecomputed" in issues:
+        lightObject.lightControl.pivotPoint = pivot
+        lightObject.lightControl.hasPivotPoint = True
+    return {"light": lightObject.name, "issues": issues, "pivotPoint": pivot, "tilt": tilt}
+
+
+def readMatrices() -> np.ndarray:
+    """World matrices of all objects of the file in one foreach_get, (N,4,4) in row major order"""
+    objects = bpy.data.objects
+    matrices = np.empty(len(objects) * 16, dtype=np.float32)
+    objects.foreach_get("matrix_world", matrices)
+    # RNA stores matrices column major
+    return matrices.reshape(-1, 4, 4).transpose(0, 2, 1)
+
+
+def processFile(filepath: str, dryRun: bool, staleAngle: float) -> dict:
+    """Runs inside a worker process, opens one file, validates every local light and saves when anything changed"""
+    start = time.perf_counter()
+    bpy.ops.wm.open_mainfile(filepath=filepath, load_ui=False)
+    matrices = readMatrices()
+    lights = [(row, obj) for row, obj in enumerate(bpy.data.objects) if obj.type == 'LIGHT' and obj.library is None]
+    report = {"file": filepath, "lights": len(lights), "changedLights": [], "saved": False}
+    # lights are raycast against the first scene they are in, evaluated once per scene
+    scenes = {}
+    for scene in bpy.data.scenes:
+        for obj in scene.objects:
+            scenes.setdefault(obj.name, scene)
+    depsgraphs = {}
+    for row, lightObject in lights:
+        scene = scenes.get(lightObject.name)
+        if scene is None:
+            continue
+        if scene.name not in depsgraphs:
+            viewLayer = scene.view_layers[0]
+            viewLayer.update()
+            depsgraphs[scene.name] = viewLayer.depsgraph
+        depsgraph = depsgraphs[scene.name]
+        result = validateLight(scene, depsgraph, lightObject, mathutils.Matrix(matrices[row].tolist()), staleAngle)
+        if properties.MigrateLightProperties(lightObject):
+            result["issues"].append("migrated")
+        if result["issues"]:
+            report["changedLights"].append(result)
+    if report["changedLights"] and not dryRun:
+        bpy.ops.wm.save_mainfile(filepath=filepath)
+        report["saved"] = True
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def runWorker(files: list, dryRun: bool, staleAngle: float):
+    # without the load_post migration, opening a file would move the ID properties before they are validated
+    properties.register(migrateOnLoad=False)
+    for filepath in files:
+        try:
+            report = processFile(filepath, dryRun, staleAngle)
+        except Exception as error:
+            report = {"file": filepath, "error": f"{type(error).__name__}: {error}"}
+        print(RESULT_PREFIX + json.dumps(report), flush=True)
+
+
+#################################################################
+########################## ARCHIVE ##############################
+#################################################################
+
+
+def findFiles(root: str, pattern: str) -> list:
+    files = []
+    for directory, _, names in os.walk(root):
+        files.extend(os.path.join(directory, name) for name in names if fnmatch.fnmatch(name, pattern))
+    return sorted(files)
+
+
+def runBatch(blender: str, files: list, options) -> list:
+    """Processes files in one fresh Blender process, files it did not report on are returned as errors"""
+    command = [blender, "-b", "--factory-startup", "--python", os.path.abspath(__file__), "--",
+               "--stale-angle", str(options.stale_angle), "--worker", *files]
+    if options.dry_run:
+        command.insert(command.index("--worker"), "--dry-run")
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=options.timeout * len(files))
+        output, failure = completed.stdout, f"Blender exited with code {completed.returncode}"
+    except subprocess.TimeoutExpired as error:
+        output, failure = error.stdout or "", "timed out"
+        if isinstance(output, bytes):
+            output = output.decode(errors="replace")
+    reports = [json.loads(line[len(RESULT_PREFIX):]) for line in output.splitlines() if line.startswith(RESULT_PREFIX)]
+    reported = {report["file"] for report in reports}
+    reports.extend({"file": filepath, "error": failure} for filepath in files if filepath not in reported)
+    return reports
+
+
+def summarize(reports: list) -> dict:
+    issues = {}
+    for report in reports:
+        for light in report.get("changedLights", []):
+            for issue in light["issues"]:
+                issues[issue] = issues.get(issue, 0) + 1
+    return {
+        "files": len(reports),
+        "failedFiles": sum("error" in report for report in reports),
+        "savedFiles": sum(report.get("saved", False) for report in reports),
+        "lights": sum(report.get("lights", 0) for report in reports),
+        "changedLights": sum(len(report.get("changedLights", [])) for report in reports),
+        "issues": issues,
+    }
+
+
+def writeReport(path: str, reports: list, options, seconds: float):
+    report = {
+        "root": options.root,
+        "dryRun": options.dry_run,
+        "staleAngleDegrees": degrees(options.stale_angle),
+        "seconds": seconds,
+        "summary": summarize(reports),
+        "files": reports,
+    }
+    with open(path + ".tmp", "w") as file:
+        json.dump(report, file, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Light Control archive migration")
+    parser.add_argument("--root", default="", help="directory searched recursively for .blend files")
+    parser.add_argument("--pattern", default="*.blend", help="file name pattern, .blend1 backups are not matched")
+    parser.add_argument("--report", default="lightcontrol_migration.json", help="JSON report written here")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help="Blender processes running at the same time")
+    parser.add_argument("--files-per-worker", type=int, default=20,
+                        help="files opened by one Blender process, amortizes the startup")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds allowed per file")
+    parser.add_argument("--stale-angle", type=float, default=0.0872665,
+                        help="radians between the forward axis and the pivot above which a pivot is stale")
+    parser.add_argument("--dry-run", action="store_true", help="validate and report without saving")
+    parser.add_argument("--resume", action="store_true", help="skip files the existing report finished without error")
+    parser.add_argument("--blender", default="", help="Blender executable of the workers, this one by default")
+    parser.add_argument("--worker", nargs="*", default=None, help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.worker is not None:
+        runWorker(options.worker, options.dry_run, options.stale_angle)
+        return
+    if not options.root:
+        parser.error("--root is required")
+
+    start = time.perf_counter()
+    files = findFiles(os.path.abspath(options.root), options.pattern)
+    reports = []
+    if options.resume and os.path.exists(options.report):
+        with open(options.report) as file:
+            reports = [report for report in json.load(file)["files"] if "error" not in report]
+        finished = {report["file"] for report in reports}
+        files = [filepath for filepath in files if filepath not in finished]
+    print(f"{len(files)} files to process with {options.workers} workers")
+
+    blender = options.blender or bpy.app.binary_path
+    batches = [files[i:i + options.files_per_worker] for i in range(0, len(files), options.files_per_worker)]
+    lastWrite = time.perf_counter()
+    # threads only wait on the Blender processes, the work happens in the processes
+    with ThreadPoolExecutor(max_workers=options.workers) as pool:
+        futures = [pool.submit(runBatch, blender, batch, options) for batch in batches]
+        for done, future in enumerate(as_completed(futures), 1):
+            reports.extend(future.result())
+            print(f"batch {done} of {len(batches)} done, {len(reports)} files reported")
+            # keep a report on disk so an interrupted night can be resumed
+            if time.perf_counter() - lastWrite > 60.0:
+                writeReport(options.report, reports, options, time.perf_counter() - start)
+                lastWrite = time.perf_counter()
+
+    writeReport(options.report, reports, options, time.perf_counter() - start)
+    print(json.dumps(summarize(reports), indent=2))
+
+
+if __name__ == "__main__":
+    main()